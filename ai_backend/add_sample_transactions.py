@@ -1,21 +1,14 @@
-import pymongo
-import os
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/cardano-hackathon')
-DB_NAME = 'cardano-hackathon'
+from db import DB_NAME, close_client, get_db
 
 def add_sample_transactions():
     """
     Add sample transactions to MongoDB for testing
+    Use seed_data.py for large load-test datasets
     """
     try:
-        client = pymongo.MongoClient(MONGO_URI)
-        db = client[DB_NAME]
+        db = get_db()
         
         # Check if users collection has any users
         users = db['users'].find_one({})
@@ -107,9 +100,9 @@ def add_sample_transactions():
         
         # Show what was inserted
         count = db['transactions'].count_documents({})
-        print(f"Total transactions in database: {count}")
+        print(f"Total transactions in {DB_NAME}: {count}")
         
-        client.close()
+        close_client()
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -1,6 +1,10 @@
 from flask import Flask, jsonify, request
-from insights_agent import analyze_spending_patterns
+from insights_agent import analyze_spending_patterns, extract_insights, get_local_insights
 from budgetPlanner import plan_all_goals
+from db import health_check as db_health_check
+from job_queue import JobFailed, job_queue
+from llm_limiter import Overloaded, llm_limiter
+from result_cache import result_cache
 import json
 import os
 import traceback
@@ -10,62 +14,123 @@ load_dotenv()
 
 app = Flask(__name__)
 
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    """Shed load when every LLM slot is busy instead of queueing requests without bound"""
+    print(f"[WARN] Refusing request: {e}")
+    response = jsonify({
+        "success": False,
+        "error": str(e),
+        "message": "Server busy, retry later"
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, e.status
+
+def run_insights(user_id):
+    """Run the insights agent; returns the response body and HTTP status"""
+    analysis_result = analyze_spending_patterns(user_id)
+    
+    if analysis_result is None:
+        return {
+            "success": False,
+            "error": "No analysis result",
+            "message": "Failed to generate insights"
+        }, 500
+    
+    # Extract and validate the JSON object in the result
+    try:
+        analysis_data = extract_insights(analysis_result)
+        
+        return {
+            "success": True,
+            "keyInsights": analysis_data.get("keyInsights", []),
+            "alerts": analysis_data.get("alerts", []),
+            "suggestions": analysis_data.get("suggestions", [])
+        }, 200
+        
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON Parse Error: {str(e)}")
+        print(f"Raw result: {str(analysis_result).strip()[:500]}")
+        return {
+            "success": False,
+            "error": f"Invalid JSON response from AI: {str(e)}",
+            "message": "Failed to parse insights"
+        }, 500
+
+def run_budget_plan(user_id):
+    """Run the budget planner agent; returns the response body and HTTP status"""
+    plan_result = plan_all_goals(user_id)
+    
+    if plan_result is None:
+        return {
+            "success": False,
+            "error": "No plan result",
+            "message": "Failed to generate budget plan"
+        }, 500
+    
+    # plan_all_goals already returns a dict, not a string
+    if isinstance(plan_result, dict):
+        return plan_result, 200 if plan_result.get("success") else 500
+    
+    # Fallback: if it's a string, try to parse it
+    result_str = str(plan_result).strip()
+    try:
+        # Find the start of JSON (first '{')
+        json_start = result_str.find('{')
+        json_end = result_str.rfind('}') + 1
+        
+        if json_start >= 0 and json_end > json_start:
+            json_str = result_str[json_start:json_end]
+            plan_data = json.loads(json_str)
+        else:
+            raise ValueError("No JSON found in response")
+        
+        return {
+            "success": True,
+            "plan": plan_data
+        }, 200
+        
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON Parse Error: {str(e)}")
+        print(f"Raw result: {result_str[:500]}")
+        return {
+            "success": False,
+            "error": f"Invalid JSON response from AI: {str(e)}",
+            "message": "Failed to parse budget plan"
+        }, 500
+
+# Analyses that can run as background jobs: kind -> (runner, whether userId is required)
+JOB_KINDS = {
+    'insights': (run_insights, False),
+    'budget': (run_budget_plan, True),
+}
+
 @app.route('/insights', methods=['GET'])
 def get_insights():
     """
     Get financial insights from transaction data
+    mode=local skips the LLM and returns the deterministic findings from local_analytics
     Returns: JSON with keyInsights, alerts, and suggestions
     """
     try:
         user_id = request.args.get('userId')
-        print("🚀 Generating financial insights...")
         
-        # Run the insights agent
-        analysis_result = analyze_spending_patterns(user_id)
-        
-        if analysis_result is None:
-            return jsonify({
-                "success": False,
-                "error": "No analysis result",
-                "message": "Failed to generate insights"
-            }), 500
+        if request.args.get('mode') == 'local':
+            findings = get_local_insights(user_id)
+            if findings is None:
+                return jsonify({
+                    "success": False,
+                    "error": "No transactions found",
+                    "message": "Failed to generate insights"
+                }), 404
+            return jsonify({"success": True, "source": "local", **findings}), 200
         
-        # Convert CrewOutput to string
-        result_str = str(analysis_result).strip()
-        
-        # Extract JSON from the result
-        # Look for JSON object in the result
-        try:
-            # Find the start of JSON (first '{')
-            json_start = result_str.find('{')
-            json_end = result_str.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = result_str[json_start:json_end]
-                analysis_data = json.loads(json_str)
-            else:
-                raise ValueError("No JSON found in response")
-            
-            # Validate structure
-            if "keyInsights" not in analysis_data or "alerts" not in analysis_data or "suggestions" not in analysis_data:
-                raise ValueError("Missing required fields: keyInsights, alerts, suggestions")
-            
-            return jsonify({
-                "success": True,
-                "keyInsights": analysis_data.get("keyInsights", []),
-                "alerts": analysis_data.get("alerts", []),
-                "suggestions": analysis_data.get("suggestions", [])
-            }), 200
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON Parse Error: {str(e)}")
-            print(f"Raw result: {result_str[:500]}")
-            return jsonify({
-                "success": False,
-                "error": f"Invalid JSON response from AI: {str(e)}",
-                "message": "Failed to parse insights"
-            }), 500
+        print("🚀 Generating financial insights...")
+        body, status = run_insights(user_id)
+        return jsonify(body), status
         
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"❌ Error generating insights: {str(e)}")
         import traceback
@@ -78,12 +143,34 @@ def get_insights():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint, including the MongoDB ping and connection pool metrics"""
+    database = db_health_check()
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if database["ok"] else "degraded",
         "service": "Cardano Insights API",
-        "version": "1.0.0"
-    }), 200
+        "version": "1.0.0",
+        "database": database,
+        "resultCache": result_cache.stats(),
+        "llm": llm_limiter.stats(),
+        "jobs": job_queue.stats()
+    }), 200 if database["ok"] else 503
+
+@app.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """
+    Drop a user's cached insights and budget plan, e.g. right after importing transactions
+    Cached results are keyed on the transaction set and goals, so this only forces a refresh sooner
+    """
+    user_id = request.args.get('userId') or (request.get_json(silent=True) or {}).get('userId')
+    if not user_id:
+        return jsonify({
+            "success": False,
+            "error": "Missing userId parameter",
+            "message": "userId query parameter or JSON field is required"
+        }), 400
+    
+    removed = result_cache.invalidate(user_id)
+    return jsonify({"success": True, "userId": user_id, "removed": removed}), 200
 
 @app.route('/budget', methods=['GET'])
 def get_budget_plan():
@@ -102,50 +189,11 @@ def get_budget_plan():
         
         print(f"🚀 Generating budget plan for user {user_id}...")
         
-        # Run the budget planner agent
-        plan_result = plan_all_goals(user_id)
-        
-        if plan_result is None:
-            return jsonify({
-                "success": False,
-                "error": "No plan result",
-                "message": "Failed to generate budget plan"
-            }), 500
-        
-        # plan_all_goals already returns a dict, not a string
-        if isinstance(plan_result, dict):
-            if plan_result.get("success"):
-                return jsonify(plan_result), 200
-            else:
-                return jsonify(plan_result), 500
-        
-        # Fallback: if it's a string, try to parse it
-        result_str = str(plan_result).strip()
-        try:
-            # Find the start of JSON (first '{')
-            json_start = result_str.find('{')
-            json_end = result_str.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = result_str[json_start:json_end]
-                plan_data = json.loads(json_str)
-            else:
-                raise ValueError("No JSON found in response")
-            
-            return jsonify({
-                "success": True,
-                "plan": plan_data
-            }), 200
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON Parse Error: {str(e)}")
-            print(f"Raw result: {result_str[:500]}")
-            return jsonify({
-                "success": False,
-                "error": f"Invalid JSON response from AI: {str(e)}",
-                "message": "Failed to parse budget plan"
-            }), 500
+        body, status = run_budget_plan(user_id)
+        return jsonify(body), status
         
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"❌ Error generating budget plan: {str(e)}")
         traceback.print_exc()
@@ -155,6 +203,60 @@ def get_budget_plan():
             "message": "Failed to generate budget plan"
         }), 500
 
+def _job_runner(run, user_id):
+    def run_job():
+        body, status = run(user_id)
+        if status != 200:
+            raise JobFailed(body.get("error") or body.get("message") or "Analysis failed")
+        return body
+    return run_job
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue an insights or budget analysis and return its job id right away
+    Takes kind and userId from the JSON body or the query string. A user's
+    pending job of the same kind is reused instead of starting another.
+    Returns: 202 with the job; poll GET /jobs/<jobId> for the result
+    """
+    params = {**request.args.to_dict(), **(request.get_json(silent=True) or {})}
+    kind, user_id = params.get('kind'), params.get('userId')
+    if kind not in JOB_KINDS:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown job kind: {kind}",
+            "message": f"kind must be one of: {', '.join(JOB_KINDS)}"
+        }), 400
+    
+    run, requires_user = JOB_KINDS[kind]
+    if requires_user and not user_id:
+        return jsonify({
+            "success": False,
+            "error": "Missing userId parameter",
+            "message": "userId is required for this kind of job"
+        }), 400
+    
+    job, created = job_queue.submit(kind, user_id, _job_runner(run, user_id))
+    print(f"[INFO] {'Queued' if created else 'Reusing'} {kind} job {job['jobId']} for user {user_id}")
+    return jsonify({
+        "success": True,
+        "deduplicated": not created,
+        "statusUrl": f"/jobs/{job['jobId']}",
+        **job
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a job: queued, running, done (with result) or failed (with error)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "Job not found",
+            "message": "Unknown job id, or its result has expired"
+        }), 404
+    return jsonify({"success": True, **job}), 200
+
 @app.route('/', methods=['GET'])
 def index():
     """API documentation"""
@@ -164,11 +266,15 @@ def index():
         "endpoints": {
             "GET /health": "Health check",
             "GET /insights?userId=<userId>": "Get financial insights from transaction data",
-            "GET /budget?userId=<userId>": "Generate budget plan for user's savings goals"
+            "GET /insights?userId=<userId>&mode=local": "Get rule-based insights instantly, without the LLM",
+            "GET /budget?userId=<userId>": "Generate budget plan for user's savings goals",
+            "POST /cache/invalidate?userId=<userId>": "Forget a user's cached insights and budget plan",
+            "POST /jobs {kind: insights|budget, userId}": "Queue an analysis and return its job id",
+            "GET /jobs/<jobId>": "Status and result of a queued analysis"
         },
         "documentation": "Use Postman to access endpoints"
     }), 200
 
 if __name__ == '__main__':
     port = int(os.getenv('INSIGHTS_API_PORT', 5002))
-    app.run(debug=True, host='0.0.0.0', port=port)
+    app.run(debug=True, host='0.0.0.0', port=port, threaded=True)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Transaction export benchmark: whole-cursor DataFrame path against the streaming CSV writer
+Documents are generated in the shape the export's projection returns from MongoDB,
+so no database is needed; every run happens in a fresh interpreter for peak RSS
+
+Usage:
+    python benchmarks/export_csv.py [--rows 200000] [--batch-size 5000] [--repeat 3]
+        [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is reported as unknown
+    resource = None
+
+AI_BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AI_BACKEND))
+
+TARGETS = ['dataframe', 'stream']
+
+CATEGORIES = ['Food', 'Transport', 'Shopping', 'Bills', 'Health', 'Entertainment', 'Salary']
+
+
+def synthetic_documents(rows: int, seed: int = 0):
+    """Yield transaction documents as find() with EXPORT_PROJECTION returns them"""
+    from bson.objectid import ObjectId
+
+    rng = random.Random(seed)
+    user_ids = [ObjectId() for _ in range(20)]
+    when = datetime(2025, 11, 28, 20, 0, 0)
+    for n in range(rows):
+        when -= timedelta(minutes=rng.randint(1, 90))
+        imported = rng.random() < 0.8
+        document = {
+            '_id': ObjectId(),
+            'userId': rng.choice(user_ids),
+            'type': 'income' if rng.random() < 0.1 else 'expense',
+            'amount': round(rng.lognormvariate(4, 1.2), 2),
+            'currency': 'INR',
+            'category': rng.choice(CATEGORIES),
+            'description': f"Payment {n}",
+            'status': 'Completed',
+            'date': when,
+            'tags': ['upi', 'gpay'] if imported else [],
+            'UPI': int(imported),
+            'UserInput': int(not imported),
+            '__v': 0,
+        }
+        if imported:
+            document.update({
+                'recipient': f"Merchant {rng.randint(1, 500)}",
+                'paymentMethod': 'Bank Account',
+                'accountNumber': 'XXXXXXXXXX191807',
+                'transactionId': f"T{rng.getrandbits(64):016x}",
+                'htmlFile': {'fileName': 'My Activity.html', 'uploadDate': datetime(2025, 11, 29, 10, 0, 0)},
+            })
+        yield document
+
+
+def baseline_dataframe(documents: list):
+    """
+    The export's conversion before streaming, kept here as the baseline:
+    one DataFrame over the whole list, with per-cell loops and apply lambdas
+    """
+    import pandas as pd
+    from export_transactions_to_csv import EXPORT_COLUMNS
+
+    df = pd.DataFrame(documents)
+    if '_id' in df.columns:
+        df['_id'] = df['_id'].astype(str)
+    if 'userId' in df.columns:
+        df['userId'] = df['userId'].astype(str)
+
+    if 'htmlFile' in df.columns:
+        htmlFile_data = []
+        for hf in df['htmlFile']:
+            if pd.isna(hf) or hf is None:
+                htmlFile_data.append(None)
+            elif isinstance(hf, dict):
+                htmlFile_data.append(f"{hf.get('fileName', '')} ({hf.get('uploadDate', '')})")
+            else:
+                htmlFile_data.append(str(hf))
+        df['htmlFile'] = htmlFile_data
+
+    if 'tags' in df.columns:
+        df['tags'] = df['tags'].apply(lambda x: ','.join(x) if isinstance(x, list) else x)
+
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            try:
+                df[col] = df[col].apply(lambda x: x.isoformat() if isinstance(x, datetime) else x)
+            except Exception:
+                pass
+
+    available_cols = [col for col in EXPORT_COLUMNS if col in df.columns]
+    other_cols = [col for col in df.columns if col not in EXPORT_COLUMNS]
+    return df[available_cols + other_cols]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_target(target: str, rows: int, batch_size: int, path: str) -> dict:
+    """Child side: export rows documents once and report time and peak RSS"""
+    import export_transactions_to_csv as exporter
+
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    if target == 'dataframe':
+        # What the export did before streaming: the whole cursor as a list, then one DataFrame
+        documents = list(synthetic_documents(rows))
+        baseline_dataframe(documents).to_csv(path, index=False, encoding='utf-8')
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            exporter.write_csv_batches(synthetic_documents(rows), f, batch_size)
+    seconds = time.perf_counter() - start
+
+    return {
+        'seconds': seconds,
+        'bytes': os.path.getsize(path),
+        'peak_rss_mb': peak_rss_mb(),
+        'import_rss_mb': baseline_rss,
+    }
+
+
+def measure(target: str, rows: int, batch_size: int, repeat: int, directory: str) -> dict:
+    """Run a target repeat times in fresh interpreters and keep the fastest run"""
+    runs = []
+    path = os.path.join(directory, f"{target}.csv")
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, __file__, '--child', target, str(rows), str(batch_size), path],
+            cwd=str(AI_BACKEND), capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{target} failed: {result.stderr.strip()[-500:]}")
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    best = min(runs, key=lambda run: run['seconds'])
+    best['peak_rss_mb'] = max((run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None), default=None)
+    return best
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        target, rows, batch_size, path = sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5]
+        print(json.dumps(run_target(target, rows, batch_size, path)))
+        return
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=200_000)
+    arg_parser.add_argument('--batch-size', type=int, default=5000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--output', help="Write the results as JSON")
+    args = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for target in TARGETS:
+            result = measure(target, args.rows, args.batch_size, args.repeat, directory)
+            rows.append({'target': target, 'rows': args.rows, 'batch_size': args.batch_size, **result})
+
+    print(f"{'target':<10} {'rows/s':>10} {'MB/s':>7} {'peak RSS':>10} {'after import':>13}")
+    for row in rows:
+        rss = f"{row['peak_rss_mb']:.0f} MB" if row['peak_rss_mb'] is not None else 'n/a'
+        base = f"{row['import_rss_mb']:.0f} MB" if row['import_rss_mb'] is not None else 'n/a'
+        print(f"{row['target']:<10} {row['rows'] / row['seconds']:>10,.0f} "
+              f"{row['bytes'] / 1024 / 1024 / row['seconds']:>7.1f} {rss:>10} {base:>13}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': rows}, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Parser throughput benchmark over synthetic Google Pay exports
+Reports blocks/sec, MB/sec and peak RSS for parse_html_file and parse_multiple_files;
+every run happens in a fresh interpreter so peak RSS belongs to that run alone
+
+Usage:
+    python benchmarks/parser_throughput.py [--size-mb 20] [--repeat 3] [--workers N]
+        [--all-cases] [--output results.json] [--compare baseline.json] [--tolerance 0.15]
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is reported as unknown
+    resource = None
+
+AI_BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AI_BACKEND))
+
+from synthetic_export import write_export
+
+# (layout, clock) of each generated export; the default pair covers both of each
+CASES = [('outer-cell', '12h'), ('title', '24h')]
+ALL_CASES = [(layout, clock) for layout in ('outer-cell', 'title') for clock in ('12h', '24h')]
+CURRENCIES = ['INR', 'USD', 'EUR', 'GBP']
+
+TARGETS = ['parse_html_file', 'parse_html_file_columnar', 'parse_multiple_files']
+
+
+def peak_rss_mb(who) -> float:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_target(target: str, path: str, workers: int) -> dict:
+    """Child side: parse one export once and report time, result size and peak RSS"""
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if target == 'parse_multiple_files':
+            from flexible_parser import FlexibleGooglePayParser
+            parser = FlexibleGooglePayParser()
+            transactions = len(parser.parse_multiple_files([path], workers=workers or None))
+        else:
+            from parse_html_to_json import FlexibleGooglePayParser
+            columnar = target == 'parse_html_file_columnar'
+            transactions = len(FlexibleGooglePayParser().parse_html_file(path, columnar=columnar))
+    seconds = time.perf_counter() - start
+
+    return {
+        'seconds': seconds,
+        'transactions': transactions,
+        'peak_rss_mb': peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        'worker_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource and workers != 1 else None,
+    }
+
+
+def measure(target: str, path: str, workers: int, repeat: int) -> dict:
+    """Run a target repeat times in fresh interpreters and keep the fastest run"""
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, __file__, '--child', target, path, '--workers', str(workers)],
+            cwd=str(AI_BACKEND), capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{target} failed: {result.stderr.strip()[-500:]}")
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    best = min(runs, key=lambda run: run['seconds'])
+    best['peak_rss_mb'] = max((run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None), default=None)
+    return best
+
+
+def run(size_mb: float, cases, repeat: int, workers: int, directory: str) -> list:
+    rows = []
+    for layout, clock in cases:
+        case = f"{layout}/{clock}"
+        path = os.path.join(directory, f"export-{layout}-{clock}.html")
+        export = write_export(path, size_mb=size_mb, layout=layout, clock=clock, currencies=CURRENCIES)
+        megabytes = export['bytes'] / (1024 * 1024)
+        print(f"[INFO] {case}: {export['transactions']} blocks, {megabytes:.1f} MB")
+
+        for target in TARGETS:
+            result = measure(target, path, workers, repeat)
+            if result['transactions'] != export['transactions']:
+                print(f"[ERROR] {target} on {case} found {result['transactions']} "
+                      f"of {export['transactions']} transactions")
+            rows.append({
+                'case': case,
+                'target': target,
+                'workers': workers if target == 'parse_multiple_files' else 1,
+                'blocks': export['transactions'],
+                'megabytes': megabytes,
+                'seconds': result['seconds'],
+                'blocks_per_sec': export['transactions'] / result['seconds'],
+                'mb_per_sec': megabytes / result['seconds'],
+                'peak_rss_mb': result['peak_rss_mb'],
+                'worker_peak_rss_mb': result['worker_peak_rss_mb'],
+            })
+    return rows
+
+
+def print_table(rows: list):
+    print(f"\n{'case':<16} {'target':<26} {'blocks/s':>10} {'MB/s':>7} {'peak RSS':>10}")
+    for row in rows:
+        rss = f"{row['peak_rss_mb']:.0f} MB" if row['peak_rss_mb'] is not None else 'n/a'
+        print(f"{row['case']:<16} {row['target']:<26} {row['blocks_per_sec']:>10,.0f} "
+              f"{row['mb_per_sec']:>7.1f} {rss:>10}")
+
+
+def compare(rows: list, baseline_file: str, tolerance: float) -> bool:
+    """Print changes against an earlier --output file; returns False on any regression"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {(row['case'], row['target']): row for row in json.load(f)['results']}
+
+    ok = True
+    print(f"\nAgainst {baseline_file} (tolerance {tolerance:.0%}):")
+    for row in rows:
+        before = baseline.get((row['case'], row['target']))
+        if before is None:
+            continue
+        speed = row['blocks_per_sec'] / before['blocks_per_sec'] - 1
+        memory = None
+        if row['peak_rss_mb'] and before.get('peak_rss_mb'):
+            memory = row['peak_rss_mb'] / before['peak_rss_mb'] - 1
+
+        regressed = speed < -tolerance or (memory is not None and memory > tolerance)
+        ok = ok and not regressed
+        memory_text = f"{memory:+.1%}" if memory is not None else 'n/a'
+        print(f"  {'REGRESSION' if regressed else 'ok':<10} {row['case']:<16} {row['target']:<26} "
+              f"speed {speed:+.1%}  peak RSS {memory_text}")
+    return ok
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        target, path = sys.argv[2], sys.argv[3]
+        workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1
+        print(json.dumps(run_target(target, path, workers)))
+        return
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--size-mb', type=float, default=20)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="parse_multiple_files workers; 0 for one per CPU")
+    arg_parser.add_argument('--all-cases', action='store_true', help="Every layout and clock combination")
+    arg_parser.add_argument('--output', help="Write the results as JSON")
+    arg_parser.add_argument('--compare', help="Earlier --output file to check for regressions")
+    arg_parser.add_argument('--tolerance', type=float, default=0.15)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows = run(args.size_mb, ALL_CASES if args.all_cases else CASES, args.repeat, args.workers, directory)
+    print_table(rows)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'size_mb': args.size_mb, 'results': rows}, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+    if args.compare and not compare(rows, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Prompt context benchmark: the raw export CSV the agents used to embed against prompt_context
+For each history size the same synthetic transactions go through both paths,
+reporting prompt size in characters and estimated tokens and the time to build it.
+Model latency grows with prompt tokens and needs a Gemini key, so it is not timed here.
+
+Usage:
+    python benchmarks/prompt_context.py [--rows 500,5000,50000] [--budget 4000] [--repeat 3]
+        [--output results.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+AI_BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AI_BACKEND))
+
+from bson.objectid import ObjectId
+
+import prompt_context
+from export_transactions_to_csv import EXPORT_COLUMNS, documents_to_frame
+from seed_data import synthetic_transactions
+
+USER_ID = ObjectId('6929a1f0c2b4a1d2e3f40001')
+
+
+def raw_csv(frame):
+    """What the agents embedded before: every export column of every transaction"""
+    return frame.reindex(columns=EXPORT_COLUMNS).to_csv(index=False)
+
+
+def best_time(build, frame, repeat: int):
+    best, text = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = build(frame)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, text
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', default='500,5000,50000', help="Comma-separated history sizes")
+    arg_parser.add_argument('--budget', type=int, default=prompt_context.DEFAULT_TOKEN_BUDGET)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--output', help="Write the results as JSON")
+    args = arg_parser.parse_args()
+
+    results = []
+    for rows in (int(value) for value in args.rows.split(',')):
+        frame = documents_to_frame([
+            dict(document, _id=ObjectId()) for document in synthetic_transactions(USER_ID, rows, days=365)
+        ])
+        paths = {
+            'raw_csv': raw_csv,
+            'context': lambda f: prompt_context.build_context(f, args.budget),
+        }
+        for path, build in paths.items():
+            seconds, text = best_time(build, frame, args.repeat)
+            results.append({
+                'rows': rows, 'path': path, 'chars': len(text),
+                'tokens': prompt_context.estimate_tokens(text), 'ms': seconds * 1000,
+            })
+
+    print(f"{'rows':>7} {'path':<8} {'chars':>11} {'~tokens':>9} {'build ms':>9}")
+    for row in results:
+        print(f"{row['rows']:>7,} {row['path']:<8} {row['chars']:>11,} {row['tokens']:>9,} {row['ms']:>9.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'budget': args.budget, 'results': results}, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
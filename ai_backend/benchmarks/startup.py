@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Cold import time for each ai_backend entry point
+Every module is imported in a fresh interpreter, the way Node and Flask start them
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--output results.json] [module ...]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+AI_BACKEND = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    'parse_html_to_json',
+    'flexible_parser',
+    'export_transactions_to_csv',
+    'insights_agent',
+    'budgetPlanner',
+    'app',
+]
+
+# Runs inside the child so interpreter start-up is reported separately from the import
+IMPORT_SNIPPET = (
+    "import sys, time\n"
+    "sys.path.insert(0, {path!r})\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def time_import(module: str) -> dict:
+    """Import one module in a new interpreter; returns import and whole-process seconds"""
+    code = IMPORT_SNIPPET.format(path=str(AI_BACKEND), module=module)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=str(AI_BACKEND),
+        capture_output=True,
+        text=True,
+    )
+    process_time = time.perf_counter() - start
+
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        raise RuntimeError(f"import {module} failed: {error[-1] if error else result.returncode}")
+
+    return {
+        'import': float(result.stdout.strip().splitlines()[-1]),
+        'process': process_time,
+    }
+
+
+def run(modules, runs: int) -> dict:
+    results = {}
+    for module in modules:
+        try:
+            samples = [time_import(module) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            results[module] = {'error': str(e)}
+            continue
+
+        results[module] = {
+            'import_median_s': statistics.median(s['import'] for s in samples),
+            'import_min_s': min(s['import'] for s in samples),
+            'process_median_s': statistics.median(s['process'] for s in samples),
+            'runs': runs,
+        }
+    return results
+
+
+def print_table(results: dict):
+    print(f"{'module':<28} {'import (median)':>16} {'import (min)':>14} {'process':>10}")
+    for module, row in results.items():
+        if 'error' in row:
+            print(f"{module:<28} {'failed':>16}")
+            continue
+        print(
+            f"{module:<28} {row['import_median_s'] * 1000:>13.1f} ms"
+            f" {row['import_min_s'] * 1000:>11.1f} ms"
+            f" {row['process_median_s'] * 1000:>7.0f} ms"
+        )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('modules', nargs='*', default=ENTRY_POINTS)
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--output', help="Also write the results as JSON")
+    args = arg_parser.parse_args()
+
+    results = run(args.modules, args.runs)
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for TimestampDecoder over a synthetic export's blocks
+Compares detecting the layout on every block with the remembered-layout fast path
+
+Usage:
+    python benchmarks/timestamps.py [--blocks N] [--repeat R]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic_export import render_block, synthetic_transactions
+from timestamp_decoder import TimestampDecoder
+
+
+def synthetic_blocks(count: int, clock: str):
+    return [render_block(tx, clock=clock) for tx in synthetic_transactions(count, ['INR', 'USD', 'EUR', 'GBP'])]
+
+
+def best_time(decode, blocks, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in blocks:
+            decode(block)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--blocks', type=int, default=100_000)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'clock':<8} {'mode':<20} {'us/block':>9} {'blocks/s':>12}")
+    for clock in ('12h', '24h'):
+        blocks = synthetic_blocks(args.blocks, clock)
+        decoder = TimestampDecoder()
+        modes = [
+            ('detect every block', lambda block: TimestampDecoder().isoformat(block)),
+            ('remembered layout', decoder.isoformat),
+            ('datetime values', decoder.decode),
+        ]
+        for mode, decode in modes:
+            seconds = best_time(decode, blocks, args.repeat)
+            print(f"{clock:<8} {mode:<20} {seconds / len(blocks) * 1e6:>9.2f} {len(blocks) / seconds:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
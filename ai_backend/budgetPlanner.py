@@ -7,111 +7,68 @@ Plans how to achieve all goals together
 import os
 import sys
 import json
-import subprocess
 import traceback
-import pymongo
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
+
+from db import get_db
+from llm_limiter import Overloaded, llm_limiter
+from result_cache import fingerprint, result_cache
 
 load_dotenv()
 
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
+# Bump when the planning prompt changes, so cached plans are regenerated
+PLAN_PROMPT_VERSION = 2
 
-MONGO_URI = os.getenv('MONGODB_URI')
-DB_NAME = 'financebot'
+# crewai is slow to import, so the LLM and agent are built on first use
 
-gemini_llm = LLM(model="gemini-2.0-flash", api_key=GEMINI_API_KEY)
+@lru_cache(maxsize=None)
+def get_gemini_llm():
+    from crewai.llm import LLM
+    
+    gemini_api_key = os.getenv('GEMINI_API_KEY')
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    
+    return LLM(model="gemini-2.0-flash", api_key=gemini_api_key)
 
-budget_planner_agent = Agent(
-    role="Smart Budget Planner",
-    goal="Create a simple, achievable plan to save for multiple goals simultaneously",
-    backstory="Expert at prioritizing savings goals and finding money in budgets without overwhelming the user",
-    llm=gemini_llm,
-    verbose=True
-)
+@lru_cache(maxsize=None)
+def get_budget_planner_agent():
+    from crewai import Agent
+    
+    return Agent(
+        role="Smart Budget Planner",
+        goal="Create a simple, achievable plan to save for multiple goals simultaneously",
+        backstory="Expert at prioritizing savings goals and finding money in budgets without overwhelming the user",
+        llm=get_gemini_llm(),
+        verbose=True
+    )
 
-def export_transactions_to_csv(user_id: str = None):
-    """Run the export script to get fresh transaction data for specific user"""
+def get_transactions_context(user_id: str = None):
+    """Fresh, compact transaction context for specific user, built from the per-user export cache"""
     try:
-        export_script = os.path.join(os.path.dirname(__file__), 'export_transactions_to_csv.py')
-        
-        # Pass user_id as argument to filter transactions
-        cmd = ['python', export_script]
-        if user_id:
-            cmd.append(user_id)
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode != 0:
-            print(f"[ERROR] Export failed: {result.stderr}")
-            return None
+        from prompt_context import user_context
         
-        csv_path = os.path.join(os.path.dirname(__file__), 'transactions_export.csv')
-        if not os.path.exists(csv_path):
-            print("[ERROR] CSV file not generated")
-            return None
-            
-        return csv_path
+        return user_context(user_id)
     except Exception as e:
         print(f"[ERROR] Error exporting transactions: {e}")
         traceback.print_exc()
         return None
 
+# Active goals come back nearest deadline first
+GOALS_SORT = [('deadline', 1)]
+
+def active_goals_query(user_oid) -> dict:
+    return {'userId': user_oid, 'status': 'active'}
+
 def get_user_spending_summary(user_id: str) -> dict:
-    """Fetch user's spending patterns from transactions"""
+    """User's spending over the last 7, 30 and 90 days from the cached transactions"""
     try:
-        client = pymongo.MongoClient(MONGO_URI)
-        db = client[DB_NAME]
-        
-        # Convert user_id to ObjectId
-        from bson.objectid import ObjectId
-        user_oid = ObjectId(user_id)
+        # Imported here so pandas only loads once a plan is requested
+        from spending_summary import user_spending_summary
         
-        # Get last 30 days of transactions
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        transactions = list(db['transactions'].find({
-            'userId': user_oid,
-            'date': {'$gte': thirty_days_ago},
-            'type': 'expense'
-        }))
-        
-        if not transactions:
-            return {
-                "totalSpent": 0,
-                "byCategory": {},
-                "avgDaily": 0,
-                "avgMonthly": 0
-            }
-        
-        # Group by category
-        by_category = {}
-        total_spent = 0
-        
-        for tx in transactions:
-            cat = tx.get('category', 'Uncategorized')
-            amount = tx.get('amount', 0)
-            total_spent += amount
-            by_category[cat] = by_category.get(cat, 0) + amount
-        
-        avg_daily = total_spent / 30
-        avg_monthly = total_spent
-        
-        return {
-            "totalSpent": total_spent,
-            "byCategory": by_category,
-            "avgDaily": round(avg_daily, 2),
-            "avgMonthly": round(avg_monthly, 2),
-            "transactionCount": len(transactions)
-        }
+        return user_spending_summary(user_id)
         
     except Exception as e:
         print(f"[ERROR] Failed to get spending summary: {e}")
@@ -120,16 +77,12 @@ def get_user_spending_summary(user_id: str) -> dict:
 def get_user_budget_goals(user_id: str) -> list:
     """Fetch user's budget goals from DB"""
     try:
-        client = pymongo.MongoClient(MONGO_URI)
-        db = client[DB_NAME]
+        db = get_db()
         
         from bson.objectid import ObjectId
         user_oid = ObjectId(user_id)
         
-        budgets = list(db['budgets'].find({
-            'userId': user_oid,
-            'status': 'active'
-        }).sort([('deadline', 1)]))
+        budgets = list(db['budgets'].find(active_goals_query(user_oid)).sort(GOALS_SORT))
         
         # Convert ObjectId to string for JSON serialization
         for budget in budgets:
@@ -144,8 +97,22 @@ def get_user_budget_goals(user_id: str) -> list:
         print(f"[ERROR] Failed to get budget goals: {e}")
         return []
 
-def create_multi_goal_plan_task(goals: list, spending_summary: dict, csv_content: str) -> Task:
+def plan_cache_key(user_id: str, goals: list):
+    """Fingerprint of the prompt version, the user's transaction set and their goals, or None"""
+    try:
+        from user_dataset import user_data_version
+        
+        return fingerprint('budget', PLAN_PROMPT_VERSION, user_data_version(user_id), goals)
+    except Exception as e:
+        print(f"[WARN] Budget plan cache unavailable: {e}")
+        return None
+
+def create_multi_goal_plan_task(goals: list, spending_summary: dict, context: str):
     """Create task for multi-goal planning"""
+    from crewai import Task
+    
+    windows = spending_summary.get('windows', {})
+    month, week, quarter = windows.get('30d', {}), windows.get('7d', {}), windows.get('90d', {})
     
     goals_text = "\n".join([
         f"• {g['goalName']}: ₹{g['targetAmount']} by {g['deadline']} (Priority: {g.get('priority', 'medium')})"
@@ -162,15 +129,17 @@ SPENDING SUMMARY (Last 30 days):
 - Total spent: ₹{spending_summary.get('totalSpent', 0)}
 - Average daily: ₹{spending_summary.get('avgDaily', 0)}
 - Average monthly: ₹{spending_summary.get('avgMonthly', 0)}
+- Median / 90th percentile expense: ₹{month.get('percentiles', {}).get('p50', 0)} / ₹{month.get('percentiles', {}).get('p90', 0)}
+- Last 7 days: ₹{week.get('totalSpent', 0)}; average monthly over 90 days: ₹{quarter.get('avgMonthly', 0)}
 
 Top spending categories:
 {json.dumps(spending_summary.get('byCategory', {}), indent=2)}
 
-COMPLETE TRANSACTION DATA (CSV):
-{csv_content}
+TRANSACTION DATA (exact aggregates over every transaction, the largest outliers and an evenly spread sample):
+{context}
 
 INSTRUCTIONS:
-- Analyze the actual transaction CSV data to identify real spending patterns
+- Analyze the actual transaction data to identify real spending patterns
 - Use SIMPLE language, not too much analysis
 - Give specific numbers for monthly/weekly savings needed for each goal
 - Prioritize goals by deadline and importance (high priority goals first)
@@ -188,7 +157,7 @@ Together you can save ₹4500/month to achieve all goals with these cuts..."
 
 Provide the plan now:""",
         expected_output="Natural language plan with specific numbers from transaction analysis and actionable advice",
-        agent=budget_planner_agent,
+        agent=get_budget_planner_agent(),
     )
 
 def plan_all_goals(user_id: str):
@@ -198,7 +167,6 @@ def plan_all_goals(user_id: str):
         
         # Fetch user's data
         goals = get_user_budget_goals(user_id)
-        spending = get_user_spending_summary(user_id)
         
         if not goals:
             return {
@@ -206,50 +174,60 @@ def plan_all_goals(user_id: str):
                 "message": "No active budget goals found. Create some goals first!"
             }
         
+        # Reuse the last plan while the transactions and goals are unchanged
+        cache_key = plan_cache_key(user_id, goals)
+        if cache_key:
+            cached = result_cache.get(user_id, 'budget', cache_key)
+            if cached is not None:
+                print(f"[INFO] Budget plan for {user_id} served from cache")
+                return cached
+        
+        spending = get_user_spending_summary(user_id)
         print(f"[INFO] Found {len(goals)} active goals")
         print(f"[INFO] Spending summary: {spending}")
         
-        # Export transactions to CSV and read content
-        print("[INFO] Exporting transactions to CSV...")
-        csv_path = export_transactions_to_csv(user_id)
-        csv_content = ""
+        # Summarize transactions within the prompt token budget
+        print("[INFO] Building transaction context...")
+        context = get_transactions_context(user_id)
         
-        if csv_path:
-            try:
-                with open(csv_path, 'r', encoding='utf-8') as f:
-                    csv_content = f.read()
-                print(f"[INFO] CSV content loaded ({len(csv_content)} chars)")
-            except Exception as e:
-                print(f"[ERROR] Failed to read CSV: {e}")
-                csv_content = "Transaction data not available"
+        if context:
+            print(f"[INFO] Transaction context built ({len(context)} chars)")
         else:
-            print("[WARN] Could not generate CSV, continuing without it")
-            csv_content = "Transaction data not available"
+            print("[WARN] Could not build transaction context, continuing without it")
+            context = "Transaction data not available"
         
-        # Create and run crew with CSV content
-        task = create_multi_goal_plan_task(goals, spending, csv_content)
+        # Create and run crew with the transaction context
+        from crewai import Crew
+        
+        task = create_multi_goal_plan_task(goals, spending, context)
         crew = Crew(
-            agents=[budget_planner_agent],
+            agents=[get_budget_planner_agent()],
             tasks=[task],
             verbose=True,
         )
         
         print("[INFO] Running budget planner agent...")
-        result = crew.kickoff()
+        with llm_limiter.slot(user_id, 'budget'):
+            result = crew.kickoff()
         
         if result:
             plan_text = result.raw if hasattr(result, 'raw') else str(result)
             
-            return {
+            plan = {
                 "success": True,
                 "goalsCount": len(goals),
                 "goals": goals,
                 "spendingSummary": spending,
                 "plan": str(plan_text).strip()
             }
+            if cache_key:
+                result_cache.set(user_id, 'budget', cache_key, plan)
+            return plan
         
         return {"success": False, "error": "Failed to generate plan"}
         
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"[ERROR] Budget planning failed: {str(e)}")
         import traceback
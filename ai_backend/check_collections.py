@@ -1,36 +1,214 @@
-import pymongo
-import os
-from dotenv import load_dotenv
-
-# Load environment variables from backend/.env
-dotenv_path = os.path.join(os.path.dirname(__file__), '..', 'backend', '.env')
-load_dotenv(dotenv_path)
-
-# MongoDB connection
-MONGO_URI = os.getenv('MONGODB_URI')
-
-try:
-    client = pymongo.MongoClient(MONGO_URI)
-    db = client['financebot']
-    
-    print("✅ Connected to financebot database")
-    print(f"\n📊 Collections in financebot database:")
-    collections = db.list_collection_names()
-    for collection in collections:
-        count = db[collection].count_documents({})
-        print(f"  - {collection}: {count} documents")
-    
-    # Check each collection for sample data
-    print("\n" + "="*50)
-    for collection in collections:
-        count = db[collection].count_documents({})
-        if count > 0:
-            print(f"\n📋 Sample from '{collection}' collection:")
-            sample = db[collection].find_one({})
+#!/usr/bin/env python3
+"""
+Diagnostics for the financebot database
+Prints estimated document counts, data and index sizes, index usage, and the
+query plans of the queries the AI backend issues, and flags compound indexes
+those queries need but the collections lack
+
+Usage:
+    python check_collections.py [--user-id USER_ID] [--samples]
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bson.objectid import ObjectId
+
+from budgetPlanner import GOALS_SORT, active_goals_query
+from db import DB_NAME, close_client, get_db
+from export_transactions_to_csv import EXPORT_PROJECTION, export_filter
+
+IndexKey = List[Tuple[str, int]]
+
+# Indexes the backend's queries rely on; equality fields first, then the sort or range field
+RECOMMENDED_INDEXES: Dict[str, List[IndexKey]] = {
+    'transactions': [
+        [('userId', 1), ('date', -1)],    # per-user export, newest first
+        [('userId', 1), ('_id', 1)],      # export cache sync past the _id watermark
+        [('userId', 1), ('fingerprint', 1)],  # blocks already imported, skipped on re-upload
+        [('userId', 1), ('updatedAt', 1)],    # export cache sync looking for edited rows
+    ],
+    'budgets': [
+        [('userId', 1), ('status', 1), ('deadline', 1)],  # active goals by deadline
+    ],
+}
+
+
+def backend_queries(user_id: str) -> List[Dict]:
+    """The find() calls budgetPlanner, the exporter and the HTML import make for one user"""
+    user_oid = ObjectId(user_id)
+    # A watermark a day old, as a cache synced yesterday would have
+    watermark = ObjectId.from_datetime(datetime.now() - timedelta(days=1))
+    return [
+        {'name': 'export cache sync', 'collection': 'transactions',
+         'filter': export_filter(user_id, after_id=watermark), 'projection': EXPORT_PROJECTION},
+        {'name': 'edited since last sync', 'collection': 'transactions',
+         'filter': {'userId': user_oid, '_id': {'$lte': watermark},
+                    'updatedAt': {'$gt': datetime.now() - timedelta(days=1)}},
+         'projection': {'_id': 1}},
+        {'name': 'imported fingerprints', 'collection': 'transactions',
+         'filter': {'userId': user_oid, 'fingerprint': {'$exists': True}}, 'projection': {'_id': 0, 'fingerprint': 1}},
+        {'name': 'active goals by deadline', 'collection': 'budgets',
+         'filter': active_goals_query(user_oid), 'sort': GOALS_SORT},
+        {'name': 'export (all)', 'collection': 'transactions',
+         'filter': export_filter(user_id), 'projection': EXPORT_PROJECTION},
+        {'name': 'export (30-day window)', 'collection': 'transactions',
+         'filter': export_filter(user_id, since=datetime.now() - timedelta(days=30)),
+         'projection': EXPORT_PROJECTION, 'sort': [('userId', 1), ('date', -1)]},
+    ]
+
+
+def format_bytes(size: Optional[float]) -> str:
+    if size is None:
+        return 'n/a'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def plan_stages(plan: Dict) -> List[Dict]:
+    """Stages of a winning plan from the root down, following every input"""
+    stages = [plan]
+    for child in [plan.get('inputStage')] + plan.get('inputStages', []):
+        if child:
+            stages.extend(plan_stages(child))
+    return stages
+
+
+def summarize_explain(explain: Dict) -> Dict:
+    """The parts of an explain() result that tell whether a query is indexed"""
+    winning = explain.get('queryPlanner', {}).get('winningPlan', {})
+    # Slot-based engine plans (MongoDB 7+) nest the classic tree under queryPlan
+    stages = plan_stages(winning.get('queryPlan', winning))
+    names = [stage.get('stage') for stage in stages]
+    stats = explain.get('executionStats', {})
+    return {
+        'stages': names,
+        'indexes': [stage['indexName'] for stage in stages if 'indexName' in stage],
+        'collscan': 'COLLSCAN' in names,
+        'inMemorySort': 'SORT' in names,
+        'keysExamined': stats.get('totalKeysExamined'),
+        'docsExamined': stats.get('totalDocsExamined'),
+        'returned': stats.get('nReturned'),
+        'millis': stats.get('executionTimeMillis'),
+    }
+
+
+def missing_indexes(index_information: Dict, recommended: Sequence[IndexKey]) -> List[IndexKey]:
+    """Recommended keys that no existing index starts with"""
+    # Directions may come back as floats, or as strings for text and geo indexes
+    existing = [[(field, direction if isinstance(direction, str) else int(direction))
+                 for field, direction in index['key']]
+                for index in index_information.values()]
+    return [
+        list(wanted) for wanted in recommended
+        if not any(key[:len(wanted)] == list(wanted) for key in existing)
+    ]
+
+
+def create_index_command(collection: str, key: IndexKey) -> str:
+    fields = ', '.join(f"{field}: {direction}" for field, direction in key)
+    return f"db.{collection}.createIndex({{ {fields} }})"
+
+
+def collection_stats(db, name: str) -> Dict:
+    """Sizes from $collStats; empty when the server or user does not allow it"""
+    try:
+        stats = next(db[name].aggregate([{'$collStats': {'storageStats': {}}}]))['storageStats']
+    except Exception as e:
+        print(f"[WARN] No storage stats for {name}: {e}")
+        return {}
+    return stats
+
+
+def index_usage(db, name: str) -> Dict[str, int]:
+    """Operations served by each index since the server started, from $indexStats"""
+    try:
+        return {index['name']: index['accesses']['ops'] for index in db[name].aggregate([{'$indexStats': {}}])}
+    except Exception as e:
+        print(f"[WARN] No index usage for {name}: {e}")
+        return {}
+
+
+def explain_query(db, query: Dict) -> Dict:
+    cursor = db[query['collection']].find(query['filter'], query.get('projection'))
+    if query.get('sort'):
+        cursor = cursor.sort(query['sort'])
+    return summarize_explain(cursor.explain())
+
+
+def print_collections(db, samples: bool = False):
+    print(f"\n📊 Collections in {DB_NAME} database:")
+    for name in sorted(db.list_collection_names()):
+        stats = collection_stats(db, name)
+        usage = index_usage(db, name)
+        print(f"\n  - {name}: ~{db[name].estimated_document_count():,} documents, "
+              f"data {format_bytes(stats.get('size'))}, storage {format_bytes(stats.get('storageSize'))}, "
+              f"indexes {format_bytes(stats.get('totalIndexSize'))}")
+        for index_name, index in db[name].index_information().items():
+            size = format_bytes(stats.get('indexSizes', {}).get(index_name))
+            ops = usage.get(index_name, 'n/a')
+            print(f"      index {index_name} {dict(index['key'])}: {size}, {ops} ops")
+
+        if samples:
+            sample = db[name].find_one({})
             if sample:
-                print(f"  Keys: {list(sample.keys())}")
-                print(f"  Sample: {str(sample)[:200]}...")
-    
-    client.close()
-except Exception as e:
-    print(f"❌ Error: {e}")
+                print(f"      Keys: {list(sample.keys())}")
+                print(f"      Sample: {str(sample)[:200]}...")
+
+
+def print_query_plans(db, user_id: str):
+    print(f"\n🔎 Query plans for user {user_id}:")
+    for query in backend_queries(user_id):
+        summary = explain_query(db, query)
+        indexes = ', '.join(summary['indexes']) or 'none'
+        print(f"\n  - {query['name']} on {query['collection']}: {' <- '.join(summary['stages'])}")
+        print(f"      index {indexes}; {summary['keysExamined']} keys and {summary['docsExamined']} docs "
+              f"examined for {summary['returned']} returned in {summary['millis']} ms")
+        if summary['collscan']:
+            print("      [WARN] Collection scan")
+        if summary['inMemorySort']:
+            print("      [WARN] Sorted in memory instead of by an index")
+
+
+def print_missing_indexes(db):
+    print("\n🧭 Recommended indexes:")
+    missing_any = False
+    for name, recommended in RECOMMENDED_INDEXES.items():
+        for key in missing_indexes(db[name].index_information(), recommended):
+            missing_any = True
+            print(f"  [WARN] {name} has no index on {dict(key)}: {create_index_command(name, key)}")
+    if not missing_any:
+        print("  ✅ Every recommended index exists")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--user-id', help="User whose queries are explained (default: latest transaction's user)")
+    arg_parser.add_argument('--samples', action='store_true', help="Print one document from each collection")
+    args = arg_parser.parse_args()
+
+    try:
+        db = get_db()
+        print(f"✅ Connected to {DB_NAME} database")
+        print_collections(db, args.samples)
+
+        user_id = args.user_id
+        if not user_id:
+            latest = db['transactions'].find_one({}, {'userId': 1}, sort=[('_id', -1)])
+            user_id = str(latest['userId']) if latest else None
+        if user_id:
+            print_query_plans(db, user_id)
+        else:
+            print("\n[INFO] No transactions, skipping query plans")
+
+        print_missing_indexes(db)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        close_client()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Process-wide MongoDB client shared by every ai_backend module
+The client is created on first use with pool limits and timeouts taken from
+the environment, and records how long requests wait to check out a connection
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import pymongo
+from pymongo import monitoring
+from dotenv import load_dotenv
+
+# ai_backend/.env first, then backend/.env for anything it leaves unset
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'backend', '.env'))
+
+MONGO_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/financebot')
+DB_NAME = 'financebot'
+
+# MongoClient option -> (environment variable, default)
+POOL_SETTINGS = {
+    'maxPoolSize': ('MONGO_MAX_POOL_SIZE', 50),
+    'minPoolSize': ('MONGO_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', 300000),
+    'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000),
+    'connectTimeoutMS': ('MONGO_CONNECT_TIMEOUT_MS', 5000),
+    'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+    'socketTimeoutMS': ('MONGO_SOCKET_TIMEOUT_MS', 30000),
+}
+
+
+def pool_options() -> Dict[str, int]:
+    """MongoClient keyword arguments for the pool, with environment overrides applied"""
+    options = {}
+    for option, (env_name, default) in POOL_SETTINGS.items():
+        value = os.getenv(env_name)
+        try:
+            options[option] = int(value) if value else default
+        except ValueError:
+            print(f"[WARN] Ignoring non-integer {env_name}={value!r}, using {default}")
+            options[option] = default
+    return options
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection checkout counts and wait times, fed by pymongo's pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Checkouts happen on the requesting thread, so the start time is kept per thread
+        self._started = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.failed_checkouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.open_connections = 0
+            self.in_use = 0
+
+    def _waited(self) -> float:
+        started = getattr(self._started, 'value', None)
+        self._started.value = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._started.value = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = self._waited()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def connection_check_out_failed(self, event):
+        wait = self._waited()
+        with self._lock:
+            self.failed_checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            attempts = self.checkouts + self.failed_checkouts
+            return {
+                'checkouts': self.checkouts,
+                'failedCheckouts': self.failed_checkouts,
+                'avgWaitMs': round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                'maxWaitMs': round(self.max_wait * 1000, 3),
+                'openConnections': self.open_connections,
+                'inUse': self.in_use,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+_client: Optional[pymongo.MongoClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> pymongo.MongoClient:
+    """The shared client, created on first call; pymongo pools connections inside it"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = pymongo.MongoClient(MONGO_URI, event_listeners=[pool_metrics], **pool_options())
+    return _client
+
+
+def get_db(name: str = DB_NAME):
+    return get_client()[name]
+
+
+def health_check() -> Dict:
+    """Ping the server through the shared pool; never raises"""
+    start = time.perf_counter()
+    try:
+        get_client().admin.command('ping')
+        status = {'ok': True, 'latencyMs': round((time.perf_counter() - start) * 1000, 3)}
+    except Exception as e:
+        status = {'ok': False, 'error': str(e)}
+    status['pool'] = pool_metrics.snapshot()
+    return status
+
+
+def close_client():
+    """Close the shared client, e.g. at the end of a script; the next get_client() reconnects"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -1,129 +1,288 @@
-import pymongo
+import argparse
 import pandas as pd
 import os
-import sys
-from datetime import datetime
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Union
 from bson.objectid import ObjectId
-from dotenv import load_dotenv
 
-# Load environment variables from backend/.env
-dotenv_path = os.path.join(os.path.dirname(__file__), '..', 'backend', '.env')
-load_dotenv(dotenv_path)
+from db import DB_NAME, MONGO_URI, get_db
 
-# MongoDB connection - use MONGODB_URI from backend/.env
-MONGO_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/financebot')
-DB_NAME = 'financebot'
 COLLECTION_NAME = 'transactions'
 
-def export_transactions_to_csv(user_id: str = None):
+# Export column order, which is also everything the export reads from MongoDB
+EXPORT_COLUMNS = [
+    '_id', 'userId', 'type', 'amount', 'currency', 'category', 'description',
+    'recipient', 'paymentMethod', 'accountNumber', 'transactionId', 'status',
+    'date', 'walletAddress', 'blockchainTxHash', 'tags', 'UPI', 'UserInput',
+    'htmlFile', '__v'
+]
+
+# Integer fields; nullable so a batch with a missing value still prints 1, not 1.0
+INTEGER_COLUMNS = ['UPI', 'UserInput', '__v']
+
+# Documents fetched from the cursor and converted per step when streaming
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+
+# htmlFile.content holds the whole uploaded HTML page, so only its name and
+# upload date are fetched
+EXPORT_PROJECTION = {
+    **{col: 1 for col in EXPORT_COLUMNS if col != 'htmlFile'},
+    'htmlFile.fileName': 1,
+    'htmlFile.uploadDate': 1,
+}
+
+def user_filter(user_id: Optional[str] = None) -> dict:
+    """Query filter for one user's transactions, or all of them without a valid user_id"""
+    if not user_id:
+        return {}
+    try:
+        return {'userId': ObjectId(user_id)}
+    except Exception as e:
+        print(f"[WARN] Invalid user_id format: {user_id}, fetching all transactions: {e}")
+        return {}
+
+def export_filter(user_id: Optional[str] = None, since: Optional[datetime] = None,
+                  until: Optional[datetime] = None, after_id: Optional[ObjectId] = None) -> dict:
     """
-    Fetch transactions from MongoDB, convert to DataFrame, and export to CSV
-    If user_id is provided, filter transactions for that user only
+    user_filter narrowed to transactions dated in [since, until) and, for
+    incremental exports, to documents inserted after the after_id watermark
+    """
+    query = user_filter(user_id)
+    if since is not None or until is not None:
+        query['date'] = {}
+        if since is not None:
+            query['date']['$gte'] = since
+        if until is not None:
+            query['date']['$lt'] = until
+    if after_id is not None:
+        query['_id'] = {'$gt': after_id}
+    return query
+
+def find_transactions(user_id: Optional[str] = None, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None, after_id: Optional[ObjectId] = None,
+                      batch_size: int = 0):
+    """Cursor over the export's projection of the matching transactions"""
+    query = export_filter(user_id, since, until, after_id)
+    cursor = get_db()[COLLECTION_NAME].find(query, EXPORT_PROJECTION, batch_size=batch_size)
+    if 'userId' in query and 'date' in query:
+        # Served by the {userId: 1, date: -1} index: equality on userId, then
+        # the date range read newest first without an in-memory sort
+        cursor = cursor.sort([('userId', 1), ('date', -1)])
+    elif 'userId' in query and after_id is not None:
+        # Served by the {userId: 1, _id: 1} index, reading only past the watermark
+        cursor = cursor.sort([('userId', 1), ('_id', 1)])
+    return cursor
+
+def count_transactions(user_id: Optional[str] = None) -> int:
+    return get_db()[COLLECTION_NAME].count_documents(user_filter(user_id))
+
+def latest_update(user_id: Optional[str] = None) -> Optional[datetime]:
+    """
+    The newest updatedAt among the transactions; mongoose sets it on every
+    save and findByIdAndUpdate. Served by the {userId: 1, updatedAt: 1} index
+    """
+    document = get_db()[COLLECTION_NAME].find_one(user_filter(user_id), {'_id': 0, 'updatedAt': 1},
+                                                  sort=[('updatedAt', -1)])
+    return document.get('updatedAt') if document else None
+
+def has_updates(user_id: Optional[str], up_to_id: ObjectId, updated_after: Optional[datetime]) -> bool:
+    """Whether a transaction at or below the up_to_id watermark was updated after updated_after"""
+    query = user_filter(user_id)
+    query['_id'] = {'$lte': up_to_id}
+    query['updatedAt'] = {'$gt': updated_after} if updated_after is not None else {'$exists': True}
+    return get_db()[COLLECTION_NAME].find_one(query, {'_id': 1}) is not None
+
+def _count_where(field: str, value) -> dict:
+    return {'$sum': {'$cond': [{'$eq': [f'${field}', value]}, 1, 0]}}
+
+def summary_pipeline(query_filter: dict) -> List[dict]:
+    """Aggregation computing the export's summary statistics on the server"""
+    return [
+        {'$match': query_filter},
+        {'$group': {
+            '_id': None,
+            'total': {'$sum': 1},
+            'income': _count_where('type', 'income'),
+            'expenses': _count_where('type', 'expense'),
+            'totalAmount': {'$sum': '$amount'},
+            'htmlImports': _count_where('UPI', 1),
+            'manualInputs': _count_where('UserInput', 1),
+        }},
+        {'$project': {'_id': 0}},
+    ]
+
+def summary_statistics(user_id: Optional[str] = None, since: Optional[datetime] = None,
+                       until: Optional[datetime] = None) -> dict:
+    """Transaction counts and total amount, without fetching any documents"""
+    collection = get_db()[COLLECTION_NAME]
+    result = next(collection.aggregate(summary_pipeline(export_filter(user_id, since, until))), None)
+    return result or {
+        'total': 0, 'income': 0, 'expenses': 0, 'totalAmount': 0,
+        'htmlImports': 0, 'manualInputs': 0,
+    }
+
+def has_transactions(user_id: Optional[str] = None, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> bool:
+    return get_db()[COLLECTION_NAME].find_one(export_filter(user_id, since, until), {'_id': 1}) is not None
+
+def documents_to_frame(documents: List[dict]) -> pd.DataFrame:
+    """
+    Convert one batch of documents to the export columns with column-wise
+    operations. Every export column is present, so all batches share a header.
+    """
+    df = pd.DataFrame.from_records(documents, columns=EXPORT_COLUMNS)
+    
+    for col in ('_id', 'userId'):
+        df[col] = df[col].map(str, na_action='ignore')
+    
+    # Columns with no value in this batch come back as all-NaN floats
+    if df['tags'].dtype == object:
+        df['tags'] = df['tags'].str.join(',')
+    
+    if df['htmlFile'].dtype == object:
+        html_file = df['htmlFile']
+        name = html_file.str.get('fileName').fillna('').astype(str)
+        upload_date = html_file.str.get('uploadDate').map(str, na_action='ignore').fillna('')
+        df['htmlFile'] = (name + ' (' + upload_date + ')').where(html_file.notna())
+    
+    for col in INTEGER_COLUMNS:
+        try:
+            df[col] = df[col].astype('Int64')
+        except (TypeError, ValueError):
+            pass
+    
+    return df
+
+def iter_frames(documents: Iterable[dict], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """documents_to_frame over consecutive batches of batch_size documents"""
+    documents = iter(documents)
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return
+        yield documents_to_frame(batch)
+
+def write_csv_frames(frames: Iterable[pd.DataFrame], out: IO[str]) -> int:
+    """Write export frames to out one after another under one header; returns the rows written"""
+    rows = 0
+    for frame in frames:
+        frame.to_csv(out, index=False, header=rows == 0)
+        rows += len(frame)
+    
+    if rows == 0:
+        pd.DataFrame(columns=EXPORT_COLUMNS).to_csv(out, index=False)
+    return rows
+
+def fetch_transactions_dataframe(user_id: Optional[str] = None, since: Optional[datetime] = None,
+                                 until: Optional[datetime] = None, columns: Optional[List[str]] = None,
+                                 batch_size: int = EXPORT_BATCH_SIZE) -> Optional[pd.DataFrame]:
+    """
+    Load a user's transactions (everyone's without user_id), optionally only
+    those dated in [since, until), into a DataFrame of the export columns, or
+    only of columns. Documents are converted batch_size at a time, so just the
+    resulting frame grows with the history. Returns None when there are none.
+    Nothing is written to disk, so concurrent requests never share state.
+    """
+    cursor = find_transactions(user_id, since, until, batch_size=batch_size)
+    try:
+        frames = [frame if columns is None else frame[columns] for frame in iter_frames(cursor, batch_size)]
+    finally:
+        cursor.close()
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+def write_csv_batches(documents: Iterable[dict], out: IO[str], batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    """
+    Write documents to out as CSV, batch_size at a time, so memory stays bounded
+    by one batch however many documents there are. Returns the rows written.
+    """
+    return write_csv_frames(iter_frames(documents, batch_size), out)
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', **open_kwargs) -> Iterator[IO]:
+    """
+    Write to a private temp file beside path and rename it over path when the
+    block finishes, so readers see either the old file or the complete new one
+    and concurrent writers never interleave. The temp file is removed on error.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def stream_transactions_csv(out: Union[str, IO[str]], user_id: Optional[str] = None,
+                            batch_size: int = EXPORT_BATCH_SIZE, since: Optional[datetime] = None,
+                            until: Optional[datetime] = None) -> int:
+    """
+    Stream a user's transactions (everyone's without user_id), optionally only
+    those dated in [since, until), from the cursor straight into a CSV file path
+    or text stream. Returns the rows written. A path only appears once the
+    whole export is written.
+    """
+    cursor = find_transactions(user_id, since, until, batch_size=batch_size)
+    try:
+        if isinstance(out, str):
+            with atomic_write(out, encoding='utf-8', newline='') as f:
+                return write_csv_batches(cursor, f, batch_size)
+        return write_csv_batches(cursor, out, batch_size)
+    finally:
+        cursor.close()
+
+def export_transactions_to_csv(user_id: str = None, csv_filepath: str = None,
+                               since: datetime = None, until: datetime = None):
+    """
+    Stream transactions from MongoDB to a CSV file in batches
+    If user_id is provided, filter transactions for that user only;
+    since/until limit the export to a date window
     """
     try:
-        # Connect to MongoDB
-        client = pymongo.MongoClient(MONGO_URI)
-        db = client[DB_NAME]
-        collection = db[COLLECTION_NAME]
-        
         print(f"Connecting to MongoDB: {MONGO_URI}")
         print(f"Database: {DB_NAME}, Collection: {COLLECTION_NAME}")
-        
-        # Build query filter
-        query_filter = {}
         if user_id:
-            try:
-                user_oid = ObjectId(user_id)
-                query_filter = {'userId': user_oid}
-                print(f"Filtering transactions for user_id: {user_id}")
-            except Exception as e:
-                print(f"[WARN] Invalid user_id format: {user_id}, fetching all transactions: {e}")
+            print(f"Filtering transactions for user_id: {user_id}")
+        if since or until:
+            print(f"Date window: {since or 'start'} to {until or 'now'}")
         
-        # Fetch transactions with optional user filter
-        transactions = list(collection.find(query_filter))
+        # Default file name is consistent (overwrites previous, atomically); the
+        # agents read the per-user Arrow cache instead and never touch this file
+        if csv_filepath is None:
+            csv_filepath = os.path.join(os.path.dirname(__file__), "transactions_export.csv")
         
-        if not transactions:
+        # Checked first so an empty query leaves the previous export in place
+        if not has_transactions(user_id, since, until):
             print("No transactions found in the database.")
             return
         
-        print(f"Found {len(transactions)} transactions")
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(transactions)
-        
-        # Clean up MongoDB-specific fields for CSV
-        # Convert ObjectId to string
-        if '_id' in df.columns:
-            df['_id'] = df['_id'].astype(str)
-        if 'userId' in df.columns:
-            df['userId'] = df['userId'].astype(str)
-        
-        # Flatten nested objects (htmlFile object)
-        if 'htmlFile' in df.columns:
-            htmlFile_data = []
-            for hf in df['htmlFile']:
-                if pd.isna(hf) or hf is None:
-                    htmlFile_data.append(None)
-                elif isinstance(hf, dict):
-                    # Store only fileName and uploadDate, skip content
-                    htmlFile_data.append(f"{hf.get('fileName', '')} ({hf.get('uploadDate', '')})")
-                else:
-                    htmlFile_data.append(str(hf))
-            df['htmlFile'] = htmlFile_data
-        
-        # Convert tags array to string
-        if 'tags' in df.columns:
-            df['tags'] = df['tags'].apply(lambda x: ','.join(x) if isinstance(x, list) else x)
-        
-        # Convert datetime objects to string
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                try:
-                    df[col] = df[col].apply(lambda x: x.isoformat() if isinstance(x, datetime) else x)
-                except:
-                    pass
-        
-        # Reorder columns for better readability
-        preferred_order = [
-            '_id', 'userId', 'type', 'amount', 'currency', 'category', 'description',
-            'recipient', 'paymentMethod', 'accountNumber', 'transactionId', 'status',
-            'date', 'walletAddress', 'blockchainTxHash', 'tags', 'UPI', 'UserInput',
-            'htmlFile', '__v'
-        ]
-        
-        # Only include columns that exist
-        available_cols = [col for col in preferred_order if col in df.columns]
-        other_cols = [col for col in df.columns if col not in preferred_order]
-        df = df[available_cols + other_cols]
-        
-        # Create CSV file with consistent name (overwrites previous)
-        csv_filename = "transactions_export.csv"
-        csv_filepath = os.path.join(os.path.dirname(__file__), csv_filename)
-        
-        # Export to CSV
-        df.to_csv(csv_filepath, index=False, encoding='utf-8')
+        # Stream to CSV in batches rather than loading every document at once
+        rows = stream_transactions_csv(csv_filepath, user_id, since=since, until=until)
         
+        print(f"Found {rows} transactions")
         print("\n[SUCCESS] CSV exported successfully!")
         print(f"File: {csv_filepath}")
-        print(f"Total rows: {len(df)}")
-        print(f"Total columns: {len(df.columns)}")
-        print(f"\nColumns: {', '.join(df.columns.tolist())}")
+        print(f"Total rows: {rows}")
+        print(f"Total columns: {len(EXPORT_COLUMNS)}")
+        print(f"\nColumns: {', '.join(EXPORT_COLUMNS)}")
         
-        # Print summary statistics
+        # Print summary statistics, computed by MongoDB
+        stats = summary_statistics(user_id, since, until)
         print("\n[STATS] Summary Statistics:")
-        print(f"  Total Transactions: {len(df)}")
-        if 'type' in df.columns:
-            print(f"  Income: {len(df[df['type'] == 'income'])}")
-            print(f"  Expenses: {len(df[df['type'] == 'expense'])}")
-        if 'amount' in df.columns:
-            print(f"  Total Amount: {df['amount'].sum()}")
-        if 'UPI' in df.columns and 'UserInput' in df.columns:
-            upi_count = (df['UPI'] == 1).sum()
-            user_input_count = (df['UserInput'] == 1).sum()
-            print(f"  HTML Imports (UPI=1): {upi_count}")
-            print(f"  Manual Inputs (UserInput=1): {user_input_count}")
+        print(f"  Total Transactions: {stats['total']}")
+        print(f"  Income: {stats['income']}")
+        print(f"  Expenses: {stats['expenses']}")
+        print(f"  Total Amount: {stats['totalAmount']}")
+        print(f"  HTML Imports (UPI=1): {stats['htmlImports']}")
+        print(f"  Manual Inputs (UserInput=1): {stats['manualInputs']}")
         
-        client.close()
         return csv_filepath
         
     except Exception as e:
@@ -133,6 +292,13 @@ def export_transactions_to_csv(user_id: str = None):
         raise
 
 if __name__ == '__main__':
-    # Get user_id from command line argument if provided
-    user_id = sys.argv[1] if len(sys.argv) > 1 else None
-    export_transactions_to_csv(user_id)
+    arg_parser = argparse.ArgumentParser(description="Export transactions from MongoDB to CSV")
+    arg_parser.add_argument('user_id', nargs='?', help="Only this user's transactions")
+    arg_parser.add_argument('csv_filepath', nargs='?', help="Output file (default transactions_export.csv)")
+    arg_parser.add_argument('--since', type=datetime.fromisoformat, help="First date to include, e.g. 2025-11-01")
+    arg_parser.add_argument('--until', type=datetime.fromisoformat, help="Date to stop before")
+    arg_parser.add_argument('--days', type=int, help="Only the last N days; overrides --since")
+    args = arg_parser.parse_args()
+    
+    since = datetime.now() - timedelta(days=args.days) if args.days else args.since
+    export_transactions_to_csv(args.user_id, args.csv_filepath, since, args.until)
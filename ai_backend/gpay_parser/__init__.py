@@ -0,0 +1,18 @@
+"""
+Google Pay "My Activity" export parser shared by the ai_backend entry points
+
+    parser = FlexibleGooglePayParser()
+    parser.parse(FileSource(path), JsonFormatter())      # JSON text for Node.js
+    parser.parse(HtmlSource(html), DataFrameFormatter())  # DataFrame for analysis
+"""
+from .engine import FlexibleGooglePayParser
+from .formatters import (
+    STANDARD_COLUMNS, BatchFormatter, CsvFormatter, DataFrameFormatter, JsonFormatter, ListFormatter,
+)
+from .sources import BlockListSource, BlockSource, FileSource, HtmlSource
+
+__all__ = [
+    'FlexibleGooglePayParser',
+    'STANDARD_COLUMNS', 'BatchFormatter', 'CsvFormatter', 'DataFrameFormatter', 'JsonFormatter', 'ListFormatter',
+    'BlockListSource', 'BlockSource', 'FileSource', 'HtmlSource',
+]
@@ -0,0 +1,271 @@
+"""
+Extraction engine shared by parse_html_to_json.py (JSON for Node.js) and
+flexible_parser.py (DataFrames for analysis)
+"""
+import hashlib
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from timestamp_decoder import TimestampDecoder
+from transaction_batch import FIELDS, TransactionBatch
+
+from .formatters import STANDARD_COLUMNS, BatchFormatter, ListFormatter
+from .sources import FileSource, HtmlSource, as_source
+
+class FlexibleGooglePayParser:
+    """Parser for Google Pay HTML exports with flexible regex-based extraction"""
+    
+    STANDARD_COLUMNS = STANDARD_COLUMNS
+    
+    CURRENCY_MAP = {'₹': 'INR', '€': 'EUR', '$': 'USD', '£': 'GBP'}
+    STATUSES = ['Completed', 'Pending', 'Failed', 'Cancelled', 'Processing']
+    
+    patterns = {
+        'amount': r'(₹|€|\$|£)\s*([\d,]+\.?\d*)',
+        'recipient': r'(?:Paid|Sent|Received)\s+[₹€$£][\d.,]+\s+(?:to|from|by)\s+([^\n<]+?)(?:\s+using|\s+via|<br|\n|$)',
+        'payment_method': r'(?:using|via|through)\s+([^<\n]+?)(?:\s+(?:XXXXXXX|XXXX)|<br|\n|$)',
+        'account_number': r'(XXXXXXX[A-Z0-9]{6,}|[A-Z0-9]{4}XXXXXXX[A-Z0-9]{4}|XXX\d+)',
+        'status': r'(?:Status|State)[:\s]*(?:</b><br\s*/>&emsp;)?(\w+)(?:<br|$)',
+    }
+    
+    # Compiled once per process. Every extractor starts its pattern at a
+    # literal anchor the match must contain, so the markup that makes up
+    # most of an export cell is skipped at str.find speed instead of being
+    # rescanned by each regex.
+    _TRANSACTION_RE = re.compile(r'(Paid|Sent|Received|Credited)')
+    _AMOUNT_RE = re.compile(patterns['amount'])
+    _CURRENCY_SYMBOL_RE = re.compile(r'[₹€$£]')
+    _RECIPIENT_RE = re.compile(patterns['recipient'], re.IGNORECASE)
+    _PAYMENT_METHOD_RE = re.compile(patterns['payment_method'])
+    _ACCOUNT_NUMBER_RE = re.compile(patterns['account_number'])
+    _STATUS_RE = re.compile(patterns['status'])
+    _TXN_ID_RE = re.compile(r'<b>Details:</b\s*><br\s*/>&emsp;([A-Za-z0-9]+)')
+    _TXN_ID_FALLBACK_RE = re.compile(r'Details\s*:?<br\s*/>&emsp;([A-Za-z0-9]{6,})')
+    _PRODUCT_RE = re.compile(r'<b>Products:</b><br\s*/>&emsp;([^\n<]+)')
+    _BR_SPACE_RE = re.compile(r'\s*<br\s*/?>\s*')
+    _BR_RE = re.compile(r'<br\s*/?>')
+    _EMSP_RE = re.compile(r'&emsp;')
+    _METHOD_SUFFIX_RE = re.compile(r'\s+(using|via|through).*', re.IGNORECASE)
+    _MASKED_ACCOUNT_RE = re.compile(r'\s+XXXXXXX[A-Z0-9]{6,}')
+    _MASKED_CARD_RE = re.compile(r'\s+[A-Z0-9]{4}XXXXXXX[A-Z0-9]{4}')
+    
+    # Longest and shortest verbs _RECIPIENT_RE accepts ("Received", "Paid"/"Sent")
+    _VERB_LENGTHS = (8, 4)
+    
+    def __init__(self):
+        # Remembers the export's timestamp layout from one block to the next
+        self.timestamp_decoder = TimestampDecoder()
+    
+    @staticmethod
+    def _run_start(text: str, pos: int, predicate) -> int:
+        """Return the start of the run of characters matching predicate that ends at pos"""
+        while pos > 0 and predicate(text[pos - 1]):
+            pos -= 1
+        return pos
+    
+    @staticmethod
+    def _is_word(char: str) -> bool:
+        return char.isalnum() or char == '_'
+    
+    def extract_amount(self, text: str) -> Tuple[Optional[float], Optional[str]]:
+        match = self._AMOUNT_RE.search(text)
+        if match:
+            try:
+                amount = float(match.group(2).replace(',', ''))
+                currency = self.CURRENCY_MAP.get(match.group(1), match.group(1))
+                return amount, currency
+            except ValueError:
+                pass
+        return None, None
+    
+    def _find_recipient(self, text: str):
+        # A recipient match is "<verb><whitespace><currency symbol>...", so the
+        # only places it can start are a verb's length before the whitespace
+        # that precedes each currency symbol.
+        for symbol in self._CURRENCY_SYMBOL_RE.finditer(text):
+            gap = self._run_start(text, symbol.start(), str.isspace)
+            if gap == symbol.start():
+                continue
+            for verb_length in self._VERB_LENGTHS:
+                if gap >= verb_length:
+                    match = self._RECIPIENT_RE.match(text, gap - verb_length)
+                    if match:
+                        return match
+        return None
+    
+    def extract_recipient(self, text: str) -> Optional[str]:
+        match = self._find_recipient(text)
+        if match:
+            recipient = match.group(1).strip()
+            recipient = self._BR_SPACE_RE.sub(' ', recipient)
+            recipient = self._EMSP_RE.sub('', recipient)
+            recipient = self._METHOD_SUFFIX_RE.sub('', recipient)
+            return recipient.strip() if recipient else None
+        return None
+    
+    def extract_payment_method(self, text: str) -> Optional[str]:
+        match = self._PAYMENT_METHOD_RE.search(text)
+        if match:
+            method = match.group(1).strip()
+            method = self._MASKED_ACCOUNT_RE.sub('', method)
+            method = self._MASKED_CARD_RE.sub('', method)
+            method = ' '.join(method.split())
+            return method if method else None
+        return None
+    
+    def extract_account_number(self, text: str) -> Optional[str]:
+        # Every accepted form has "XXX" within its first five characters
+        anchor = text.find('XXX')
+        if anchor < 0:
+            return None
+        match = self._ACCOUNT_NUMBER_RE.search(text, max(anchor - 4, 0))
+        return match.group(1).strip() if match else None
+    
+    def extract_transaction_id(self, text: str) -> Optional[str]:
+        anchor = text.find('Details')
+        if anchor < 0:
+            return None
+        
+        match = self._TXN_ID_RE.search(text, max(anchor - 3, 0))
+        if match:
+            tid = match.group(1).strip()
+            return tid if len(tid) > 3 else None
+        
+        match = self._TXN_ID_FALLBACK_RE.search(text, anchor)
+        if match:
+            return match.group(1).strip()
+        
+        return None
+    
+    def extract_status(self, text: str) -> Optional[str]:
+        for status in self.STATUSES:
+            if status in text:
+                return status
+        
+        match = self._STATUS_RE.search(text)
+        return match.group(1).strip() if match else None
+    
+    def extract_timestamp(self, text: str) -> Optional[str]:
+        """ISO 8601 timestamp keeping the export's GMT offset, e.g. 2024-07-28T16:24:58+05:30"""
+        return self.timestamp_decoder.isoformat(text)
+    
+    def extract_product(self, text: str) -> Optional[str]:
+        match = self._PRODUCT_RE.search(text)
+        if match:
+            product = match.group(1).strip()
+            product = self._BR_RE.sub('', product)
+            product = self._EMSP_RE.sub('', product)
+            product = product.split('<')[0].strip()
+            return product if product else None
+        
+        return 'Google Pay' if 'Google Pay' in text else None
+    
+    def extract_from_transaction_block(self, block: str) -> Optional[Dict]:
+        if not self._TRANSACTION_RE.search(block):
+            return None
+        
+        # Blocks without an amount are dropped, so skip the other fields
+        amount, currency = self.extract_amount(block)
+        if amount is None:
+            return None
+        
+        product = self.extract_product(block)
+        return {
+            'timestamp': self.extract_timestamp(block),
+            'amount': amount,
+            'currency': currency,
+            'recipient': self.extract_recipient(block),
+            'payment_method': self.extract_payment_method(block),
+            'account_number': self.extract_account_number(block),
+            'transaction_id': self.extract_transaction_id(block),
+            'status': self.extract_status(block),
+            'product': product,
+            'wallet': product,
+        }
+    
+    def extract_transactions(self, blocks: Iterable[str]) -> Iterator[Dict]:
+        """Yield the transaction in each block, skipping blocks that are not one"""
+        for block in blocks:
+            try:
+                transaction = self.extract_from_transaction_block(block)
+                if transaction:
+                    yield transaction
+            except Exception:
+                continue
+    
+    def parse(self, source, formatter=None):
+        """
+        Parse every block of source (a BlockSource or a file path) and hand
+        the transactions to formatter, a list of dicts by default
+        """
+        transactions = self.extract_transactions(as_source(source).blocks())
+        return (formatter or ListFormatter()).format(transactions)
+    
+    def iter_transaction_blocks(self, filepath: str, chunk_size: Optional[int] = None) -> Iterator[str]:
+        return FileSource(filepath, chunk_size).blocks()
+    
+    def iter_transactions(self, filepath: str, chunk_size: Optional[int] = None) -> Iterator[Dict]:
+        """Yield transactions as soon as their block has been read"""
+        return self.extract_transactions(self.iter_transaction_blocks(filepath, chunk_size))
+    
+    @staticmethod
+    def _formatter(columnar: bool):
+        return BatchFormatter() if columnar else ListFormatter()
+    
+    def parse_html_file(self, filepath: str, columnar: bool = False) -> Union[List[Dict], TransactionBatch]:
+        """
+        Parse an export file into a list of transaction dicts, or with
+        columnar=True into a TransactionBatch, which is much smaller for
+        large exports and converts to a DataFrame or Arrow table
+        """
+        return self.parse(FileSource(filepath), self._formatter(columnar))
+    
+    def parse_html(self, html: str, columnar: bool = False) -> Union[List[Dict], TransactionBatch]:
+        """Parse export HTML that is already in memory"""
+        return self.parse(HtmlSource(html), self._formatter(columnar))
+    
+    def fingerprint_block(self, block: str) -> str:
+        """
+        Stable identity of an export block across re-downloads: the Google Pay
+        transaction ID when the block has one, otherwise a hash of its text
+        with whitespace collapsed.
+        """
+        transaction_id = self.extract_transaction_id(block)
+        if transaction_id:
+            return f"txn:{transaction_id}"
+        
+        normalized = ' '.join(block.split())
+        return f"sha1:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()}"
+    
+    def parse_new_html(self, html: str, known: Set[str],
+                       columnar: bool = False) -> Tuple[Union[List[Dict], TransactionBatch], int]:
+        """
+        Parse only the blocks whose fingerprint is not in known.
+        Known blocks, and repeats of a block earlier in the same html, are
+        skipped before field extraction, so a re-import costs roughly the new
+        activity. Returns the new transactions, each carrying its
+        'fingerprint', and the number of blocks skipped.
+        """
+        transactions = TransactionBatch(FIELDS + ('fingerprint',)) if columnar else []
+        skipped = 0
+        seen = set(known)
+        
+        for block in HtmlSource(html).blocks():
+            if not self._TRANSACTION_RE.search(block):
+                continue
+            
+            fingerprint = self.fingerprint_block(block)
+            if fingerprint in seen:
+                skipped += 1
+                continue
+            seen.add(fingerprint)
+            
+            try:
+                transaction = self.extract_from_transaction_block(block)
+            except Exception:
+                continue
+            if transaction:
+                transaction['fingerprint'] = fingerprint
+                transactions.append(transaction)
+        
+        return transactions, skipped
@@ -0,0 +1,89 @@
+"""
+Output formatters: what a parse turns its stream of transaction dicts into
+JSON for the Node.js backend, a TransactionBatch, or a DataFrame/CSV for analysis
+"""
+import json
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from transaction_batch import FIELDS, TransactionBatch
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Column order of the DataFrame and CSV outputs
+STANDARD_COLUMNS = list(FIELDS)
+
+
+class ListFormatter:
+    """Plain list of transaction dicts"""
+
+    def format(self, transactions: Iterable[Dict]) -> List[Dict]:
+        return list(transactions)
+
+
+class BatchFormatter:
+    """Columnar TransactionBatch, much smaller than dicts for large exports"""
+
+    def __init__(self, fields: Sequence[str] = FIELDS):
+        self.fields = tuple(fields)
+
+    def format(self, transactions: Iterable[Dict]) -> TransactionBatch:
+        if isinstance(transactions, TransactionBatch):
+            if transactions.fields == self.fields:
+                return transactions
+            transactions = iter(transactions)
+        return TransactionBatch.from_transactions(transactions, self.fields)
+
+
+class JsonFormatter:
+    """
+    JSON array of transaction objects, byte for byte what json.dumps gives
+    for the list. write() streams it, one transaction at a time.
+    """
+
+    def iter_json(self, transactions: Iterable[Dict]) -> Iterator[str]:
+        if isinstance(transactions, TransactionBatch):
+            objects = transactions.iter_json()
+        else:
+            objects = map(json.dumps, transactions)
+        separator = '['
+        for obj in objects:
+            yield separator + obj
+            separator = ', '
+        yield '[]' if separator == '[' else ']'
+
+    def format(self, transactions: Iterable[Dict]) -> str:
+        return ''.join(self.iter_json(transactions))
+
+    def write(self, transactions: Iterable[Dict], stream: TextIO):
+        for piece in self.iter_json(transactions):
+            stream.write(piece)
+
+
+class DataFrameFormatter:
+    """
+    pandas DataFrame with the given columns, newest first. Transactions are
+    gathered in a TransactionBatch, so repeated strings become categoricals.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, sort: bool = True):
+        self.columns = list(columns) if columns is not None else STANDARD_COLUMNS
+        self.sort = sort
+
+    def format(self, transactions: Iterable[Dict]) -> 'pd.DataFrame':
+        df = BatchFormatter().format(transactions).to_dataframe()
+        df = df[[col for col in self.columns if col in df.columns]]
+
+        if self.sort and 'timestamp' in df.columns:
+            df = df.sort_values('timestamp', ascending=False, na_position='last')
+        return df
+
+
+class CsvFormatter(DataFrameFormatter):
+    """CSV text of the DataFrame output, without the index"""
+
+    def format(self, transactions: Iterable[Dict]) -> str:
+        return super().format(transactions).to_csv(index=False)
+
+    def write(self, transactions: Iterable[Dict], path_or_buf):
+        super().format(transactions).to_csv(path_or_buf, index=False)
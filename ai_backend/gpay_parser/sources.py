@@ -0,0 +1,172 @@
+"""
+Block sources: where the raw HTML of each activity entry comes from
+A source only has to hand out the export text in chunks; the layout
+detection and streaming block split are shared by all of them
+"""
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+# Characters read per step when streaming an export
+CHUNK_SIZE = 1 << 20
+
+# Block layouts tried in order: (start marker, end marker, end of the opening tag)
+LAYOUTS = [
+    ('<div class="outer-cell', '<div class="outer-cell', '>'),
+    ('<p class="mdl-typography--title">Google Pay<br /></p>', '<p class="mdl-typography--title"', None),
+]
+
+_VERB_RE = re.compile(r'(Paid|Sent|Received|Credited)')
+_LOOSE_BLOCK_RE = re.compile(r'(?:Paid|Sent|Received|Credited)\s+[₹€$£][\d.,]+.*?(?:GMT[+-]\d{2}:\d{2})', re.DOTALL)
+
+
+def stream_blocks(chunks: Iterator[str], start_marker: str, end_marker: str,
+                  header_end: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield every block running from start_marker up to the next end_marker
+    (or end of input) while holding at most one block plus one chunk in memory.
+    The block body begins after header_end when given, mirroring the
+    "<div class=\"outer-cell[^>]*>" opening tag of the export layout.
+    """
+    buffer = ''
+    pos = 0  # start of the text not yet yielded
+
+    def fill() -> bool:
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        start = buffer.find(start_marker, pos)
+        while start < 0:
+            # Keep just enough of the tail to catch a marker split across chunks
+            pos = max(pos, len(buffer) - len(start_marker) + 1)
+            if not fill():
+                return
+            start = buffer.find(start_marker, pos)
+        pos = start
+
+        # Offsets from here on are relative to the block start, which
+        # fill() keeps valid by only discarding text before it
+        body = len(start_marker)
+        if header_end is not None:
+            tag_end = buffer.find(header_end, pos + body)
+            while tag_end < 0:
+                if not fill():
+                    return
+                tag_end = buffer.find(header_end, pos + body)
+            body = tag_end - pos + len(header_end)
+
+        searched = body
+        end = buffer.find(end_marker, pos + searched)
+        while end < 0:
+            searched = max(body, len(buffer) - pos - len(end_marker) + 1)
+            if not fill():
+                break
+            end = buffer.find(end_marker, pos + searched)
+
+        if end < 0:
+            # The final block stops where the original "$" lookahead did,
+            # in front of a single trailing newline.
+            block = buffer[pos:]
+            if block.endswith('\n') and len(block) > body:
+                block = block[:-1]
+            yield block
+            return
+
+        yield buffer[pos:end]
+        pos = end
+
+
+def stream_matches(chunks: Iterator[str], pattern) -> Iterator[str]:
+    """Yield each non-overlapping match of pattern, consuming the input chunk by chunk"""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        for match in pattern.finditer(buffer):
+            yield match.group(0)
+            pos = match.end()
+        # Only text from the next verb onwards can still start a match
+        rest = buffer[pos:]
+        verb = _VERB_RE.search(rest)
+        buffer = rest[verb.start():] if verb else rest[-(len('Received') - 1):]
+
+
+class BlockSource:
+    """
+    Base class for block sources. Subclasses implement chunks(), which must
+    start the text over on every call: layout detection may read it more
+    than once.
+    """
+
+    def chunks(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def blocks(self) -> Iterator[str]:
+        """
+        Stream the raw HTML block of each activity entry.
+        Layouts are tried in order and the first one yielding at least two
+        blocks wins; the loose amount/GMT scan is the last resort.
+        """
+        for start_marker, end_marker, header_end in LAYOUTS:
+            blocks = stream_blocks(self.chunks(), start_marker, end_marker, header_end)
+            head = list(islice(blocks, 2))
+            if len(head) >= 2:
+                yield from head
+                yield from blocks
+                return
+            blocks.close()
+
+        yield from stream_matches(self.chunks(), _LOOSE_BLOCK_RE)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.blocks()
+
+
+class FileSource(BlockSource):
+    """An export on disk, read chunk_size characters at a time"""
+
+    def __init__(self, filepath: str, chunk_size: Optional[int] = None):
+        self.filepath = filepath
+        self.chunk_size = chunk_size or CHUNK_SIZE
+
+    def chunks(self) -> Iterator[str]:
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+class HtmlSource(BlockSource):
+    """Export HTML already in memory, such as an upload passed in by Node"""
+
+    def __init__(self, html: str):
+        # Match the newline translation a text-mode file read would apply
+        self.html = html.replace('\r\n', '\n').replace('\r', '\n')
+
+    def chunks(self) -> Iterator[str]:
+        return iter([self.html])
+
+
+class BlockListSource(BlockSource):
+    """Blocks that were already split, e.g. one chunk of a file handed to a worker"""
+
+    def __init__(self, blocks: Iterable[str]):
+        self._blocks: List[str] = list(blocks)
+
+    def blocks(self) -> Iterator[str]:
+        return iter(self._blocks)
+
+
+def as_source(source) -> BlockSource:
+    """Accept a BlockSource as is and treat a plain string as a file path"""
+    if isinstance(source, BlockSource):
+        return source
+    return FileSource(source)
@@ -0,0 +1,22 @@
+"""
+Production server settings, picked up automatically by `gunicorn app:app`
+One process with a bounded pool of threads: exports, MongoDB reads and LLM
+calls from different requests overlap, while the LLM limit and result cache in
+llm_limiter.py and result_cache.py stay shared by every request. The pool is
+sized so requests waiting for an LLM slot still leave threads for /health,
+cache hits and local insights; anything past that queues in the socket backlog.
+"""
+import os
+
+from llm_limiter import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_QUEUE
+
+bind = f"0.0.0.0:{os.getenv('PORT') or os.getenv('INSIGHTS_API_PORT', '5002')}"
+worker_class = 'gthread'
+# Jobs from job_queue.py live in process memory; with more than one process
+# GET /jobs/<id> could land on a process that never saw the job
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+threads = int(os.getenv('WEB_THREADS', int(os.getenv('LLM_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+                        + int(os.getenv('LLM_MAX_QUEUE', DEFAULT_MAX_QUEUE)) + 4))
+# An analysis can run for a minute or more; the default 30s would kill the worker mid-call
+timeout = int(os.getenv('WEB_TIMEOUT', 180))
+graceful_timeout = 30
@@ -5,100 +5,183 @@ Analyzes transaction data and provides financial insights, alerts, and suggestio
 
 import os
 import json
-import subprocess
+from functools import lru_cache
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
 
-# Load environment variables
+# Load environment variables before the modules below read their settings
 load_dotenv()
 
-# Initialize Gemini API key
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
+from llm_limiter import Overloaded, llm_limiter
+from result_cache import fingerprint, result_cache
 
-# Set Gemini as the default LLM for CrewAI
-os.environ['GEMINI_API_KEY'] = GEMINI_API_KEY
+# Bump when the task prompt changes, so cached insights are regenerated
+INSIGHTS_PROMPT_VERSION = 3
+INSIGHTS_FIELDS = ('keyInsights', 'alerts', 'suggestions')
 
-# Create Gemini LLM instance
-gemini_llm = LLM(
-    model="gemini-2.0-flash",
-    api_key=GEMINI_API_KEY
-)
+# crewai takes seconds to import, so it and the objects built from it are
+# created on first use rather than when app.py imports this module.
+
+@lru_cache(maxsize=None)
+def get_gemini_llm():
+    """Create the Gemini LLM instance on first use"""
+    from crewai.llm import LLM
+    
+    # Initialize Gemini API key
+    gemini_api_key = os.getenv('GEMINI_API_KEY')
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    
+    # Set Gemini as the default LLM for CrewAI
+    os.environ['GEMINI_API_KEY'] = gemini_api_key
+    
+    return LLM(
+        model="gemini-2.0-flash",
+        api_key=gemini_api_key
+    )
 
 # ============================
 # 📊 HELPER FUNCTIONS
 # ============================
 
-def export_transactions_to_csv(user_id: str = None):
-    """Run the export script to get fresh transaction data for specific user"""
+def get_user_snapshot(user_id: str = None):
+    """
+    (version, table) from one sync of a valid user's export cache, or None
+    for anyone else or when the cache is unavailable
+    """
     try:
-        export_script = os.path.join(os.path.dirname(__file__), 'export_transactions_to_csv.py')
-        print(f"[DEBUG] Export script path: {export_script}")
-        print(f"[DEBUG] Export script exists: {os.path.exists(export_script)}")
-        
-        cmd = ['python', export_script]
-        if user_id:
-            cmd.append(user_id)
-            print(f"[DEBUG] Exporting for user_id: {user_id}")
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        print(f"[DEBUG] Export process return code: {result.returncode}")
-        print(f"[DEBUG] Export stdout:\n{result.stdout}")
-        if result.stderr:
-            print(f"[DEBUG] Export stderr:\n{result.stderr}")
+        from bson.objectid import ObjectId
+        from user_dataset import user_data_snapshot
         
-        if result.returncode != 0:
-            print(f"[ERROR] Export script error: {result.stderr}")
+        if not (user_id and ObjectId.is_valid(user_id)):
             return None
+        return user_data_snapshot(user_id)
+    except Exception as e:
+        print(f"[WARN] Export cache unavailable: {e}")
+        return None
+
+def get_transactions_frame(user_id: str = None, snapshot=None):
+    """
+    The user's transactions as a DataFrame, loaded once per analysis from
+    snapshot's table, or from the per-user export cache without one
+    """
+    try:
+        # Imported here so pandas only loads once an analysis is requested
+        from prompt_context import context_frame, load_context_frame
         
-        # CSV is generated as transactions_export.csv
-        csv_path = os.path.join(os.path.dirname(__file__), 'transactions_export.csv')
-        print(f"[DEBUG] Looking for CSV at: {csv_path}")
-        print(f"[DEBUG] CSV exists: {os.path.exists(csv_path)}")
-        
-        if os.path.exists(csv_path):
-            print(f"[DEBUG] CSV file size: {os.path.getsize(csv_path)} bytes")
-            return csv_path
-        else:
-            print("[ERROR] CSV file not generated")
+        frame = context_frame(snapshot[1]) if snapshot is not None else load_context_frame(user_id)
+        if frame is None or frame.empty:
+            print(f"[ERROR] No transactions found for user_id: {user_id}")
             return None
+        return frame
     except Exception as e:
         print(f"[ERROR] Error exporting transactions: {e}")
         import traceback
         traceback.print_exc()
         return None
 
+def get_transactions_context(user_id: str = None, frame=None):
+    """Fresh, compact transaction context for a specific user, built from the per-user export cache"""
+    from prompt_context import build_context
+    
+    if frame is None:
+        frame = get_transactions_frame(user_id)
+    return build_context(frame) if frame is not None else None
+
+def get_local_insights(user_id: str = None, frame=None):
+    """Deterministic keyInsights, alerts and suggestions from local_analytics, or None without transactions"""
+    try:
+        from local_analytics import local_insights
+        
+        if frame is None:
+            frame = get_transactions_frame(user_id)
+        return local_insights(frame) if frame is not None else None
+    except Exception as e:
+        print(f"[WARN] Local insights unavailable: {e}")
+        return None
+
+def get_spending_summary(user_id: str = None, frame=None):
+    """Spending statistics from the summary engine, over frame when already loaded, or None for an unknown user"""
+    try:
+        from bson.objectid import ObjectId
+        from spending_summary import summarize_spending, user_spending_summary
+        
+        if not (user_id and ObjectId.is_valid(user_id)):
+            return None
+        return summarize_spending(frame) if frame is not None else user_spending_summary(user_id)
+    except Exception as e:
+        print(f"[WARN] Spending summary unavailable: {e}")
+        return None
+
+def insights_cache_key(snapshot=None):
+    """Fingerprint of the prompt version and the snapshot's transaction set, or None when uncacheable"""
+    if snapshot is None:
+        return None
+    return fingerprint('insights', INSIGHTS_PROMPT_VERSION, snapshot[0])
+
+def extract_insights(output) -> dict:
+    """
+    The JSON object in the agent's output
+    Raises ValueError (json.JSONDecodeError for malformed JSON) when it is missing or incomplete
+    """
+    result_str = str(output).strip()
+    
+    # Find the start of JSON (first '{') and its end (last '}')
+    json_start = result_str.find('{')
+    json_end = result_str.rfind('}') + 1
+    if json_start < 0 or json_end <= json_start:
+        raise ValueError("No JSON found in response")
+    
+    analysis_data = json.loads(result_str[json_start:json_end])
+    if any(field not in analysis_data for field in INSIGHTS_FIELDS):
+        raise ValueError("Missing required fields: keyInsights, alerts, suggestions")
+    return analysis_data
+
 # ============================
 # 👤 AGENT
 # ============================
 
-analyzer_agent = Agent(
-    role="Senior Financial Analyst",
-    goal="Analyze complete expense data and provide comprehensive financial insights, alerts, and suggestions.",
-    backstory=(
-        "You are an expert financial analyst who examines every single transaction "
-        "in expense reports to identify patterns, risks, and opportunities. "
-        "You excel at detecting spending anomalies and providing actionable recommendations."
-    ),
-    llm=gemini_llm,
-    verbose=True
-)
+@lru_cache(maxsize=None)
+def get_analyzer_agent():
+    """Create the analyst agent on first use"""
+    from crewai import Agent
+    
+    return Agent(
+        role="Senior Financial Analyst",
+        goal="Analyze complete expense data and provide comprehensive financial insights, alerts, and suggestions.",
+        backstory=(
+            "You are an expert financial analyst who examines every single transaction "
+            "in expense reports to identify patterns, risks, and opportunities. "
+            "You excel at detecting spending anomalies and providing actionable recommendations."
+        ),
+        llm=get_gemini_llm(),
+        verbose=True
+    )
 
 # ============================
 # 🎯 TASK
 # ============================
 
-def create_analysis_task(csv_content: str) -> Task:
-    """Create the analysis task with CSV data embedded"""
+def create_analysis_task(context: str, spending_summary: dict = None, findings: dict = None):
+    """Create the analysis task with the transaction context and, when available, precomputed statistics and findings embedded"""
+    from crewai import Task
+    
+    statistics = ""
+    if spending_summary:
+        statistics = f"""SPENDING STATISTICS (computed exactly from all transactions; use these figures instead of re-adding amounts):
+
+{json.dumps(spending_summary['windows'], indent=2)}
+
+"""
+    if findings and any(findings.values()):
+        statistics += f"""PRECOMPUTED FINDINGS (detected deterministically from the transactions and already verified; keep them, \
+improve their wording and add what the data shows beyond them):
+
+{json.dumps(findings, indent=2, ensure_ascii=False)}
+
+"""
+    
     return Task(
-        description=f"""Analyze this COMPLETE financial dataset and provide comprehensive insights in STRICT JSON format ONLY.
+        description=f"""Analyze this financial dataset and provide comprehensive insights in STRICT JSON format ONLY.
 
 Return ONLY valid JSON with this exact structure - NO markdown, NO text, ONLY JSON:
 
@@ -118,13 +201,13 @@ Return ONLY valid JSON with this exact structure - NO markdown, NO text, ONLY JS
   ]
 }}
 
-COMPLETE TRANSACTION DATA:
+{statistics}TRANSACTION DATA (exact aggregates over every transaction, the largest outliers and an evenly spread sample):
 
-{csv_content}
+{context}
 
-Analyze EVERY transaction. Return ONLY the JSON object above with no additional text, no markdown formatting, no explanations.""",
+Base every figure on the data above. Return ONLY the JSON object above with no additional text, no markdown formatting, no explanations.""",
         expected_output="Valid JSON object with keyInsights, alerts, and suggestions arrays.",
-        agent=analyzer_agent,
+        agent=get_analyzer_agent(),
     )
 
 # ============================
@@ -134,37 +217,49 @@ Analyze EVERY transaction. Return ONLY the JSON object above with no additional
 def analyze_spending_patterns(user_id: str = None):
     """Main function to run the CrewAI financial analyzer"""
     try:
-        # Step 1: Export transactions
-        print("[INFO] Exporting transactions...")
-        csv_path = export_transactions_to_csv(user_id)
+        # Step 0: Sync the user's cached transactions once; the cache key,
+        # context, findings and statistics all come from this snapshot
+        snapshot = get_user_snapshot(user_id)
         
-        if not csv_path:
+        # Reuse the last result while the transactions are unchanged
+        cache_key = insights_cache_key(snapshot)
+        if cache_key:
+            cached = result_cache.get(user_id, 'insights', cache_key)
+            if cached is not None:
+                print(f"[INFO] Insights for {user_id} served from cache")
+                return cached
+        
+        # Step 1: Summarize transactions, loading them once for the context and the local findings
+        print("[INFO] Building transaction context...")
+        frame = get_transactions_frame(user_id, snapshot)
+        
+        if frame is None:
             print("[ERROR] Failed to export transactions")
             return None
         
-        print(f"[INFO] Transactions exported to: {csv_path}")
+        context = get_transactions_context(user_id, frame)
+        findings = get_local_insights(user_id, frame)
+        print(f"[INFO] Transaction context built ({len(context)} characters)")
         
-        # Step 2: Read CSV content
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            csv_content = f.read()
+        # Step 2: Create task with the context, the summary engine's statistics and the local findings
+        analysis_task = create_analysis_task(context, get_spending_summary(user_id, frame), findings)
         
-        print(f"[INFO] CSV data loaded ({len(csv_content)} characters)")
+        # Step 3: Create crew
+        from crewai import Crew
         
-        # Step 3: Create task with CSV data
-        analysis_task = create_analysis_task(csv_content)
-        
-        # Step 4: Create crew
         crew = Crew(
-            agents=[analyzer_agent],
+            agents=[get_analyzer_agent()],
             tasks=[analysis_task],
             verbose=True,
         )
         
-        # Step 5: Run crew
+        # Step 4: Run crew
         print("\n[INFO] Running CrewAI Financial Analyzer with Gemini...")
         print("=" * 60)
         
-        result = crew.kickoff()
+        # Waits for a free LLM slot, or raises Overloaded for the caller to answer 429/503
+        with llm_limiter.slot(user_id, 'insights'):
+            result = crew.kickoff()
         
         print("\n" + "=" * 60)
         print("[SUCCESS] FINANCIAL ANALYSIS COMPLETE")
@@ -182,10 +277,19 @@ def analyze_spending_patterns(user_id: str = None):
             
             print(f"[INFO] Output type: {type(output)}")
             print(f"[INFO] Output length: {len(str(output))}")
+            
+            if cache_key:
+                try:
+                    extract_insights(output)
+                    result_cache.set(user_id, 'insights', cache_key, str(output))
+                except ValueError:
+                    print("[WARN] Not caching insights without the expected JSON")
             return output
         
         return None
         
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"[ERROR] Error running insights agent: {str(e)}")
         import traceback
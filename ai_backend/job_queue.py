@@ -0,0 +1,128 @@
+"""
+Background jobs for long-running analyses
+POST /jobs enqueues an insights or budget analysis and returns at once with a
+job id; a pool of JOB_WORKERS threads runs the jobs and GET /jobs/<id> reports
+their status and result. While a user's job of one kind is queued or running,
+further requests for it get the same job, so a burst of clicks or concurrent
+clients costs one analysis. Finished jobs are kept for JOB_RESULT_TTL seconds.
+At most JOB_MAX_PENDING jobs may be queued or running; beyond that submit
+raises Overloaded, which app.py answers with 503. A job whose analysis is
+refused by the LLM limiter fails with that Overloaded's status and
+retry-after, so clients can back off instead of seeing a generic error.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from llm_limiter import DEFAULT_MAX_CONCURRENCY, Overloaded
+
+DEFAULT_RESULT_TTL = 60 * 60
+DEFAULT_MAX_PENDING = 100
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class JobFailed(Exception):
+    """Raised by a job function to fail its job with a message instead of a result"""
+
+
+class JobQueue:
+    """Thread pool of analyses, deduplicated per (kind, user) while they are pending"""
+
+    def __init__(self, workers: int = DEFAULT_MAX_CONCURRENCY, result_ttl: float = DEFAULT_RESULT_TTL,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.workers = max(1, workers)
+        self.result_ttl = result_ttl
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = {}
+        self._pending: Dict[Tuple[str, Optional[str]], str] = {}
+        self.deduplicated = 0
+
+    @classmethod
+    def from_env(cls) -> 'JobQueue':
+        try:
+            workers = int(os.getenv('JOB_WORKERS', os.getenv('LLM_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)))
+            result_ttl = float(os.getenv('JOB_RESULT_TTL', DEFAULT_RESULT_TTL))
+            max_pending = int(os.getenv('JOB_MAX_PENDING', DEFAULT_MAX_PENDING))
+        except ValueError:
+            print("[WARN] Ignoring invalid JOB_WORKERS/JOB_RESULT_TTL/JOB_MAX_PENDING, using defaults")
+            workers, result_ttl, max_pending = DEFAULT_MAX_CONCURRENCY, DEFAULT_RESULT_TTL, DEFAULT_MAX_PENDING
+        return cls(workers, result_ttl, max_pending)
+
+    def submit(self, kind: str, user_id: Optional[str], run: Callable[[], Any]) -> Tuple[Dict, bool]:
+        """
+        The pending job for this kind and user, or a new one running run() in the pool
+        Returns a snapshot of the job and whether it was newly created
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            job_id = self._pending.get((kind, user_id))
+            if job_id is not None:
+                self.deduplicated += 1
+                return dict(self._jobs[job_id]), False
+            if len(self._pending) >= self.max_pending:
+                raise Overloaded("Too many analyses queued, try again shortly")
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'jobId': job_id, 'kind': kind, 'userId': user_id, 'status': QUEUED,
+                'createdAt': now, 'startedAt': None, 'finishedAt': None, 'result': None, 'error': None,
+                'errorStatus': None, 'retryAfter': None,
+            }
+            self._pending[(kind, user_id)] = job_id
+            snapshot = dict(self._jobs[job_id])
+        self._executor.submit(self._run, job_id, run)
+        return snapshot, True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._expire(time.time())
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return dict(counts, workers=self.workers, deduplicated=self.deduplicated)
+
+    def _run(self, job_id: str, run: Callable[[], Any]):
+        self._update(job_id, status=RUNNING, startedAt=time.time())
+        refused = {}
+        try:
+            result, error, status = run(), None, DONE
+        except JobFailed as e:
+            result, error, status = None, str(e), FAILED
+        except Overloaded as e:
+            print(f"[WARN] Job {job_id} refused: {e}")
+            result, error, status = None, str(e), FAILED
+            refused = {'errorStatus': e.status, 'retryAfter': e.retry_after}
+        except Exception as e:
+            print(f"[ERROR] Job {job_id} failed: {e}")
+            result, error, status = None, str(e), FAILED
+        self._update(job_id, status=status, result=result, error=error, finishedAt=time.time(), done=True,
+                     **refused)
+
+    def _update(self, job_id: str, done: bool = False, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            if done:
+                self._pending.pop((job['kind'], job['userId']), None)
+
+    def _expire(self, now: float):
+        # Called with the lock held
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finishedAt'] is not None and job['finishedAt'] + self.result_ttl <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue.from_env()
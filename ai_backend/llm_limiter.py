@@ -0,0 +1,112 @@
+"""
+Bound on concurrent LLM calls with backpressure
+Each crew.kickoff() holds a slot for its whole run. At most LLM_MAX_CONCURRENCY
+calls run at once and up to LLM_MAX_QUEUE more wait for a slot, each for at
+most LLM_QUEUE_TIMEOUT seconds. Anything beyond that is refused at once with
+Overloaded (HTTP 503), and a user who already has the same kind of analysis
+running or waiting is refused with HTTP 429, so requests are shed instead of
+piling up behind a slow model. Cache hits and local insights never take a slot.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_QUEUE = 8
+DEFAULT_QUEUE_TIMEOUT = 30.0
+
+
+class Overloaded(Exception):
+    """An LLM call was refused; status is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status: int = 503, retry_after: int = 30):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LLMLimiter:
+    """Counting semaphore with a bounded, time-limited wait and one call per user and kind"""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_queue: int = DEFAULT_MAX_QUEUE,
+                 queue_timeout: float = DEFAULT_QUEUE_TIMEOUT):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+        self._users = set()
+        self.completed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> 'LLMLimiter':
+        try:
+            max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+            max_queue = int(os.getenv('LLM_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+            queue_timeout = float(os.getenv('LLM_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT))
+        except ValueError:
+            print("[WARN] Ignoring invalid LLM_MAX_CONCURRENCY/LLM_MAX_QUEUE/LLM_QUEUE_TIMEOUT, using defaults")
+            max_concurrency, max_queue, queue_timeout = DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_QUEUE, DEFAULT_QUEUE_TIMEOUT
+        return cls(max_concurrency, max_queue, queue_timeout)
+
+    def acquire(self, user_id: Optional[str] = None, kind: str = 'analysis'):
+        """Take a slot, waiting in the queue if needed; raises Overloaded when that is not possible"""
+        owner = (user_id, kind) if user_id is not None else None
+        with self._condition:
+            if owner is not None and owner in self._users:
+                self.rejected += 1
+                raise Overloaded(f"User {user_id} already has {kind} in progress", status=429)
+            if self._running >= self.max_concurrency and self._waiting >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded("Too many analyses in progress, try again shortly",
+                                 retry_after=int(self.queue_timeout) or 1)
+
+            if owner is not None:
+                self._users.add(owner)
+            self._waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self._running >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        self._users.discard(owner)
+                        raise Overloaded("Timed out waiting for a free analysis slot",
+                                         retry_after=int(self.queue_timeout) or 1)
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._running += 1
+
+    def release(self, user_id: Optional[str] = None, kind: str = 'analysis'):
+        with self._condition:
+            self._running -= 1
+            self.completed += 1
+            self._users.discard((user_id, kind))
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, user_id: Optional[str] = None, kind: str = 'analysis'):
+        self.acquire(user_id, kind)
+        try:
+            yield
+        finally:
+            self.release(user_id, kind)
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'running': self._running,
+                'waiting': self._waiting,
+                'maxConcurrency': self.max_concurrency,
+                'maxQueue': self.max_queue,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+
+llm_limiter = LLMLimiter.from_env()
@@ -0,0 +1,207 @@
+"""
+Deterministic insights and alerts computed from the transactions alone
+Category spikes, recurring payments, large one-off payments, month-over-month
+changes, the savings rate and failed payments are detected with pandas and
+returned in the insights agent's keyInsights/alerts/suggestions shape. They
+can be served directly, without an LLM, or handed to the crew as verified
+findings so the model only has to write the narrative.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from prompt_context import normalize_transactions
+
+WINDOW_DAYS = 30
+# Months of history before the window that category spending is compared with
+BASELINE_WINDOWS = 3
+SPIKE_RATIO = 1.5
+MIN_SPIKE_INCREASE = 500.0
+LARGE_PAYMENT_MULTIPLE = 5.0
+MIN_LARGE_PAYMENT = 2000.0
+# Period name -> (shortest, longest) median gap in days between recurring payments
+RECURRING_PERIODS = {'monthly': (26, 35), 'weekly': (6, 8)}
+RECURRING_MAX_VARIATION = 0.15
+MOM_ALERT_CHANGE = 0.25
+
+
+def _rupees(amount: float) -> str:
+    return f"₹{amount:,.0f}"
+
+
+def _severity(ratio: float, high: float, medium: float) -> str:
+    return 'high' if ratio >= high else 'medium' if ratio >= medium else 'low'
+
+
+def category_spikes(expenses: pd.DataFrame, now: pd.Timestamp) -> List[Dict]:
+    """Categories whose last-30-day spend is well above their average over the previous months"""
+    window_start = now - pd.Timedelta(days=WINDOW_DAYS)
+    baseline_start = window_start - pd.Timedelta(days=WINDOW_DAYS * BASELINE_WINDOWS)
+    if expenses.empty or expenses['date'].min() > window_start - pd.Timedelta(days=WINDOW_DAYS):
+        # Less than a month of history before the window: nothing to compare with
+        return []
+
+    recent = expenses[expenses['date'] >= window_start].groupby('category')['amount'].sum()
+    in_baseline = (expenses['date'] >= baseline_start) & (expenses['date'] < window_start)
+    baseline = expenses[in_baseline].groupby('category')['amount'].sum() / BASELINE_WINDOWS
+    joined = pd.concat({'recent': recent, 'baseline': baseline}, axis=1).fillna(0.0)
+    spikes = joined[
+        (joined['baseline'] > 0)
+        & (joined['recent'] >= joined['baseline'] * SPIKE_RATIO)
+        & (joined['recent'] - joined['baseline'] >= MIN_SPIKE_INCREASE)
+    ]
+    spikes = spikes.assign(ratio=spikes['recent'] / spikes['baseline'])
+    spikes = spikes.sort_values(['ratio', 'recent'], ascending=False, kind='mergesort')
+    return [
+        {'category': category, 'recent': row.recent, 'baseline': row.baseline, 'ratio': row.ratio}
+        for category, row in spikes.iterrows()
+    ]
+
+
+def recurring_payments(expenses: pd.DataFrame, now: pd.Timestamp) -> List[Dict]:
+    """Recipients paid a steady amount at a weekly or monthly rhythm that is still going on"""
+    expenses = expenses[expenses['recipient'] != 'Unknown'].sort_values('date', kind='mergesort')
+    gaps = expenses.groupby('recipient')['date'].diff().dt.total_seconds() / 86400
+    stats = expenses.assign(gap=gaps).groupby('recipient').agg(
+        count=('amount', 'size'), mean=('amount', 'mean'), std=('amount', 'std'),
+        gap=('gap', 'median'), last=('date', 'max'), category=('category', 'last'),
+    )
+    stats = stats[(stats['count'] >= 3) & (stats['std'].fillna(0) <= stats['mean'] * RECURRING_MAX_VARIATION)]
+
+    found = []
+    for recipient, row in stats.sort_values('mean', ascending=False, kind='mergesort').iterrows():
+        for period, (shortest, longest) in RECURRING_PERIODS.items():
+            still_active = (now - row['last']).days <= longest * 2
+            if shortest <= row['gap'] <= longest and still_active:
+                found.append({
+                    'recipient': recipient, 'period': period, 'amount': row['mean'],
+                    'monthly': row['mean'] * 30 / row['gap'], 'count': int(row['count']),
+                    'category': row['category'],
+                })
+                break
+    return found
+
+
+def large_payments(expenses: pd.DataFrame, now: pd.Timestamp) -> List[Dict]:
+    """Recent expenses many times the usual amount for their category, largest first"""
+    counts = expenses.groupby('category')['amount'].transform('size')
+    median = expenses.groupby('category')['amount'].transform('median')
+    recent = expenses['date'] >= now - pd.Timedelta(days=WINDOW_DAYS)
+    large = expenses[
+        recent & (counts >= 5) & (median > 0)
+        & (expenses['amount'] >= median * LARGE_PAYMENT_MULTIPLE)
+        & (expenses['amount'] >= MIN_LARGE_PAYMENT)
+    ]
+    large = large.assign(multiple=large['amount'] / median[large.index])
+    large = large.sort_values(['amount', 'date'], ascending=False, kind='mergesort')
+    return large[['date', 'amount', 'category', 'recipient', 'multiple']].to_dict('records')
+
+
+def month_over_month(expenses: pd.DataFrame, now: pd.Timestamp) -> Optional[Dict]:
+    """Expenses of the last complete month against the month before it"""
+    current = now.to_period('M')
+    monthly = expenses.groupby(expenses['date'].dt.to_period('M'))['amount'].sum()
+    last, previous = current - 1, current - 2
+    if last not in monthly.index or previous not in monthly.index or monthly[previous] <= 0:
+        return None
+    return {
+        'month': str(last), 'previousMonth': str(previous),
+        'amount': monthly[last], 'previousAmount': monthly[previous],
+        'change': monthly[last] / monthly[previous] - 1,
+    }
+
+
+def local_insights(frame: pd.DataFrame, now: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+    """keyInsights, alerts and suggestions for a frame with the export's columns"""
+    now = pd.Timestamp(now or datetime.now())
+    frame = normalize_transactions(frame)
+    expenses = frame[frame['type'] == 'expense']
+    window = frame[frame['date'] >= now - pd.Timedelta(days=WINDOW_DAYS)]
+    window_expenses = window[window['type'] == 'expense']
+    insights, alerts, suggestions = [], [], []
+
+    spent = window_expenses['amount'].sum()
+    earned = window.loc[window['type'] == 'income', 'amount'].sum()
+    if spent > 0:
+        by_category = window_expenses.groupby('category')['amount'].sum().sort_values(ascending=False, kind='mergesort')
+        top_category, top_amount = by_category.index[0], by_category.iloc[0]
+        insights.append({
+            'title': f"{top_category} leads your spending",
+            'description': f"{_rupees(top_amount)} of {_rupees(spent)} spent in the last {WINDOW_DAYS} days "
+                           f"({top_amount / spent:.0%}) went to {top_category}.",
+        })
+        suggestions.append({
+            'category': top_category,
+            'suggestion': f"Trimming {top_category} by 10% would free up about {_rupees(top_amount * 0.1)} a month.",
+        })
+    if earned > 0 or spent > 0:
+        if earned >= spent:
+            insights.append({
+                'title': "Saving rate",
+                'description': f"You kept {_rupees(earned - spent)} of {_rupees(earned)} income in the last "
+                               f"{WINDOW_DAYS} days ({(earned - spent) / earned:.0%}).",
+            })
+        else:
+            alerts.append({
+                'type': "Spending exceeds income", 'severity': 'high',
+                'description': f"You spent {_rupees(spent)} against {_rupees(earned)} of income in the last {WINDOW_DAYS} days.",
+                'recommendation': "Pause non-essential purchases until spending is back below income.",
+            })
+
+    change = month_over_month(expenses, now)
+    if change:
+        direction = 'up' if change['change'] >= 0 else 'down'
+        insights.append({
+            'title': f"Spending {direction} {abs(change['change']):.0%} month over month",
+            'description': f"{change['month']}: {_rupees(change['amount'])} against "
+                           f"{_rupees(change['previousAmount'])} in {change['previousMonth']}.",
+        })
+        if change['change'] >= MOM_ALERT_CHANGE:
+            alerts.append({
+                'type': "Month-over-month increase", 'severity': _severity(change['change'], 0.75, 0.5),
+                'description': f"Spending rose {change['change']:.0%} from {change['previousMonth']} to {change['month']}.",
+                'recommendation': "Compare the two months by category to find what grew.",
+            })
+
+    for spike in category_spikes(expenses, now):
+        alerts.append({
+            'type': "Category spike", 'severity': _severity(spike['ratio'], 2.5, 1.75),
+            'description': f"{spike['category']} spending reached {_rupees(spike['recent'])} in the last "
+                           f"{WINDOW_DAYS} days, {spike['ratio']:.1f}x your usual {_rupees(spike['baseline'])} a month.",
+            'recommendation': f"Set a monthly limit of {_rupees(spike['baseline'] * 1.1)} for {spike['category']}.",
+        })
+
+    for payment in large_payments(expenses, now)[:3]:
+        alerts.append({
+            'type': "Large one-off payment", 'severity': _severity(payment['multiple'], 10, 5),
+            'description': f"{_rupees(payment['amount'])} to {payment['recipient']} on {payment['date']:%Y-%m-%d} is "
+                           f"{payment['multiple']:.0f}x a typical {payment['category']} payment.",
+            'recommendation': "Check that this payment was expected and budget for it if it will repeat.",
+        })
+
+    recurring = recurring_payments(expenses, now)
+    if recurring:
+        total = sum(payment['monthly'] for payment in recurring)
+        names = ', '.join(f"{payment['recipient']} ({_rupees(payment['amount'])} {payment['period']})"
+                          for payment in recurring[:5])
+        insights.append({
+            'title': f"{len(recurring)} recurring payments",
+            'description': f"About {_rupees(total)} a month goes to regular payments: {names}.",
+        })
+        for payment in recurring[:3]:
+            suggestions.append({
+                'category': payment['category'],
+                'suggestion': f"Review the {payment['period']} payment to {payment['recipient']} "
+                              f"({_rupees(payment['monthly'])} a month) and cancel it if unused.",
+            })
+
+    failed = int((window['status'] == 'Failed').sum())
+    if failed >= 3:
+        alerts.append({
+            'type': "Failed payments", 'severity': 'low',
+            'description': f"{failed} payments failed in the last {WINDOW_DAYS} days.",
+            'recommendation': "Check the linked account balance and UPI limits.",
+        })
+
+    return {'keyInsights': insights, 'alerts': alerts, 'suggestions': suggestions}
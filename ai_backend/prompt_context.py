@@ -0,0 +1,188 @@
+"""
+Compact transaction context for the insights and budget agents
+Instead of the raw export CSV (every column of every transaction), the agents
+get an overview, monthly trends, per-category and per-merchant aggregates, the
+largest outliers and an evenly spread sample of transactions, cut to fit a
+token budget. The same transactions always produce the same text.
+"""
+import math
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOKEN_BUDGET = 4000
+# Rough size of a token in English text and CSV, good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+CONTEXT_COLUMNS = ['date', 'type', 'amount', 'category', 'recipient', 'description', 'status']
+SAMPLE_COLUMNS = ['date', 'type', 'amount', 'category', 'recipient', 'status']
+
+
+def token_budget() -> int:
+    value = os.getenv('PROMPT_TOKEN_BUDGET')
+    try:
+        return int(value) if value else DEFAULT_TOKEN_BUDGET
+    except ValueError:
+        print(f"[WARN] Ignoring non-integer PROMPT_TOKEN_BUDGET={value!r}, using {DEFAULT_TOKEN_BUDGET}")
+        return DEFAULT_TOKEN_BUDGET
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize_transactions(frame: pd.DataFrame) -> pd.DataFrame:
+    """The context columns with parsed dates and amounts and a recipient for every row, newest first"""
+    frame = frame.reindex(columns=CONTEXT_COLUMNS)
+    frame = frame.assign(
+        date=pd.to_datetime(frame['date'], errors='coerce'),
+        amount=pd.to_numeric(frame['amount'], errors='coerce').fillna(0.0),
+        category=frame['category'].fillna('Uncategorized'),
+        recipient=frame['recipient'].fillna(frame['description']).fillna('Unknown'),
+    )
+    frame = frame.dropna(subset=['date'])
+    # Stable sort with amount as tie-breaker keeps the output deterministic
+    return frame.sort_values(['date', 'amount'], ascending=False, kind='mergesort').reset_index(drop=True)
+
+
+def _csv(frame: pd.DataFrame) -> str:
+    return frame.to_csv(index=False, float_format='%.2f', date_format='%Y-%m-%d').strip()
+
+
+def overview(frame: pd.DataFrame) -> str:
+    expense = frame['type'] == 'expense'
+    lines = [
+        f"Period: {frame['date'].min():%Y-%m-%d} to {frame['date'].max():%Y-%m-%d}",
+        f"Transactions: {len(frame)} ({int(expense.sum())} expenses, {int((frame['type'] == 'income').sum())} income)",
+        f"Total expenses: {frame.loc[expense, 'amount'].sum():.2f}",
+        f"Total income: {frame.loc[frame['type'] == 'income', 'amount'].sum():.2f}",
+    ]
+    not_completed = frame['status'].notna() & (frame['status'] != 'Completed')
+    if not_completed.any():
+        lines.append(f"Not completed: {int(not_completed.sum())} ({', '.join(sorted(frame.loc[not_completed, 'status'].unique()))})")
+    return '\n'.join(lines)
+
+
+def monthly_trend(frame: pd.DataFrame) -> pd.DataFrame:
+    month = frame['date'].dt.strftime('%Y-%m')
+    signed = frame.assign(
+        month=month,
+        income=frame['amount'].where(frame['type'] == 'income', 0.0),
+        expenses=frame['amount'].where(frame['type'] == 'expense', 0.0),
+    )
+    trend = signed.groupby('month').agg(
+        transactions=('amount', 'size'), income=('income', 'sum'), expenses=('expenses', 'sum'),
+    )
+    trend['net'] = trend['income'] - trend['expenses']
+    return trend.sort_index(ascending=False).reset_index()
+
+
+def expense_aggregates(frame: pd.DataFrame, by: str) -> pd.DataFrame:
+    """Count, total, average and share of expenses per value of by, largest total first"""
+    expenses = frame[frame['type'] == 'expense']
+    grouped = expenses.groupby(by).agg(count=('amount', 'size'), total=('amount', 'sum'), avg=('amount', 'mean'))
+    total = grouped['total'].sum()
+    grouped['share_pct'] = grouped['total'] / total * 100 if total else 0.0
+    grouped = grouped.reset_index()
+    return grouped.sort_values(['total', by], ascending=[False, True], kind='mergesort')
+
+
+def outliers(frame: pd.DataFrame) -> pd.DataFrame:
+    """Expenses ordered by how many times their category's median they cost"""
+    expenses = frame[frame['type'] == 'expense']
+    median = expenses.groupby('category')['amount'].transform('median')
+    ranked = expenses.assign(x_median=(expenses['amount'] / median.replace(0, np.nan)).fillna(0.0))
+    ranked = ranked[ranked['x_median'] >= 3]
+    ranked = ranked.sort_values(['x_median', 'amount'], ascending=False, kind='mergesort')
+    return ranked[['date', 'amount', 'category', 'recipient', 'x_median']]
+
+
+def sample_rows(frame: pd.DataFrame, count: int) -> pd.DataFrame:
+    """count transactions spread evenly from newest to oldest"""
+    if count >= len(frame):
+        return frame[SAMPLE_COLUMNS]
+    positions = np.unique(np.linspace(0, len(frame) - 1, count).round().astype(int))
+    return frame.iloc[positions][SAMPLE_COLUMNS]
+
+
+def _fit_table(title: str, table: pd.DataFrame, tokens: int, limit: Optional[int] = None) -> str:
+    """title and as many leading rows of table as fit in tokens; empty when not even one does"""
+    rows = len(table) if limit is None else min(limit, len(table))
+    while rows > 0:
+        text = f"{title}:\n{_csv(table.head(rows))}"
+        if estimate_tokens(text) <= tokens:
+            return text
+        # Shrink in proportion to the overshoot rather than one row at a time
+        rows = min(rows - 1, int(rows * tokens / estimate_tokens(text)))
+    return ''
+
+
+def build_context(frame: pd.DataFrame, budget: Optional[int] = None, top: int = 15) -> str:
+    """
+    Context for a frame with the export's columns in at most budget tokens
+    (PROMPT_TOKEN_BUDGET by default). Sections are added in priority order
+    and the leftover budget is filled with sampled transactions.
+    """
+    budget = budget or token_budget()
+    frame = normalize_transactions(frame)
+    if frame.empty:
+        return "No transactions."
+
+    sections: List[str] = [overview(frame)]
+    tables: List[Tuple[str, pd.DataFrame, Optional[int]]] = [
+        ("Monthly trend (newest first)", monthly_trend(frame), None),
+        ("Expenses by category", expense_aggregates(frame, 'category'), top),
+        ("Top merchants by expense", expense_aggregates(frame, 'recipient'), top),
+        ("Unusually large expenses (x_median = times the category median)", outliers(frame), 10),
+    ]
+    remaining = budget - estimate_tokens(sections[0])
+    for title, table, limit in tables:
+        if table.empty:
+            continue
+        text = _fit_table(title, table, remaining, limit)
+        if text:
+            sections.append(text)
+            remaining -= estimate_tokens(text) + 1
+
+    if len(frame) and remaining > 0:
+        # Size the sample from the rendered cost of an average row
+        probe = _csv(sample_rows(frame, min(len(frame), 20)))
+        per_row = max(estimate_tokens(probe) / (probe.count('\n') or 1), 1)
+        title = f"Sample of transactions (evenly spread, {len(frame)} in total)"
+        text = _fit_table(title, sample_rows(frame, int(remaining / per_row)), remaining)
+        if text:
+            sections.append(text)
+
+    return '\n\n'.join(sections)
+
+
+def context_frame(table) -> Optional[pd.DataFrame]:
+    """The context columns of a cached Arrow table as a DataFrame, or None without a table"""
+    return table.select(CONTEXT_COLUMNS).to_pandas() if table is not None else None
+
+
+def load_context_frame(user_id: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    The user's transactions for build_context: a valid user's Arrow cache,
+    synced first, or a one-off query for everyone else
+    """
+    from bson.objectid import ObjectId
+
+    if user_id and ObjectId.is_valid(user_id):
+        from user_dataset import user_transactions_table
+
+        return context_frame(user_transactions_table(user_id))
+
+    from export_transactions_to_csv import fetch_transactions_dataframe
+
+    return fetch_transactions_dataframe(user_id, columns=CONTEXT_COLUMNS)
+
+
+def user_context(user_id: Optional[str] = None, budget: Optional[int] = None) -> Optional[str]:
+    """Compact context for a user's transactions, or None when they have none"""
+    frame = load_context_frame(user_id)
+    if frame is None or frame.empty:
+        return None
+    return build_context(frame, budget)
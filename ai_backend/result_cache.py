@@ -0,0 +1,142 @@
+"""
+Cache of finished insights and budget plans
+A result is stored per user and kind together with a fingerprint of everything
+it was generated from (the user's transaction set, their goals, the prompt
+version). A lookup only hits when the fingerprint still matches, so new
+transactions or edited goals miss automatically, and storing the new result
+replaces the stale one. Entries live in an in-memory LRU with a TTL and,
+when RESULT_CACHE_DIR is set, in JSON files there as well, which survive
+restarts and are shared with the scripts the Node backend spawns.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable digest of JSON-serializable parts; anything else is hashed by its str()"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class ResultCache:
+    """LRU of (user, kind) -> (fingerprint, expiry, value) with an optional directory of JSON files"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS,
+                 directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> 'ResultCache':
+        try:
+            max_entries = int(os.getenv('RESULT_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+            ttl = float(os.getenv('RESULT_CACHE_TTL', DEFAULT_TTL_SECONDS))
+        except ValueError:
+            print("[WARN] Ignoring invalid RESULT_CACHE_SIZE/RESULT_CACHE_TTL, using defaults")
+            max_entries, ttl = DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS
+        return cls(max_entries, ttl, os.getenv('RESULT_CACHE_DIR') or None)
+
+    def _path(self, user_id: str, kind: str) -> Path:
+        safe_user = re.sub(r'[^A-Za-z0-9_-]', '_', str(user_id))
+        return self.directory / f"{safe_user}.{kind}.json"
+
+    def get(self, user_id: str, kind: str, key: str) -> Optional[Any]:
+        """The value stored for this fingerprint, or None when missing, stale or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((user_id, kind))
+            if entry and entry[0] == key and entry[1] > now:
+                self._entries.move_to_end((user_id, kind))
+                self.hits += 1
+                return entry[2]
+
+        stored = self._read_disk(user_id, kind, key, now)
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Keeps the original creation time, so the entry still expires at created + ttl
+            created, value = stored
+            self._remember(user_id, kind, key, value, created)
+        return value
+
+    def set(self, user_id: str, kind: str, key: str, value: Any):
+        """Store a JSON-serializable result, replacing whatever the user had for this kind"""
+        now = time.time()
+        with self._lock:
+            self._remember(user_id, kind, key, value, now)
+        if self.directory is not None:
+            # The exporter pulls in pandas, which app.py does not load until a request needs it
+            from export_transactions_to_csv import atomic_write
+
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with atomic_write(str(self._path(user_id, kind)), encoding='utf-8') as f:
+                    json.dump({'fingerprint': key, 'created': now, 'value': value}, f)
+            except (OSError, TypeError) as e:
+                print(f"[WARN] Could not write cached {kind} for {user_id}: {e}")
+
+    def invalidate(self, user_id: str, kind: Optional[str] = None) -> int:
+        """Drop a user's cached results (one kind, or all); returns how many kinds were removed"""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == user_id and kind in (None, k[1])]
+            for k in keys:
+                del self._entries[k]
+        removed = {k[1] for k in keys}
+
+        if self.directory is not None and self.directory.exists():
+            pattern = self._path(user_id, kind or '*').name
+            for path in self.directory.glob(pattern):
+                path.unlink(missing_ok=True)
+                removed.add(path.name.split('.')[-2])
+        return len(removed)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'ttlSeconds': self.ttl,
+                'disk': str(self.directory) if self.directory else None,
+            }
+
+    def _remember(self, user_id: str, kind: str, key: str, value: Any, created: float):
+        # Called with the lock held
+        self._entries[(user_id, kind)] = (key, created + self.ttl, value)
+        self._entries.move_to_end((user_id, kind))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, user_id: str, kind: str, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        """The stored (created, value) for this fingerprint, or None when missing, stale or expired"""
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(user_id, kind), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        created = entry.get('created', 0)
+        if entry.get('fingerprint') != key or created + self.ttl <= now:
+            return None
+        return created, entry.get('value')
+
+
+result_cache = ResultCache.from_env()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Seed the financebot database with synthetic users, transactions and budget goals
+Documents follow the backend's mongoose schemas and are written with unordered
+insert_many in large batches, optionally from several processes, to build
+load-test datasets of millions of transactions
+
+Usage:
+    python seed_data.py [--users 100] [--transactions-per-user 10000] [--goals-per-user 2]
+        [--days 365] [--batch-size 10000] [--workers 1] [--seed 0]
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+
+from db import DB_NAME, close_client, get_db
+from synthetic_export import MERCHANTS, PEOPLE
+
+# Expense category -> (relative weight, median amount in INR)
+EXPENSE_CATEGORIES = {
+    'Food & Dining': (30, 180),
+    'Groceries': (15, 600),
+    'Transportation': (15, 120),
+    'Shopping': (10, 1200),
+    'Bills & Utilities': (8, 1500),
+    'Entertainment': (7, 400),
+    'Health': (5, 700),
+    'Transfers': (10, 1000),
+}
+STATUSES = [('Completed', 95), ('Failed', 3), ('Pending', 2)]
+PAYMENT_METHODS = ['Bank Account', 'UPI', 'Credit Card', 'Debit Card']
+
+GOALS = [
+    ('Gaming Laptop', 'gadget', 80000), ('Mountain Bike', 'vehicle', 50000), ('Gold Watch', 'luxury', 25000),
+    ('Japan Trip', 'travel', 200000), ('iPhone 15 Pro', 'gadget', 130000), ('Emergency Fund', 'savings', 150000),
+]
+PRIORITIES = ['high', 'medium', 'low']
+
+SEED_FILE_NAME = 'seed_data.html'
+
+
+def _weighted(rng: random.Random, choices: Dict) -> str:
+    return rng.choices(list(choices), weights=[weight for weight, _ in choices.values()])[0]
+
+
+def synthetic_users(count: int, seed: int = 0) -> List[Dict]:
+    """
+    User documents with fixed _ids, so transaction workers need no lookups.
+    Wallet addresses are unique in the users collection, so they come from the
+    fresh _id and re-running with the same seed adds new users
+    """
+    users = []
+    for n in range(count):
+        user_id = ObjectId()
+        users.append({
+            '_id': user_id,
+            'walletAddress': f"addr_seed{seed}_{n:06d}_{user_id}",
+            'name': f"Seed User {n}",
+            'email': f"seed{seed}.user{n}@example.com",
+            'createdAt': datetime.now(),
+            'settings': {'currency': 'INR', 'theme': 'light'},
+        })
+    return users
+
+
+def synthetic_transactions(user_id: ObjectId, count: int, days: int = 365,
+                           seed: int = 0) -> Iterator[Dict]:
+    """
+    One user's transactions, newest first across the last days days: mostly
+    Google Pay imports, some manual entries and one salary credit per month
+    """
+    rng = random.Random(f"{seed}:{user_id}")
+    now = datetime.now().replace(microsecond=0)
+    salary = round(rng.uniform(30000, 150000), -3)
+    step = timedelta(days=days) / max(count, 1)
+    upload_date = now - timedelta(days=rng.randint(0, 30))
+    month = (now.year, now.month)
+
+    for n in range(count):
+        when = now - step * n - timedelta(seconds=rng.randint(0, 3600))
+        imported = rng.random() < 0.8
+        # Walking back in time, the first transaction seen in each earlier month is its salary
+        if (when.year, when.month) < month:
+            month = (when.year, when.month)
+            kind, category, amount = 'income', 'Salary', salary
+            description = 'Monthly salary'
+        elif rng.random() < 0.04:
+            kind, category = 'income', 'Transfers'
+            amount = round(rng.lognormvariate(7, 1), 2)
+            description = f"Received from {rng.choice(PEOPLE)}"
+        else:
+            kind, category = 'expense', _weighted(rng, EXPENSE_CATEGORIES)
+            amount = round(EXPENSE_CATEGORIES[category][1] * rng.lognormvariate(0, 0.8), 2)
+            description = f"{category} payment"
+
+        document = {
+            'userId': user_id,
+            'type': kind,
+            'amount': amount,
+            'currency': 'INR',
+            'category': category,
+            'description': description,
+            'status': rng.choices([s for s, _ in STATUSES], weights=[w for _, w in STATUSES])[0],
+            'date': when,
+            'tags': [category.lower(), 'upi'] if imported else [category.lower()],
+            'UPI': int(imported),
+            'UserInput': int(not imported),
+            '__v': 0,
+        }
+        if imported:
+            document.update({
+                'recipient': rng.choice(MERCHANTS if kind == 'expense' else PEOPLE),
+                'paymentMethod': rng.choice(PAYMENT_METHODS),
+                'accountNumber': f"XXXXXXXXXX{rng.randint(0, 999999):06d}",
+                'transactionId': f"T{rng.getrandbits(64):016x}",
+                'htmlFile': {'fileName': SEED_FILE_NAME, 'uploadDate': upload_date},
+            })
+        yield document
+
+
+def synthetic_goals(user_id: ObjectId, count: int, seed: int = 0) -> List[Dict]:
+    """Active savings goals in the shape budgetPlanner reads from the budgets collection"""
+    rng = random.Random(f"{seed}:{user_id}:goals")
+    now = datetime.now().replace(microsecond=0)
+    goals = []
+    for goal_name, category, target in rng.sample(GOALS, min(count, len(GOALS))):
+        goals.append({
+            'userId': user_id,
+            'goalName': goal_name,
+            'category': category,
+            'targetAmount': target,
+            'currentSavings': round(target * rng.uniform(0, 0.4), -2),
+            'deadline': now + timedelta(days=30 * rng.randint(2, 12)),
+            'priority': rng.choice(PRIORITIES),
+            'status': 'active',
+            'createdAt': now,
+        })
+    return goals
+
+
+def insert_batches(collection, documents: Iterable[Dict], batch_size: int,
+                   rejected: Optional[List[Dict]] = None) -> int:
+    """
+    insert_many documents batch_size at a time, unordered so one bad document
+    does not stop the rest of its batch; returns how many were inserted and
+    adds the documents MongoDB refused to rejected when given
+    """
+    documents = iter(documents)
+    inserted = 0
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return inserted
+        try:
+            inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get('nInserted', 0)
+            if rejected is not None:
+                rejected.extend(batch[error['index']] for error in e.details.get('writeErrors', []))
+            print(f"[WARN] {len(e.details.get('writeErrors', []))} documents rejected in a batch")
+
+
+def share_documents(share: Tuple[List[str], int, int, int, int]) -> Iterator[Dict]:
+    """The transactions of one worker's share of the users, user after user"""
+    user_ids, per_user, days, _, seed = share
+    for user_id in user_ids:
+        yield from synthetic_transactions(ObjectId(user_id), per_user, days, seed)
+
+
+def seed_transactions(share: Tuple[List[str], int, int, int, int]) -> int:
+    """Worker: insert one share of the transactions through this process's own client"""
+    try:
+        return insert_batches(get_db()['transactions'], share_documents(share), share[3])
+    finally:
+        close_client()
+
+
+def seed_database(users: int, per_user: int, goals_per_user: int = 2, days: int = 365,
+                  batch_size: int = 10000, workers: int = 1, seed: int = 0) -> Dict:
+    """Insert everything and return counts and elapsed seconds per collection"""
+    db = get_db()
+    report = {}
+
+    start = time.perf_counter()
+    user_documents = synthetic_users(users, seed)
+    rejected = []
+    report['users'] = (insert_batches(db['users'], user_documents, batch_size, rejected),
+                       time.perf_counter() - start)
+    if rejected:
+        # Goals and transactions of users that were never inserted would be orphans
+        rejected_ids = {user['_id'] for user in rejected}
+        user_documents = [user for user in user_documents if user['_id'] not in rejected_ids]
+        print(f"[WARN] Seeding goals and transactions for the {len(user_documents)} users inserted")
+
+    start = time.perf_counter()
+    goals = (goal for user in user_documents for goal in synthetic_goals(user['_id'], goals_per_user, seed))
+    report['budgets'] = (insert_batches(db['budgets'], goals, batch_size), time.perf_counter() - start)
+
+    user_ids = [str(user['_id']) for user in user_documents]
+    shares = [(user_ids[n::workers], per_user, days, batch_size, seed) for n in range(workers)]
+    start = time.perf_counter()
+    if workers > 1:
+        # Clients must not cross a fork, so every worker process opens its own
+        close_client()
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            inserted = sum(pool.map(seed_transactions, shares))
+    else:
+        inserted = insert_batches(db['transactions'], share_documents(shares[0]), batch_size)
+    report['transactions'] = (inserted, time.perf_counter() - start)
+    return report
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--users', type=int, default=100)
+    arg_parser.add_argument('--transactions-per-user', type=int, default=10000)
+    arg_parser.add_argument('--goals-per-user', type=int, default=2)
+    arg_parser.add_argument('--days', type=int, default=365, help="How far back transactions go")
+    arg_parser.add_argument('--batch-size', type=int, default=10000)
+    arg_parser.add_argument('--workers', type=int, default=1, help="Processes inserting transactions")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    print(f"[INFO] Seeding {args.users} users x {args.transactions_per_user} transactions into {DB_NAME}")
+    try:
+        report = seed_database(args.users, args.transactions_per_user, args.goals_per_user, args.days,
+                               args.batch_size, max(args.workers, 1), args.seed)
+    finally:
+        close_client()
+
+    for collection, (inserted, seconds) in report.items():
+        rate = inserted / seconds if seconds else 0.0
+        print(f"[INFO] {collection:<12} {inserted:>10,} inserted in {seconds:7.2f}s ({rate:,.0f} inserts/sec)")
+
+
+if __name__ == '__main__':
+    main()
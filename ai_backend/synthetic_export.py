@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Synthetic Google Pay "My Activity" exports for benchmarks and tests
+Writes the markup of a real Takeout export in either block layout, with any
+mix of currencies and 12h or 24h timestamps, at a chosen size
+
+Usage:
+    python synthetic_export.py OUTPUT.html [--transactions N | --size-mb M]
+        [--layout outer-cell|title] [--clock 12h|24h]
+        [--currencies INR,USD,EUR,GBP] [--seed S]
+"""
+import argparse
+import random
+import string
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Symbol and the GMT offset an export in that currency is usually written in
+CURRENCIES = {
+    'INR': ('₹', timedelta(hours=5, minutes=30)),
+    'USD': ('$', timedelta(hours=-5)),
+    'EUR': ('€', timedelta(hours=1)),
+    'GBP': ('£', timedelta(0)),
+}
+
+LAYOUTS = ('outer-cell', 'title')
+CLOCKS = ('12h', '24h')
+
+MERCHANTS = [
+    'Sri Udupi Food Hub', 'CMP PPI Wallet Load', 'IRCTC UTS', 'OpenAI LLC', 'Google Play',
+    'MODERN MILK SUPPLIERS', 'SAI PRASAD MEDICAL STORES', 'Vijay Chaat House', 'MC DONALDS',
+    'Rahul Juice Centre', 'Indian Railways', 'Angel One Limited', 'VIJAY SALES', 'DARSHAN FOODS',
+    'Cashfree Payments India Pvt Ltd', 'NOLAN EDUTECH PRIVATE LIMITED', 'RASAM CAFE', 'HOTEL LOKMANYA',
+]
+PEOPLE = ['GEETA', 'Alvin Shah', 'PRAKASH VAISHNAV', 'Sharda Hasija', 'ANKUR RATHORE', 'Atul Appaji Davane']
+
+# How the first line of a block reads, with relative weights from real exports
+KINDS = [
+    ('paid_to', 60), ('paid', 12), ('sent', 12), ('received', 12), ('received_from', 4),
+]
+STATUSES = [('Completed', 95), ('Failed', 3), ('Pending', 1), ('Cancelled', 1)]
+
+OUTER_CELL_BLOCK = '''<div class="outer-cell mdl-cell mdl-cell--12-col mdl-shadow--2dp">
+        <div class="mdl-grid">
+          <div class="header-cell mdl-cell mdl-cell--12-col">
+            <p class="mdl-typography--title">Google Pay<br /></p>
+          </div>
+{content}
+        </div>
+      </div>
+      '''
+
+# Same cells without the outer-cell wrapper, so only the title paragraphs delimit blocks
+TITLE_BLOCK = '''<div class="activity-cell mdl-cell mdl-cell--12-col">
+            <p class="mdl-typography--title">Google Pay<br /></p>
+{content}
+      </div>
+      '''
+
+CONTENT = '''          <div
+            class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1"
+          >
+            {summary}<br />{timestamp}<br />
+          </div>
+          <div
+            class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1 mdl-typography--text-right"
+          ></div>
+          <div
+            class="content-cell mdl-cell mdl-cell--12-col mdl-typography--caption"
+          >
+            <b>Products:</b><br />&emsp;Google Pay<br /><b>Details:</b
+            ><br />&emsp;{transaction_id}<br />&emsp;{status}<br />
+          </div>'''
+
+HEADER = '''<html>
+  <head>
+    <title>My Activity History</title>
+    <style type="text/css">
+{style}
+    </style>
+  </head>
+  <body>
+    <div class="mdl-grid">
+      '''
+FOOTER = '''</div>
+  </body>
+</html>
+'''
+
+# Real exports inline about 200 KB of Material Design Lite CSS before the first block
+CSS_RULE = '''      .mdl-cell--{n}-col {{
+        box-sizing: border-box;
+        width: calc(8.3333333333% * {n} - 16px);
+      }}
+'''
+
+
+def _weighted(rng: random.Random, choices: Sequence[Tuple[str, int]]) -> str:
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+
+def synthetic_transactions(count: Optional[int] = None, currencies: Sequence[str] = ('INR',),
+                           seed: int = 0) -> Iterator[Dict]:
+    """
+    Yield transactions newest first, as the parser should extract them, plus a
+    'summary' line and a 'when' datetime used to render the block.
+    Runs forever when count is None.
+    """
+    rng = random.Random(seed)
+    accounts = ['XXXXXXXXXX' + ''.join(rng.choices(string.digits, k=6)) for _ in range(2)]
+    when = datetime(2025, 11, 28, 20, 0, 0)
+    n = 0
+
+    while count is None or n < count:
+        currency = rng.choice(list(currencies))
+        symbol, offset = CURRENCIES[currency]
+        amount = round(rng.lognormvariate(4, 1.2), 2) + 1
+        amount_text = f"{symbol}{amount:,.2f}"
+        account = rng.choice(accounts)
+        kind = _weighted(rng, KINDS)
+
+        recipient = payment_method = account_number = None
+        if kind == 'paid_to':
+            recipient = rng.choice(MERCHANTS + PEOPLE)
+            payment_method, account_number = 'Bank Account', account
+            summary = f"Paid {amount_text} to {recipient} using Bank Account\n            {account}"
+        elif kind in ('paid', 'sent'):
+            payment_method, account_number = 'Bank Account', account
+            summary = f"{kind.title()} {amount_text} using Bank Account {account}"
+        elif kind == 'received_from':
+            recipient = rng.choice(PEOPLE)
+            summary = f"Received {amount_text} from {recipient}"
+        else:
+            summary = f"Received {amount_text}"
+
+        when -= timedelta(minutes=rng.randint(1, 600), seconds=rng.randint(0, 59))
+        local = when.replace(tzinfo=timezone(offset))
+        yield {
+            'timestamp': local.isoformat(),
+            'amount': float(f"{amount:.2f}"),
+            'currency': currency,
+            'recipient': recipient,
+            'payment_method': payment_method,
+            'account_number': account_number,
+            'transaction_id': ''.join(rng.choices(string.ascii_letters + string.digits, k=16)),
+            'status': _weighted(rng, STATUSES),
+            'product': 'Google Pay',
+            'wallet': 'Google Pay',
+            'summary': summary,
+            'when': local,
+        }
+        n += 1
+
+
+def format_timestamp(when: datetime, clock: str) -> str:
+    """Timestamp text as an export writes it, e.g. 'Nov 28, 2025, 8:02:15 AM GMT+05:30'"""
+    offset = when.strftime('%z')
+    gmt = f"GMT{offset[:3]}:{offset[3:]}"
+    if clock == '12h':
+        hour = when.hour % 12 or 12
+        meridiem = 'AM' if when.hour < 12 else 'PM'
+        return f"{when:%b} {when.day}, {when.year}, {hour}:{when:%M:%S} {meridiem} {gmt}"
+    return f"{when.day} {when:%b} {when.year}, {when:%H:%M:%S} {gmt}"
+
+
+def render_block(transaction: Dict, layout: str = 'outer-cell', clock: str = '12h') -> str:
+    content = CONTENT.format(
+        summary=transaction['summary'],
+        timestamp=format_timestamp(transaction['when'], clock),
+        transaction_id=transaction['transaction_id'],
+        status=transaction['status'],
+    )
+    template = OUTER_CELL_BLOCK if layout == 'outer-cell' else TITLE_BLOCK
+    return template.format(content=content)
+
+
+def render_header(header_kb: int = 200) -> str:
+    rules = []
+    size = 0
+    n = 0
+    while size < header_kb * 1024:
+        rule = CSS_RULE.format(n=n % 12 + 1)
+        rules.append(rule)
+        size += len(rule)
+        n += 1
+    return HEADER.format(style=''.join(rules))
+
+
+def write_export(path: str, transactions: Optional[int] = None, size_mb: Optional[float] = None,
+                 layout: str = 'outer-cell', clock: str = '12h', currencies: Sequence[str] = ('INR',),
+                 seed: int = 0, header_kb: int = 200) -> Dict:
+    """
+    Write an export with the given number of transactions, or as many as fit
+    in size_mb. Returns the transaction count and file size in bytes.
+    """
+    if transactions is None and size_mb is None:
+        raise ValueError("Give a transaction count or a size")
+    limit = None if size_mb is None else int(size_mb * 1024 * 1024)
+
+    written = 0
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        header = render_header(header_kb)
+        f.write(header)
+        written += len(header.encode('utf-8'))
+
+        for transaction in synthetic_transactions(transactions, currencies, seed):
+            if limit is not None and written >= limit:
+                break
+            block = render_block(transaction, layout, clock)
+            f.write(block)
+            written += len(block.encode('utf-8'))
+            count += 1
+
+        f.write(FOOTER)
+        written += len(FOOTER)
+
+    return {'transactions': count, 'bytes': written}
+
+
+def generate_export(transactions: int, layout: str = 'outer-cell', clock: str = '12h',
+                    currencies: Sequence[str] = ('INR',), seed: int = 0,
+                    header_kb: int = 1) -> Tuple[str, List[Dict]]:
+    """Build a small export in memory; returns the HTML and the transactions it holds"""
+    expected = []
+    blocks = []
+    for transaction in synthetic_transactions(transactions, currencies, seed):
+        blocks.append(render_block(transaction, layout, clock))
+        expected.append({k: v for k, v in transaction.items() if k not in ('summary', 'when')})
+    return render_header(header_kb) + ''.join(blocks) + FOOTER, expected
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('output')
+    size = arg_parser.add_mutually_exclusive_group(required=True)
+    size.add_argument('--transactions', type=int)
+    size.add_argument('--size-mb', type=float)
+    arg_parser.add_argument('--layout', choices=LAYOUTS, default='outer-cell')
+    arg_parser.add_argument('--clock', choices=CLOCKS, default='12h')
+    arg_parser.add_argument('--currencies', default='INR',
+                            help="Comma-separated, from " + ', '.join(CURRENCIES))
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    currencies = [c.strip().upper() for c in args.currencies.split(',') if c.strip()]
+    unknown = [c for c in currencies if c not in CURRENCIES]
+    if unknown:
+        arg_parser.error(f"Unknown currencies: {', '.join(unknown)}")
+
+    result = write_export(args.output, args.transactions, args.size_mb, args.layout,
+                          args.clock, currencies, args.seed)
+    print(f"[INFO] Wrote {result['transactions']} transactions "
+          f"({result['bytes'] / 1024 / 1024:.1f} MB) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Checks for the database diagnostics in check_collections.py
+Explain output and index information are given as literals, so no MongoDB is needed
+"""
+import sys
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from check_collections import (
+    RECOMMENDED_INDEXES, backend_queries, create_index_command, format_bytes, missing_indexes,
+    summarize_explain,
+)
+
+USER_ID = '6929a1f0c2b4a1d2e3f40001'
+
+
+def test_summarize_explain():
+    """Stages are read through nested inputs, including slot-based queryPlan trees"""
+    explain = {
+        'queryPlanner': {'winningPlan': {'queryPlan': {
+            'stage': 'FETCH',
+            'filter': {'type': {'$eq': 'expense'}},
+            'inputStage': {'stage': 'IXSCAN', 'indexName': 'userId_1_date_-1'},
+        }}},
+        'executionStats': {'totalKeysExamined': 40, 'totalDocsExamined': 40, 'nReturned': 12,
+                           'executionTimeMillis': 3},
+    }
+    summary = summarize_explain(explain)
+
+    assert summary['stages'] == ['FETCH', 'IXSCAN']
+    assert summary['indexes'] == ['userId_1_date_-1']
+    assert not summary['collscan'] and not summary['inMemorySort']
+    assert (summary['docsExamined'], summary['returned']) == (40, 12)
+
+    scan = summarize_explain({'queryPlanner': {'winningPlan': {
+        'stage': 'SORT', 'inputStage': {'stage': 'COLLSCAN'},
+    }}})
+    assert scan['collscan'] and scan['inMemorySort'] and scan['indexes'] == []
+
+
+def test_missing_indexes():
+    """An index whose key starts with the recommended fields covers it"""
+    index_information = {
+        '_id_': {'key': [('_id', 1)]},
+        'userId_1_date_-1': {'key': [('userId', 1), ('date', -1.0)]},
+    }
+    missing = missing_indexes(index_information, RECOMMENDED_INDEXES['transactions'])
+
+    assert missing == [[('userId', 1), ('_id', 1)], [('userId', 1), ('fingerprint', 1)], [('userId', 1), ('updatedAt', 1)]]
+    assert create_index_command('transactions', missing[0]) == \
+        "db.transactions.createIndex({ userId: 1, _id: 1 })"
+
+    index_information['userId_1__id_1_date_-1'] = {
+        'key': [('userId', 1), ('_id', 1), ('date', -1)],
+    }
+    index_information['userId_1_fingerprint_1'] = {'key': [('userId', 1), ('fingerprint', 1)]}
+    index_information['userId_1_updatedAt_1'] = {'key': [('userId', 1), ('updatedAt', 1)]}
+    assert missing_indexes(index_information, RECOMMENDED_INDEXES['transactions']) == []
+
+
+def test_backend_queries():
+    """Explained queries target one user and keep the exporter's projection"""
+    queries = {query['name']: query for query in backend_queries(USER_ID)}
+
+    assert '$gt' in queries['export cache sync']['filter']['_id']
+    assert queries['active goals by deadline']['sort'] == [('deadline', 1)]
+    assert 'htmlFile.content' not in queries['export (all)']['projection']
+    assert all(str(query['filter']['userId']) == USER_ID for query in queries.values())
+
+
+def test_format_bytes():
+    assert format_bytes(None) == 'n/a'
+    assert format_bytes(512) == '512 B'
+    assert format_bytes(3 * 1024 * 1024) == '3.0 MB'
+
+
+if __name__ == '__main__':
+    test_summarize_explain()
+    test_missing_indexes()
+    test_backend_queries()
+    test_format_bytes()
+    print("Collection diagnostics checks passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared MongoDB client in db.py
+None of these need a running MongoDB server
+"""
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import db
+
+
+def test_pool_options_from_environment():
+    """Environment variables override pool defaults; bad values fall back"""
+    saved = {name: os.environ.get(name) for name in ('MONGO_MAX_POOL_SIZE', 'MONGO_WAIT_QUEUE_TIMEOUT_MS')}
+    try:
+        os.environ['MONGO_MAX_POOL_SIZE'] = '7'
+        os.environ['MONGO_WAIT_QUEUE_TIMEOUT_MS'] = 'soon'
+        options = db.pool_options()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    assert options['maxPoolSize'] == 7
+    assert options['waitQueueTimeoutMS'] == db.POOL_SETTINGS['waitQueueTimeoutMS'][1]
+    assert set(options) == set(db.POOL_SETTINGS)
+
+
+def test_pool_metrics_track_checkouts():
+    """Checkout waits, failures and connections in use are counted"""
+    metrics = db.PoolMetrics()
+    event = SimpleNamespace(address=('localhost', 27017), connection_id=1)
+
+    metrics.connection_created(event)
+    metrics.connection_check_out_started(event)
+    metrics.connection_checked_out(event)
+    metrics.connection_check_out_started(event)
+    metrics.connection_check_out_failed(event)
+    snapshot = metrics.snapshot()
+
+    assert snapshot['checkouts'] == 1
+    assert snapshot['failedCheckouts'] == 1
+    assert snapshot['inUse'] == 1
+    assert snapshot['openConnections'] == 1
+    assert 0 <= snapshot['avgWaitMs'] <= snapshot['maxWaitMs']
+
+    metrics.connection_checked_in(event)
+    assert metrics.snapshot()['inUse'] == 0
+
+
+def test_client_is_shared():
+    """Every caller gets the same lazily created client with the pool options applied"""
+    db.close_client()
+    # A plain mongodb:// URI, since mongodb+srv:// resolves DNS when the client is built
+    saved_uri, db.MONGO_URI = db.MONGO_URI, 'mongodb://localhost:27017/financebot'
+    try:
+        client = db.get_client()
+        assert db.get_client() is client
+        assert db.get_db().name == db.DB_NAME
+        assert client.options.pool_options.max_pool_size == db.pool_options()['maxPoolSize']
+    finally:
+        db.close_client()
+        db.MONGO_URI = saved_uri
+
+
+if __name__ == '__main__':
+    test_pool_options_from_environment()
+    test_pool_metrics_track_checkouts()
+    test_client_is_shared()
+    print("MongoDB client checks passed")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Checks for the in-process transaction export in export_transactions_to_csv.py
+"""
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bson.objectid import ObjectId
+
+import export_transactions_to_csv as exporter
+from export_transactions_to_csv import (
+    EXPORT_COLUMNS, EXPORT_PROJECTION, atomic_write, documents_to_frame, summary_pipeline, user_filter,
+    write_csv_batches,
+)
+
+USER_ID = ObjectId('6929a1f0c2b4a1d2e3f40001')
+
+DOCUMENTS = [
+    {
+        '_id': ObjectId('6929a1f0c2b4a1d2e3f40011'), 'userId': USER_ID, 'type': 'expense',
+        'amount': 120.0, 'category': 'Food', 'date': datetime(2025, 11, 28, 17, 54, 19),
+        'tags': ['upi', 'food'], 'htmlFile': {'fileName': 'My Activity.html', 'uploadDate': '2025-11-29'},
+        'UPI': 1, 'UserInput': 0, '__v': 0,
+    },
+    {
+        '_id': ObjectId('6929a1f0c2b4a1d2e3f40012'), 'userId': USER_ID, 'type': 'income',
+        'amount': 500.0, 'category': 'Salary', 'date': datetime(2025, 11, 27, 9, 0, 0),
+        'description': 'Manual entry', 'UPI': 0, 'UserInput': 1, '__v': 0,
+    },
+]
+
+
+def test_documents_flatten_to_export_columns():
+    """ObjectIds, tags and htmlFile are flattened and every export column is present, in order"""
+    df = documents_to_frame(DOCUMENTS)
+
+    assert list(df.columns) == EXPORT_COLUMNS
+    assert df['_id'].tolist() == [str(doc['_id']) for doc in DOCUMENTS]
+    assert df['userId'].tolist() == [str(USER_ID)] * 2
+    assert df['tags'].tolist()[0] == 'upi,food'
+    assert df['htmlFile'].tolist()[0] == 'My Activity.html (2025-11-29)'
+
+    csv_lines = df.to_csv(index=False).splitlines()
+    assert len(csv_lines) == 3
+    assert '2025-11-28 17:54:19' in csv_lines[1]
+
+
+class ListCursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __iter__(self):
+        return self._documents
+
+    def close(self):
+        pass
+
+
+def test_fetch_dataframe_converts_in_batches():
+    """The one-off DataFrame is built batch by batch and can keep only some columns"""
+    saved = exporter.find_transactions
+    exporter.find_transactions = lambda *args, **kwargs: ListCursor(DOCUMENTS)
+    try:
+        df = exporter.fetch_transactions_dataframe(batch_size=1)
+        assert df.to_csv(index=False) == documents_to_frame(DOCUMENTS).to_csv(index=False)
+
+        slim = exporter.fetch_transactions_dataframe(columns=['date', 'amount'], batch_size=1)
+        assert list(slim.columns) == ['date', 'amount'] and slim['amount'].tolist() == [120.0, 500.0]
+
+        exporter.find_transactions = lambda *args, **kwargs: ListCursor([])
+        assert exporter.fetch_transactions_dataframe() is None
+    finally:
+        exporter.find_transactions = saved
+
+
+def test_empty_export_keeps_the_previous_file():
+    saved = exporter.has_transactions
+    exporter.has_transactions = lambda *args: False
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'export.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('previous export\n')
+            assert exporter.export_transactions_to_csv(str(USER_ID), path) is None
+            with open(path, 'r', encoding='utf-8') as f:
+                assert f.read() == 'previous export\n'
+    finally:
+        exporter.has_transactions = saved
+
+
+def test_user_filter():
+    """Valid ids select one user; missing or malformed ids fall back to everything"""
+    assert user_filter(str(USER_ID)) == {'userId': USER_ID}
+    assert user_filter(None) == {}
+    assert user_filter('not-an-object-id') == {}
+
+
+def test_projection_skips_uploaded_html():
+    """Every export column is fetched, but only the name and date of htmlFile"""
+    assert 'htmlFile' not in EXPORT_PROJECTION
+    assert 'htmlFile.content' not in EXPORT_PROJECTION
+    assert {'htmlFile.fileName', 'htmlFile.uploadDate'} <= set(EXPORT_PROJECTION)
+    assert set(EXPORT_COLUMNS) - {'htmlFile'} <= set(EXPORT_PROJECTION)
+
+
+def test_summary_pipeline():
+    """Statistics are grouped on the server for exactly the exported documents"""
+    query_filter = user_filter(str(USER_ID))
+    match, group, project = summary_pipeline(query_filter)
+
+    assert match == {'$match': query_filter}
+    assert set(group['$group']) == {
+        '_id', 'total', 'income', 'expenses', 'totalAmount', 'htmlImports', 'manualInputs',
+    }
+    assert group['$group']['income'] == {'$sum': {'$cond': [{'$eq': ['$type', 'income']}, 1, 0]}}
+    assert project == {'$project': {'_id': 0}}
+
+
+def test_streamed_csv_matches_dataframe_export():
+    """Any batch size writes the rows a single-batch export would, under one fixed header"""
+    expected_csv = documents_to_frame(DOCUMENTS).to_csv(index=False)
+
+    for batch_size in (1, 2, 1000):
+        out = io.StringIO()
+        assert write_csv_batches(iter(DOCUMENTS), out, batch_size) == 2
+        assert out.getvalue() == expected_csv, batch_size
+
+    out = io.StringIO()
+    assert write_csv_batches([], out) == 0
+    assert out.getvalue() == ','.join(EXPORT_COLUMNS) + '\n'
+
+
+def test_atomic_write_replaces_or_keeps():
+    """The target changes only when the write completes, and no temp files are left behind"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'export.csv')
+        with atomic_write(path, encoding='utf-8') as f:
+            f.write('first\n')
+            assert not os.path.exists(path)
+
+        try:
+            with atomic_write(path, encoding='utf-8') as f:
+                f.write('partial')
+                raise RuntimeError('export failed')
+        except RuntimeError:
+            pass
+
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == 'first\n'
+        assert os.listdir(tmp_dir) == ['export.csv']
+
+
+if __name__ == '__main__':
+    test_documents_flatten_to_export_columns()
+    test_fetch_dataframe_converts_in_batches()
+    test_empty_export_keeps_the_previous_file()
+    test_user_filter()
+    test_projection_skips_uploaded_html()
+    test_summary_pipeline()
+    test_streamed_csv_matches_dataframe_export()
+    test_atomic_write_replaces_or_keeps()
+    print("Transaction export checks passed")
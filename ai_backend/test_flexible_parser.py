@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Checks for the parallel parsing mode of flexible_parser.FlexibleGooglePayParser
+"""
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import flexible_parser
+from flexible_parser import FlexibleGooglePayParser
+
+HERE = Path(__file__).parent
+EXPORTS = [str(HERE / "harshal.html"), str(HERE / "My Activity.html"), str(HERE / "test_sample.html")]
+
+
+def test_parallel_matches_serial():
+    """Process pool output is row-for-row identical to the serial path"""
+    parser = FlexibleGooglePayParser()
+    serial = parser.parse_multiple_files(EXPORTS)
+
+    for workers, chunk_blocks in [(2, 37), (None, 500)]:
+        parallel = parser.parse_multiple_files(EXPORTS, workers=workers, chunk_blocks=chunk_blocks)
+        assert parallel.equals(serial)
+        assert list(parallel.index) == list(serial.index)
+
+
+class InlinePool:
+    """Stands in for ProcessPoolExecutor, counting results submitted but not yet collected"""
+    outstanding = 0
+    peak = 0
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        cls = InlinePool
+        cls.outstanding += 1
+        cls.peak = max(cls.peak, cls.outstanding)
+        future = Future()
+        future.set_result(fn(*args))
+        original_result = future.result
+
+        def result(timeout=None):
+            cls.outstanding -= 1
+            return original_result(timeout)
+        future.result = result
+        return future
+
+
+def test_parallel_bounds_chunks_in_flight():
+    """No more than IN_FLIGHT_PER_WORKER chunks per worker wait to be collected"""
+    parser = FlexibleGooglePayParser()
+    serial = parser.parse_multiple_files(EXPORTS)
+
+    saved = flexible_parser.ProcessPoolExecutor
+    flexible_parser.ProcessPoolExecutor = InlinePool
+    try:
+        bounded = parser.parse_multiple_files(EXPORTS, workers=2, chunk_blocks=5)
+    finally:
+        flexible_parser.ProcessPoolExecutor = saved
+
+    assert bounded.equals(serial)
+    assert InlinePool.outstanding == 0
+    assert InlinePool.peak == flexible_parser.IN_FLIGHT_PER_WORKER * 2
+
+
+if __name__ == '__main__':
+    test_parallel_matches_serial()
+    test_parallel_bounds_chunks_in_flight()
+    print("Parallel parsing checks passed")
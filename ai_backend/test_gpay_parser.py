@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared gpay_parser package: block sources, output formatters
+and agreement between the two entry points
+"""
+import io
+import json
+import sys
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gpay_parser import (
+    BatchFormatter, BlockListSource, CsvFormatter, DataFrameFormatter, FileSource, FlexibleGooglePayParser,
+    HtmlSource, JsonFormatter,
+)
+import flexible_parser
+import parse_html_to_json
+
+HERE = Path(__file__).parent
+EXPORT = HERE / "harshal.html"
+
+
+def test_sources_yield_the_same_blocks():
+    """Files read in small chunks, in-memory HTML and pre-split blocks give the same transactions"""
+    parser = FlexibleGooglePayParser()
+    expected = parser.parse(FileSource(str(EXPORT)))
+    blocks = list(FileSource(str(EXPORT), chunk_size=4096).blocks())
+
+    assert expected
+    assert list(HtmlSource(EXPORT.read_text(encoding='utf-8'))) == blocks
+    assert parser.parse(BlockListSource(blocks)) == expected
+    assert parser.parse(str(EXPORT)) == expected
+
+
+def test_entry_points_share_the_engine():
+    """parse_html_to_json and flexible_parser extract identical transactions"""
+    assert parse_html_to_json.FlexibleGooglePayParser is FlexibleGooglePayParser
+
+    node = parse_html_to_json.FlexibleGooglePayParser().parse_html_file(str(EXPORT))
+    analysis = flexible_parser.FlexibleGooglePayParser().parse_html_file(str(EXPORT))
+    assert node == analysis
+
+
+def test_formatters():
+    """JSON matches json.dumps and the DataFrame/CSV outputs keep every transaction"""
+    parser = FlexibleGooglePayParser()
+    transactions = parser.parse(FileSource(str(EXPORT)))
+    batch = parser.parse(FileSource(str(EXPORT)), BatchFormatter())
+
+    assert JsonFormatter().format(transactions) == json.dumps(transactions)
+    assert JsonFormatter().format(batch) == json.dumps(transactions)
+    assert JsonFormatter().format([]) == '[]'
+    stream = io.StringIO()
+    JsonFormatter().write(iter(transactions), stream)
+    assert stream.getvalue() == json.dumps(transactions)
+
+    df = DataFrameFormatter(['amount', 'timestamp', 'missing']).format(transactions)
+    assert list(df.columns) == ['amount', 'timestamp']
+    assert len(df) == len(transactions)
+    assert list(df['timestamp']) == sorted(df['timestamp'], reverse=True)
+
+    csv_text = CsvFormatter().format(batch)
+    assert csv_text.splitlines()[0] == ','.join(parser.STANDARD_COLUMNS)
+    assert len(csv_text.splitlines()) == len(transactions) + 1
+
+
+if __name__ == '__main__':
+    test_sources_yield_the_same_blocks()
+    test_entry_points_share_the_engine()
+    test_formatters()
+    print("gpay_parser checks passed")
@@ -10,14 +10,18 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from parse_html_to_json import FlexibleGooglePayParser
+from synthetic_export import write_export
 
 def test_html_upload_simulation():
     """Simulate what happens when backend receives HTML content"""
     html_file = Path(__file__).parent / "My Activity.html"
     
     if not html_file.exists():
-        print(f"ERROR: {html_file} not found")
-        return
+        # No private export next to this script, so use a generated one
+        import tempfile
+        html_file = Path(tempfile.gettempdir()) / "synthetic_my_activity.html"
+        write_export(str(html_file), transactions=400, clock='24h')
+        print(f"{html_file.name} generated; put a real 'My Activity.html' here to test with it")
     
     print(f"Testing HTML file: {html_file}")
     print(f"File size: {html_file.stat().st_size} bytes")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Checks for the background analysis jobs in job_queue.py and the /jobs endpoints
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from job_queue import JobFailed, JobQueue
+from llm_limiter import Overloaded
+
+USER_ID = '6929a1f0c2b4a1d2e3f40001'
+
+
+def _wait(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_concurrent_requests_share_one_job():
+    """Requests for the same user and kind while a job is pending get that job"""
+    queue = JobQueue(workers=2)
+    release = threading.Event()
+    runs = []
+
+    def analysis():
+        runs.append(1)
+        release.wait(5)
+        return {'success': True}
+
+    first, created = queue.submit('insights', USER_ID, analysis)
+    again, created_again = queue.submit('insights', USER_ID, analysis)
+    other, created_other = queue.submit('budget', USER_ID, analysis)
+    assert created and not created_again and created_other
+    assert again['jobId'] == first['jobId'] != other['jobId']
+    assert first['status'] == 'queued'
+
+    release.set()
+    assert _wait(queue, first['jobId'])['result'] == {'success': True}
+    _wait(queue, other['jobId'])
+    assert len(runs) == 2
+    assert queue.stats()['deduplicated'] == 1
+
+    # Once finished, the next request starts a fresh job
+    fresh, created = queue.submit('insights', USER_ID, analysis)
+    assert created and fresh['jobId'] != first['jobId']
+
+
+def test_failures_and_expiry():
+    queue = JobQueue(workers=1, result_ttl=0.2)
+
+    def no_goals():
+        raise JobFailed("No active budget goals found")
+
+    job, _ = queue.submit('budget', USER_ID, no_goals)
+    failed = _wait(queue, job['jobId'])
+    assert (failed['status'], failed['error'], failed['result']) == ('failed', "No active budget goals found", None)
+    assert failed['finishedAt'] >= failed['startedAt'] >= failed['createdAt']
+
+    time.sleep(0.3)
+    assert queue.get(job['jobId']) is None
+
+
+def test_refused_jobs_keep_status_and_retry_after():
+    """A job the LLM limiter refuses records the 429/503 and Retry-After for the client"""
+    queue = JobQueue(workers=1)
+
+    def busy():
+        raise Overloaded("Analysis already running for this user", status=429, retry_after=12)
+
+    job, _ = queue.submit('insights', USER_ID, busy)
+    failed = _wait(queue, job['jobId'])
+    assert (failed['status'], failed['errorStatus'], failed['retryAfter']) == ('failed', 429, 12)
+
+    job, _ = queue.submit('insights', USER_ID, lambda: {'success': True})
+    assert (_wait(queue, job['jobId'])['errorStatus'], queue.get(job['jobId'])['retryAfter']) == (None, None)
+
+
+def test_pending_limit():
+    queue = JobQueue(workers=1, max_pending=1)
+    release = threading.Event()
+    job, _ = queue.submit('insights', USER_ID, lambda: release.wait(5))
+    try:
+        queue.submit('insights', 'someone-else', lambda: None)
+    except Overloaded as e:
+        assert e.status == 503
+    else:
+        raise AssertionError("accepted a job past max_pending")
+    release.set()
+    _wait(queue, job['jobId'])
+
+
+def test_job_endpoints():
+    """POST /jobs answers 202 at once and GET /jobs/<id> returns the result when done"""
+    import app
+
+    original = app.JOB_KINDS
+    app.JOB_KINDS = {
+        'insights': (lambda user_id: ({'success': True, 'keyInsights': [], 'alerts': [], 'suggestions': []}, 200), False),
+        'budget': (lambda user_id: ({'success': False, 'message': "No active budget goals found"}, 500), True),
+    }
+    client = app.app.test_client()
+    try:
+        assert client.post('/jobs', json={'kind': 'forecast'}).status_code == 400
+        assert client.post('/jobs', json={'kind': 'budget'}).status_code == 400
+
+        response = client.post('/jobs', json={'kind': 'insights', 'userId': USER_ID})
+        assert response.status_code == 202
+        job_id = response.get_json()['jobId']
+        assert response.get_json()['statusUrl'] == f'/jobs/{job_id}'
+
+        job = _wait(app.job_queue, job_id)
+        assert job['status'] == 'done' and job['result']['success'] is True
+        assert client.get(f'/jobs/{job_id}').get_json()['status'] == 'done'
+
+        response = client.post(f'/jobs?kind=budget&userId={USER_ID}')
+        job = _wait(app.job_queue, response.get_json()['jobId'])
+        assert (job['status'], job['error']) == ('failed', "No active budget goals found")
+
+        assert client.get('/jobs/unknown').status_code == 404
+    finally:
+        app.JOB_KINDS = original
+
+
+if __name__ == '__main__':
+    test_concurrent_requests_share_one_job()
+    test_failures_and_expiry()
+    test_refused_jobs_keep_status_and_retry_after()
+    test_pending_limit()
+    test_job_endpoints()
+    print("Job queue checks passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Checks for the LLM concurrency limit and backpressure in llm_limiter.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from llm_limiter import LLMLimiter, Overloaded
+
+USER_ID = '6929a1f0c2b4a1d2e3f40001'
+
+
+def _refused(limiter, user_id=None, kind='analysis'):
+    try:
+        limiter.acquire(user_id, kind)
+    except Overloaded as e:
+        return e.status
+    limiter.release(user_id, kind)
+    return None
+
+
+def test_queue_full_is_503():
+    """Past the running and waiting limits, callers are refused at once"""
+    limiter = LLMLimiter(max_concurrency=1, max_queue=0, queue_timeout=5)
+    with limiter.slot():
+        start = time.monotonic()
+        assert _refused(limiter) == 503
+        assert time.monotonic() - start < 1
+    assert _refused(limiter) is None
+    assert limiter.stats()['rejected'] == 1
+
+
+def test_one_call_per_user_and_kind_is_429():
+    limiter = LLMLimiter(max_concurrency=4)
+    with limiter.slot(USER_ID):
+        assert _refused(limiter, USER_ID) == 429
+        assert _refused(limiter, 'someone-else') is None
+    with limiter.slot(USER_ID, 'budget'):
+        assert _refused(limiter, USER_ID, 'budget') == 429
+        assert _refused(limiter, USER_ID, 'insights') is None
+    assert _refused(limiter, USER_ID) is None
+
+
+def test_waiters_get_the_next_free_slot():
+    """A queued call runs as soon as a slot frees up, and times out if none does"""
+    limiter = LLMLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+    limiter.acquire()
+    started = threading.Event()
+
+    def waiter():
+        with limiter.slot():
+            started.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.1)
+    assert limiter.stats()['waiting'] == 1 and not started.is_set()
+    limiter.release()
+    thread.join(5)
+    assert started.is_set()
+    stats = limiter.stats()
+    assert (stats['running'], stats['waiting'], stats['completed'], stats['rejected']) == (0, 0, 2, 0)
+
+    impatient = LLMLimiter(max_concurrency=1, max_queue=1, queue_timeout=0.1)
+    with impatient.slot():
+        assert _refused(impatient, USER_ID) == 503
+    # The timed-out user may try again
+    assert _refused(impatient, USER_ID) is None
+
+
+def test_app_answers_overloaded_with_retry_after():
+    import app
+
+    def busy(user_id):
+        raise Overloaded("Too many analyses in progress, try again shortly", retry_after=12)
+
+    original = app.analyze_spending_patterns
+    app.analyze_spending_patterns = busy
+    try:
+        response = app.app.test_client().get(f'/insights?userId={USER_ID}')
+    finally:
+        app.analyze_spending_patterns = original
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '12'
+    assert response.get_json()['success'] is False
+
+
+if __name__ == '__main__':
+    test_queue_full_is_503()
+    test_one_call_per_user_and_kind_is_429()
+    test_waiters_get_the_next_free_slot()
+    test_app_answers_overloaded_with_retry_after()
+    print("LLM limiter checks passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Checks for the rule-based insights in local_analytics.py
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+
+from local_analytics import local_insights
+
+NOW = datetime(2026, 6, 20)
+
+
+def _row(days_ago, amount, category='Food & Dining', recipient='Cafe', type_='expense', status='Completed'):
+    return {
+        'date': NOW - timedelta(days=days_ago), 'type': type_, 'amount': amount, 'category': category,
+        'recipient': recipient, 'description': None, 'status': status,
+    }
+
+
+def _steady_history():
+    """Six months of salary and everyday food spending of varying amounts, with nothing to flag"""
+    rows = [_row(days, 200 + days * 37 % 200, recipient=f"Cafe {days % 7}") for days in range(180)]
+    rows += [_row(days, 60000, 'Salary', 'Employer', type_='income') for days in range(5, 180, 30)]
+    return rows
+
+
+def _alert_types(findings):
+    return [alert['type'] for alert in findings['alerts']]
+
+
+def test_steady_history_has_no_alerts():
+    findings = local_insights(pd.DataFrame(_steady_history()), NOW)
+    assert set(findings) == {'keyInsights', 'alerts', 'suggestions'}
+    assert findings['alerts'] == []
+    assert findings['keyInsights'][0]['title'] == "Food & Dining leads your spending"
+    titles = [insight['title'] for insight in findings['keyInsights']]
+    assert "Saving rate" in titles and not any('recurring' in title for title in titles)
+
+
+def test_recurring_subscription():
+    """A steady monthly payment is reported with a review suggestion"""
+    rows = _steady_history() + [_row(days, 649, 'Entertainment', 'Netflix') for days in range(3, 180, 30)]
+    findings = local_insights(pd.DataFrame(rows), NOW)
+    recurring = [insight for insight in findings['keyInsights'] if 'recurring' in insight['title']]
+    assert recurring and 'Netflix (₹649 monthly)' in recurring[0]['description']
+    assert any('Netflix' in suggestion['suggestion'] for suggestion in findings['suggestions'])
+
+    # A payment that stopped months ago is no longer a subscription
+    stopped = _steady_history() + [_row(days, 649, 'Entertainment', 'Netflix') for days in range(100, 180, 30)]
+    findings = local_insights(pd.DataFrame(stopped), NOW)
+    assert not any('Netflix' in suggestion['suggestion'] for suggestion in findings['suggestions'])
+
+
+def test_category_spike_and_month_over_month():
+    """Spending three times the usual amount in the last month raises both alerts"""
+    rows = _steady_history() + [_row(days, 600) for days in range(30)]
+    findings = local_insights(pd.DataFrame(rows), NOW)
+    spikes = [alert for alert in findings['alerts'] if alert['type'] == "Category spike"]
+    assert len(spikes) == 1 and spikes[0]['severity'] == 'high'
+    assert 'Food & Dining' in spikes[0]['description']
+    assert "Month-over-month increase" in _alert_types(findings)
+
+
+def test_large_one_off_payment():
+    rows = _steady_history() + [_row(4, 25000, recipient='Croma')]
+    findings = local_insights(pd.DataFrame(rows), NOW)
+    large = [alert for alert in findings['alerts'] if alert['type'] == "Large one-off payment"]
+    assert len(large) == 1 and large[0]['severity'] == 'high'
+    assert '₹25,000 to Croma' in large[0]['description']
+
+
+def test_overspending_and_failed_payments():
+    rows = [_row(days, 500) for days in range(20)]
+    rows += [_row(days, 200, status='Failed') for days in range(3)]
+    rows.append(_row(1, 5000, 'Salary', 'Employer', type_='income'))
+    findings = local_insights(pd.DataFrame(rows), NOW)
+    assert _alert_types(findings) == ["Spending exceeds income", "Failed payments"]
+
+
+def test_findings_are_deterministic():
+    rows = _steady_history() + [_row(days, 649, 'Entertainment', 'Netflix') for days in range(3, 180, 30)]
+    frame = pd.DataFrame(rows)
+    assert local_insights(frame, NOW) == local_insights(frame.sample(frac=1, random_state=3), NOW)
+
+
+if __name__ == '__main__':
+    test_steady_history_has_no_alerts()
+    test_recurring_subscription()
+    test_category_spike_and_month_over_month()
+    test_large_one_off_payment()
+    test_overspending_and_failed_payments()
+    test_findings_are_deterministic()
+    print("Local analytics checks passed")
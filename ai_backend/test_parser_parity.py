@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Parity checks for the compiled extraction engine and streaming block splitter
+Expected output was captured from the original whole-file regex parser, with
+timestamps since carrying their GMT offset and 24-hour exports decoded
+"""
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parse_html_to_json import FlexibleGooglePayParser
+
+HERE = Path(__file__).parent
+EXPECTED_FILE = HERE / "test_parser_expected.json"
+
+
+def split_whole_file(content):
+    """The original in-memory block split, used as the reference for streaming"""
+    blocks = re.findall(
+        r'<div class="outer-cell[^>]*>.*?(?=<div class="outer-cell|$)',
+        content, re.DOTALL
+    )
+    if not blocks or len(blocks) < 2:
+        blocks = re.findall(
+            r'<p class="mdl-typography--title">Google Pay<br /></p>.*?(?=<p class="mdl-typography--title"|$)',
+            content, re.DOTALL
+        )
+    if not blocks or len(blocks) < 2:
+        blocks = re.findall(
+            r'(?:Paid|Sent|Received|Credited)\s+[₹€$£][\d.,]+.*?(?:GMT[+-]\d{2}:\d{2})',
+            content, re.DOTALL
+        )
+    return blocks
+
+
+def test_exports_match_original_output():
+    """Every sample export parses to exactly what the original parser produced"""
+    expected = json.loads(EXPECTED_FILE.read_text(encoding='utf-8'))
+    parser = FlexibleGooglePayParser()
+
+    for file_name, transactions in expected.items():
+        assert parser.parse_html_file(str(HERE / file_name)) == transactions, file_name
+
+
+def test_block_fields():
+    """Fields are still taken from the first match anywhere in the block"""
+    parser = FlexibleGooglePayParser()
+    block = (
+        '<p class="mdl-typography--title">Google Pay<br /></p>\n'
+        'Paid ₹1,250.50 to Sri Udupi Food Hub using Bank Account\n'
+        '            XXXXXXXXXX191807<br />Nov\n'
+        '            28, 2025, 12:02:15 AM GMT+05:30<br />\n'
+        '<b>Products:</b><br />&emsp;Google Pay<br /><b>Details:</b\n'
+        '            ><br />&emsp;Cqo7Uu5XTQ2ouFWA<br />&emsp;Completed<br />'
+    )
+
+    assert parser.extract_from_transaction_block(block) == {
+        'timestamp': '2025-11-28T00:02:15+05:30',
+        'amount': 1250.5,
+        'currency': 'INR',
+        'recipient': 'Sri Udupi Food Hub',
+        'payment_method': 'Bank Account',
+        'account_number': 'XXXXXXXXXX191807',
+        'transaction_id': 'Cqo7Uu5XTQ2ouFWA',
+        'status': 'Completed',
+        'product': 'Google Pay',
+        'wallet': 'Google Pay',
+    }
+
+
+def test_block_edge_cases():
+    """Anchored lookups keep the original fallbacks and case handling"""
+    parser = FlexibleGooglePayParser()
+
+    assert parser.extract_recipient('received  $5 from Alice via UPI') == 'Alice'
+    assert parser.extract_recipient('Sent ₹100.00 using Bank Account') is None
+    assert parser.extract_account_number('card ABCDXXXXXXX1234') == 'ABCDXXXXXXX1234'
+    assert parser.extract_transaction_id('<b>Details:</b><br />&emsp;ab') is None
+    assert parser.extract_transaction_id('Details:<br />&emsp;ABCDEFG') == 'ABCDEFG'
+    assert parser.extract_status('Status: Refunded<br') == 'Refunded'
+    assert parser.extract_timestamp('x28, 2024 then Jul 5, 2023') == '2023-07-05T00:00:00Z'
+    assert parser.extract_timestamp('10 Oct 2025, 19:42:09 GMT+05:30') == '2025-10-10T19:42:09+05:30'
+    assert parser.extract_from_transaction_block('Paid to nobody') is None
+
+
+def test_streaming_split_matches_whole_file_split():
+    """Chunk boundaries never change which blocks are produced"""
+    parser = FlexibleGooglePayParser()
+
+    for file_name in ["test_sample.html", "harshal.html", "My Activity.html"]:
+        content = (HERE / file_name).read_text(encoding='utf-8')
+        expected = split_whole_file(content)
+        for chunk_size in (7, 4096, None):
+            blocks = list(parser.iter_transaction_blocks(str(HERE / file_name), chunk_size))
+            assert blocks == expected, (file_name, chunk_size)
+
+
+def test_streaming_split_fallback_layouts():
+    """Title-based and loose layouts are still used when outer cells are missing"""
+    parser = FlexibleGooglePayParser()
+    samples = [
+        '<div class="outer-cell a">Paid ₹5 to A<br /></div>\n<div class="outer-cell b"\n>Sent $7 GMT+05:30\n',
+        '<p class="mdl-typography--title">Google Pay<br /></p>Paid ₹5<p class="mdl-typography--title">'
+        'Other</p><p class="mdl-typography--title">Google Pay<br /></p>Sent ₹9\n',
+        'Paid ₹5 to A GMT+05:30 noise Received £12.50 from B\n at GMT-01:00 Sent $1',
+        '<div class="outer-cell">only one</div>',
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "export.html"
+        for content in samples:
+            path.write_text(content, encoding='utf-8')
+            for chunk_size in (1, 5, None):
+                blocks = list(parser.iter_transaction_blocks(str(path), chunk_size))
+                assert blocks == split_whole_file(content), (content, chunk_size)
+
+
+if __name__ == '__main__':
+    test_exports_match_original_output()
+    test_block_fields()
+    test_block_edge_cases()
+    test_streaming_split_matches_whole_file_split()
+    test_streaming_split_fallback_layouts()
+    print("Parser parity checks passed")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Checks for in-memory parsing, incremental re-imports and the --serve worker
+mode of parse_html_to_json.py
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parse_html_to_json import FlexibleGooglePayParser
+
+HERE = Path(__file__).parent
+SCRIPT = HERE / "parse_html_to_json.py"
+
+
+def test_parse_html_matches_file_parse():
+    """Parsing HTML passed in memory gives the same result as reading the file"""
+    parser = FlexibleGooglePayParser()
+    html_file = HERE / "harshal.html"
+    html = html_file.read_text(encoding='utf-8')
+
+    expected = parser.parse_html_file(str(html_file))
+    assert parser.parse_html(html) == expected
+    assert parser.parse_html(html.replace('\n', '\r\n')) == expected
+
+
+def test_serve_answers_each_request_line():
+    """One worker process answers several requests, including bad ones, in order"""
+    sample = (HERE / "test_sample.html").read_text(encoding='utf-8')
+    requests = [
+        json.dumps({"id": 1, "html": sample}),
+        "not json",
+        json.dumps({"id": "b", "html": sample}),
+        json.dumps({"id": 4}),
+    ]
+
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), '--serve'],
+        input='\n'.join(requests) + '\n',
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    responses = [json.loads(line) for line in result.stdout.splitlines()]
+
+    expected = FlexibleGooglePayParser().parse_html(sample)
+    assert result.returncode == 0
+    assert [r["id"] for r in responses] == [1, None, "b", 4]
+    assert responses[0]["transactions"] == expected
+    assert responses[2]["transactions"] == expected
+    assert "error" in responses[1] and "error" in responses[3]
+
+
+def test_reimport_skips_known_blocks():
+    """Blocks whose fingerprint is indexed are skipped; the rest match a full parse"""
+    parser = FlexibleGooglePayParser()
+    html = (HERE / "harshal.html").read_text(encoding='utf-8')
+    full = parser.parse_html(html)
+
+    first, skipped = parser.parse_new_html(html, set())
+    assert skipped == 0
+    assert [{k: v for k, v in tx.items() if k != 'fingerprint'} for tx in first] == full
+
+    known = {tx['fingerprint'] for tx in first[100:]}
+    again, skipped = parser.parse_new_html(html, known)
+    assert skipped == len(first) - 100
+    assert again == first[:100]
+
+
+    # A block repeated within one upload is imported once
+    repeated, skipped = parser.parse_new_html(html + html, set())
+    assert repeated == first and skipped == len(first)
+
+def test_fingerprint_prefers_transaction_id():
+    """Transaction IDs identify a block; otherwise whitespace changes don't matter"""
+    parser = FlexibleGooglePayParser()
+
+    assert parser.fingerprint_block('Paid ₹5<b>Details:</b><br />&emsp;Cqo7Uu5XTQ2o') == 'txn:Cqo7Uu5XTQ2o'
+    assert parser.fingerprint_block('Paid  ₹5\n to A') == parser.fingerprint_block('Paid ₹5 to A')
+    assert parser.fingerprint_block('Paid ₹5 to A') != parser.fingerprint_block('Paid ₹6 to A')
+
+
+def test_serve_skips_known_blocks():
+    """The worker leaves out blocks whose fingerprint the caller already has"""
+    sample = (HERE / "test_sample.html").read_text(encoding='utf-8')
+
+    def run(*requests):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT), '--serve'],
+            input=''.join(json.dumps(r) + '\n' for r in requests),
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        return [json.loads(line) for line in result.stdout.splitlines()]
+
+    first = run({"id": 1, "html": sample, "known": []})[0]
+    fingerprints = [tx["fingerprint"] for tx in first["transactions"]]
+    assert first["skipped"] == 0 and len(fingerprints) == 2
+
+    again, = run({"id": 2, "html": sample, "known": fingerprints[:1]})
+    assert again["skipped"] == 1 and again["transactions"] == first["transactions"][1:]
+
+
+if __name__ == '__main__':
+    test_parse_html_matches_file_parse()
+    test_serve_answers_each_request_line()
+    test_reimport_skips_known_blocks()
+    test_fingerprint_prefers_transaction_id()
+    test_serve_skips_known_blocks()
+    print("Parser service checks passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Checks for the compact agent prompt context in prompt_context.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+from bson.objectid import ObjectId
+
+from export_transactions_to_csv import documents_to_frame
+from prompt_context import build_context, estimate_tokens
+from seed_data import synthetic_transactions
+
+USER_ID = ObjectId('6929a1f0c2b4a1d2e3f40001')
+
+
+def _frame(rows):
+    return documents_to_frame([
+        dict(document, _id=ObjectId(f"{n:024x}")) for n, document in enumerate(synthetic_transactions(USER_ID, rows))
+    ])
+
+
+def test_context_fits_the_budget():
+    """Large histories are cut to the budget, keeping the aggregates ahead of the sample"""
+    frame = _frame(3000)
+    for budget in (600, 2000, 4000):
+        context = build_context(frame, budget)
+        assert estimate_tokens(context) <= budget, budget
+        assert context.startswith('Period: ')
+        assert 'Monthly trend' in context
+
+    context = build_context(frame, 4000)
+    assert 'Expenses by category' in context and 'Sample of transactions' in context
+    assert '_id' not in context and 'htmlFile' not in context
+
+
+def test_context_is_deterministic():
+    """The same transactions in any order give the same text"""
+    frame = _frame(800)
+    shuffled = frame.sample(frac=1, random_state=7)
+    assert build_context(frame, 1500) == build_context(shuffled, 1500)
+
+
+def test_small_histories_are_complete():
+    """When everything fits, the sample is every transaction"""
+    context = build_context(_frame(12), 4000)
+    # Past the rest of the title line and the CSV header
+    sample = context.split('Sample of transactions')[1].splitlines()[2:]
+    assert len(sample) == 12
+
+
+def test_no_transactions():
+    assert build_context(pd.DataFrame(columns=['date', 'amount']), 1000) == "No transactions."
+
+
+if __name__ == '__main__':
+    test_context_fits_the_budget()
+    test_context_is_deterministic()
+    test_small_histories_are_complete()
+    test_no_transactions()
+    print("Prompt context checks passed")
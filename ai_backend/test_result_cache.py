@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Checks for the insights and budget plan cache in result_cache.py
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from insights_agent import extract_insights
+from result_cache import ResultCache, fingerprint
+
+USER_ID = '6929a1f0c2b4a1d2e3f40001'
+OTHER_USER_ID = '6929a1f0c2b4a1d2e3f40002'
+
+
+def test_fingerprint_is_stable():
+    """Key order does not matter; any changed part gives a new fingerprint"""
+    goals = [{'goalName': 'Bike', 'targetAmount': 50000}]
+    key = fingerprint('budget', 1, 'watermark:5', goals)
+
+    assert key == fingerprint('budget', 1, 'watermark:5', [{'targetAmount': 50000, 'goalName': 'Bike'}])
+    assert key != fingerprint('budget', 1, 'watermark:6', goals)
+    assert key != fingerprint('budget', 2, 'watermark:5', goals)
+
+
+def test_hits_only_for_the_current_fingerprint():
+    """A new fingerprint misses and storing its result replaces the old one"""
+    cache = ResultCache()
+    cache.set(USER_ID, 'insights', 'v1', 'first')
+
+    assert cache.get(USER_ID, 'insights', 'v1') == 'first'
+    assert cache.get(USER_ID, 'insights', 'v2') is None
+    assert cache.get(USER_ID, 'budget', 'v1') is None
+
+    cache.set(USER_ID, 'insights', 'v2', 'second')
+    assert cache.get(USER_ID, 'insights', 'v1') is None
+    assert cache.stats()['entries'] == 1
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 3)
+
+
+def test_lru_and_ttl():
+    """The least recently used entry is evicted first, and expired entries miss"""
+    cache = ResultCache(max_entries=2)
+    cache.set(USER_ID, 'insights', 'v1', 'a')
+    cache.set(USER_ID, 'budget', 'v1', 'b')
+    cache.get(USER_ID, 'insights', 'v1')
+    cache.set(OTHER_USER_ID, 'insights', 'v1', 'c')
+
+    assert cache.get(USER_ID, 'budget', 'v1') is None
+    assert cache.get(USER_ID, 'insights', 'v1') == 'a'
+
+    expired = ResultCache(ttl=0)
+    expired.set(USER_ID, 'insights', 'v1', 'a')
+    assert expired.get(USER_ID, 'insights', 'v1') is None
+
+
+def test_disk_tier_and_invalidation():
+    """Results written to disk are found by a fresh cache until invalidated"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plan = {'success': True, 'plan': 'Save 3000 a month'}
+        ResultCache(directory=tmp_dir).set(USER_ID, 'budget', 'v1', plan)
+        ResultCache(directory=tmp_dir).set(USER_ID, 'insights', 'v1', '{}')
+
+        cache = ResultCache(directory=tmp_dir)
+        assert cache.get(USER_ID, 'budget', 'v1') == plan
+        assert cache.get(USER_ID, 'budget', 'v2') is None
+
+        assert cache.invalidate(USER_ID) == 2
+        assert cache.get(USER_ID, 'budget', 'v1') is None
+        assert list(Path(tmp_dir).iterdir()) == []
+
+
+def test_disk_hits_keep_their_expiry():
+    """An entry promoted from disk still expires ttl after it was created, not after the read"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResultCache(ttl=1, directory=tmp_dir)
+        with open(cache._path(USER_ID, 'insights'), 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': 'v1', 'created': time.time() - 0.8, 'value': 'a'}, f)
+
+        assert cache.get(USER_ID, 'insights', 'v1') == 'a'
+        time.sleep(0.3)
+        assert cache.get(USER_ID, 'insights', 'v1') is None
+
+
+def test_extract_insights():
+    """Only output with the complete JSON object is accepted, and therefore cached"""
+    output = 'Here you go: {"keyInsights": [], "alerts": [], "suggestions": []} Done.'
+    assert extract_insights(output) == {'keyInsights': [], 'alerts': [], 'suggestions': []}
+
+    for bad in ('no json here', '{"keyInsights": []}', '{"keyInsights": [}'):
+        try:
+            extract_insights(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {bad!r}")
+
+
+if __name__ == '__main__':
+    test_fingerprint_is_stable()
+    test_hits_only_for_the_current_fingerprint()
+    test_lru_and_ttl()
+    test_disk_tier_and_invalidation()
+    test_disk_hits_keep_their_expiry()
+    test_extract_insights()
+    print("Result cache checks passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Checks for the synthetic dataset seeder in seed_data.py
+Collections are replaced by an in-memory recorder, so no MongoDB is needed
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+
+from export_transactions_to_csv import EXPORT_COLUMNS
+import seed_data
+from seed_data import insert_batches, synthetic_goals, synthetic_transactions, synthetic_users
+
+USER_ID = ObjectId('6929a1f0c2b4a1d2e3f40001')
+
+
+class RecordingCollection:
+    """insert_many that remembers its batches and rejects documents matching reject"""
+
+    def __init__(self, reject=None):
+        self.batches = []
+        self.reject = reject or (lambda document: False)
+
+    def insert_many(self, documents, ordered=True):
+        assert ordered is False
+        self.batches.append(documents)
+        errors = [{'index': n} for n, document in enumerate(documents) if self.reject(document)]
+        if errors:
+            raise BulkWriteError({'nInserted': len(documents) - len(errors), 'writeErrors': errors})
+        return SimpleNamespace(inserted_ids=list(range(len(documents))))
+
+    def documents(self):
+        return [document for batch in self.batches for document in batch]
+
+
+def test_transactions_follow_the_schema():
+    """Generated transactions are reproducible and only use exported fields"""
+    transactions = list(synthetic_transactions(USER_ID, 500, days=90, seed=3))
+
+    assert transactions == list(synthetic_transactions(USER_ID, 500, days=90, seed=3))
+    assert all(set(doc) <= set(EXPORT_COLUMNS) for doc in transactions)
+    assert all(doc['userId'] == USER_ID and doc['type'] in ('income', 'expense') for doc in transactions)
+    assert all(doc['UPI'] + doc['UserInput'] == 1 for doc in transactions)
+
+    dates = [doc['date'] for doc in transactions]
+    assert (dates[0] - dates[-1]).days <= 90
+    salaries = [doc for doc in transactions if doc['category'] == 'Salary']
+    assert 2 <= len(salaries) <= 4
+
+
+def test_users_and_goals():
+    """Users carry unique wallet addresses and goals look like budgetPlanner's budgets"""
+    users = synthetic_users(5)
+    assert len({user['walletAddress'] for user in users}) == 5
+    # A second run with the same seed must not collide with the first
+    assert not {user['walletAddress'] for user in users} & {user['walletAddress'] for user in synthetic_users(5)}
+
+    goals = synthetic_goals(users[0]['_id'], 2)
+    assert len(goals) == 2
+    assert all(goal['status'] == 'active' and goal['userId'] == users[0]['_id'] for goal in goals)
+    assert {'goalName', 'targetAmount', 'deadline', 'createdAt'} <= set(goals[0])
+
+
+def test_insert_batches_unordered():
+    """Documents go out in batch_size chunks and rejected documents are not counted"""
+    collection = RecordingCollection()
+    assert insert_batches(collection, ({'n': n} for n in range(25)), 10) == 25
+    assert [len(batch) for batch in collection.batches] == [10, 10, 5]
+
+    collection = RecordingCollection(reject=lambda document: document['n'] in (3, 17))
+    rejected = []
+    assert insert_batches(collection, ({'n': n} for n in range(25)), 10, rejected) == 23
+    assert rejected == [{'n': 3}, {'n': 17}]
+
+
+def test_rejected_users_get_no_data():
+    """Goals and transactions are only seeded for users that were inserted"""
+    db = {
+        'users': RecordingCollection(reject=lambda user: user['name'] == 'Seed User 1'),
+        'budgets': RecordingCollection(),
+        'transactions': RecordingCollection(),
+    }
+    saved = seed_data.get_db
+    seed_data.get_db = lambda: db
+    try:
+        report = seed_data.seed_database(3, 4, goals_per_user=1, days=30, batch_size=100)
+    finally:
+        seed_data.get_db = saved
+
+    inserted = {user['_id'] for user in db['users'].documents() if user['name'] != 'Seed User 1'}
+    assert [count for count, _ in report.values()] == [2, 2, 8]
+    assert {goal['userId'] for goal in db['budgets'].documents()} == inserted
+    assert {doc['userId'] for doc in db['transactions'].documents()} == inserted
+
+
+if __name__ == '__main__':
+    test_transactions_follow_the_schema()
+    test_users_and_goals()
+    test_insert_batches_unordered()
+    test_rejected_users_get_no_data()
+    print("Seed data checks passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Checks for the vectorized spending summary in spending_summary.py
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+
+from spending_summary import SUMMARY_COLUMNS, summarize_spending
+
+NOW = datetime(2025, 11, 30, 12, 0, 0)
+
+
+def _frame(rows):
+    return pd.DataFrame(
+        [(kind, amount, category, NOW - timedelta(days=age)) for kind, amount, category, age in rows],
+        columns=SUMMARY_COLUMNS,
+    )
+
+
+FRAME = _frame([
+    ('expense', 100.0, 'Food', 0.5),
+    ('expense', 300.0, 'Shopping', 2),
+    ('expense', 50.0, 'Food', 10),
+    ('income', 5000.0, 'Salary', 12),
+    ('expense', 1000.0, 'Bills', 45),
+    ('expense', 999.0, 'Bills', 200),
+])
+
+
+def test_windows_match_a_plain_loop():
+    """Each window's totals equal summing the documents dated inside it"""
+    summary = summarize_spending(FRAME, windows=(7, 90), now=NOW)
+
+    assert set(summary['windows']) == {'7d', '30d', '90d'}
+    week, month, quarter = (summary['windows'][key] for key in ('7d', '30d', '90d'))
+
+    assert week['totalSpent'] == 400.0 and week['transactionCount'] == 2
+    assert month['totalSpent'] == 450.0 and month['totalIncome'] == 5000.0
+    assert month['byCategory'] == {'Shopping': 300.0, 'Food': 150.0}
+    assert list(quarter['byCategory']) == ['Bills', 'Shopping', 'Food']
+    assert quarter['avgMonthly'] == round(1450.0 / 90 * 30, 2)
+
+
+def test_headline_keeps_the_planner_fields():
+    """The 30-day figures stay at the top level, as budgetPlanner has always read them"""
+    summary = summarize_spending(FRAME, windows=(7,), now=NOW)
+
+    assert summary['totalSpent'] == 450.0
+    assert summary['avgDaily'] == 15.0
+    assert summary['avgMonthly'] == 450.0
+    assert summary['transactionCount'] == 3
+    assert summary['byCategory'] == summary['windows']['30d']['byCategory']
+
+
+def test_daily_statistics():
+    """Percentiles cover expense amounts; the peak day and rolling average use calendar days"""
+    month = summarize_spending(FRAME, now=NOW)['windows']['30d']
+
+    assert month['percentiles']['p50'] == 100.0
+    assert month['peakDay'] == {'date': '2025-11-28', 'amount': 300.0}
+    assert month['rolling7DayAvg']['latest'] == round(400.0 / 7, 2)
+
+
+def test_no_transactions():
+    summary = summarize_spending(pd.DataFrame(columns=SUMMARY_COLUMNS), now=NOW)
+
+    assert summary['totalSpent'] == 0.0 and summary['byCategory'] == {}
+    assert summary['windows']['7d']['peakDay'] is None
+    assert summary['windows']['7d']['percentiles']['p90'] == 0.0
+
+
+if __name__ == '__main__':
+    test_windows_match_a_plain_loop()
+    test_headline_keeps_the_planner_fields()
+    test_daily_statistics()
+    test_no_transactions()
+    print("Spending summary checks passed")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Checks that synthetic exports parse back to the transactions they were built from
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parse_html_to_json import FlexibleGooglePayParser
+from synthetic_export import generate_export, write_export
+import flexible_parser
+
+CURRENCIES = ['INR', 'USD', 'EUR', 'GBP']
+
+
+def test_every_layout_and_clock_round_trips():
+    """Both parsers extract exactly the generated transactions"""
+    for layout in ('outer-cell', 'title'):
+        for clock in ('12h', '24h'):
+            html, expected = generate_export(200, layout, clock, CURRENCIES, seed=3)
+
+            assert FlexibleGooglePayParser().parse_html(html) == expected, (layout, clock)
+
+            assert flexible_parser.FlexibleGooglePayParser().parse_html(html) == expected, (layout, clock)
+
+
+def test_generated_mix():
+    """Exports carry every requested currency and a realistic mix of block kinds"""
+    _, expected = generate_export(2000, currencies=CURRENCIES)
+
+    assert {tx['currency'] for tx in expected} == set(CURRENCIES)
+    assert {tx['status'] for tx in expected} >= {'Completed', 'Failed'}
+    assert any(tx['recipient'] is None for tx in expected)
+    assert any(tx['payment_method'] is None for tx in expected)
+
+
+def test_write_export_by_size():
+    """Size-bounded exports stop near the target and stream-parse completely"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "export.html"
+        result = write_export(str(path), size_mb=0.5, layout='title', clock='24h')
+
+        assert result['bytes'] == path.stat().st_size
+        assert 0.5 * 1024 * 1024 <= result['bytes'] < 0.5 * 1024 * 1024 + 4096
+        assert len(FlexibleGooglePayParser().parse_html_file(str(path))) == result['transactions']
+
+
+if __name__ == '__main__':
+    test_every_layout_and_clock_round_trips()
+    test_generated_mix()
+    test_write_export_by_size()
+    print("Synthetic export checks passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Checks for timestamp_decoder.TimestampDecoder
+"""
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from timestamp_decoder import TimestampDecoder
+
+
+def test_layouts_keep_offset():
+    """Both export layouts decode to ISO 8601 with the export's GMT offset"""
+    decoder = TimestampDecoder()
+
+    assert decoder.isoformat('<br />Jul 28, 2024, 4:24:58 PM GMT+05:30<br />') == '2024-07-28T16:24:58+05:30'
+    assert decoder.layout == '12h'
+    assert decoder.isoformat('&emsp;9 Oct 2025, 17:18:46 GMT-04:00<br />') == '2025-10-09T17:18:46-04:00'
+    assert decoder.layout == '24h'
+    assert decoder.isoformat('Sept 3, 2023, 7:05:01 AM GMT+01:00') == '2023-09-03T07:05:01+01:00'
+
+
+def test_twelve_hour_clock_edges():
+    """12 AM is midnight and 12 PM is noon"""
+    decoder = TimestampDecoder()
+
+    assert decoder.isoformat('Jan 1, 2024, 12:00:05 AM GMT+00:00') == '2024-01-01T00:00:05+00:00'
+    assert decoder.isoformat('Jan 1, 2024, 12:30:00 PM GMT+00:00') == '2024-01-01T12:30:00+00:00'
+    assert decoder.isoformat('Jan 1, 2024, 11:59:59 PM GMT+00:00') == '2024-01-01T23:59:59+00:00'
+
+
+def test_fast_path_agrees_with_detection():
+    """Timestamps read after detection match a fresh decoder, whatever their widths"""
+    decoder = TimestampDecoder()
+    samples = [
+        'Paid ₹5<br />Nov 28, 2025, 8:02:15 AM GMT+05:30<br />',
+        'Paid ₹5<br />Nov 8, 2025, 10:02:15 PM GMT+05:30<br />',
+        'Paid ₹5<br />September 18, 2025, 1:02:15 PM GMT+05:30<br />',
+        'Paid ₹5<br />Nov\n            28, 2025, 12:02:15 AM GMT+05:30<br />',
+        'Paid ₹5<br />5 Oct 2025, 7:52:35 GMT+05:30<br />',
+        'Paid ₹5<br />15 Oct 2025, 17:52:35 GMT+05:30<br />',
+        'Paid ₹5 at GMT Café<br />Nov 28, 2025, 8:02:15 AM GMT+05:30',
+    ]
+
+    for text in samples * 2:
+        assert decoder.isoformat(text) == TimestampDecoder().isoformat(text), text
+
+
+def test_missing_offset_and_dates():
+    """Timestamps without an offset and bare dates are read as UTC"""
+    decoder = TimestampDecoder()
+
+    assert decoder.isoformat('Jul 28, 2024, 4:24:58 PM') == '2024-07-28T16:24:58Z'
+    assert decoder.isoformat('x28, 2024 then Jul 5, 2023') == '2023-07-05T00:00:00Z'
+    assert decoder.isoformat('Foo 28, 2024, 4:24:58 PM and Jul 5, 2023') == '2023-07-05T00:00:00Z'
+    assert decoder.isoformat('Paid ₹5 to A') is None
+
+
+def test_decode_returns_aware_datetimes():
+    """decode() gives timezone-aware datetimes and rejects impossible dates"""
+    decoder = TimestampDecoder()
+    ist = timezone(timedelta(hours=5, minutes=30))
+
+    value = decoder.decode('Jul 28, 2024, 4:24:58 PM GMT+05:30')
+    assert value == datetime(2024, 7, 28, 16, 24, 58, tzinfo=ist)
+    assert value.utcoffset() == timedelta(hours=5, minutes=30)
+    assert decoder.decode('Jul 5, 2023').tzinfo == timezone.utc
+    assert decoder.decode('Feb 30, 2024, 4:24:58 PM GMT+05:30') is None
+
+
+if __name__ == '__main__':
+    test_layouts_keep_offset()
+    test_twelve_hour_clock_edges()
+    test_fast_path_agrees_with_detection()
+    test_missing_offset_and_dates()
+    test_decode_returns_aware_datetimes()
+    print("Timestamp decoder checks passed")
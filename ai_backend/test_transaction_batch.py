@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Checks for the columnar TransactionBatch parser output
+"""
+import json
+import pickle
+import sys
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parse_html_to_json import FlexibleGooglePayParser
+from transaction_batch import FIELDS, TransactionBatch
+
+HERE = Path(__file__).parent
+EXPORTS = ["test_sample.html", "harshal.html", "My Activity.html"]
+
+
+def test_columnar_parse_matches_dicts():
+    """A batch holds exactly the dicts the row parser returns"""
+    parser = FlexibleGooglePayParser()
+
+    for file_name in EXPORTS:
+        rows = parser.parse_html_file(str(HERE / file_name))
+        batch = parser.parse_html_file(str(HERE / file_name), columnar=True)
+
+        assert len(batch) == len(rows)
+        assert list(batch) == rows
+        assert batch[len(rows) - 1] == rows[-1]
+        assert batch.to_json() == json.dumps(rows), file_name
+
+
+def test_json_handles_missing_and_escaped_values():
+    """Direct serialization matches json.dumps for None, quotes and non-ASCII text"""
+    rows = [
+        dict.fromkeys(FIELDS) | {'amount': 12.0, 'recipient': 'Café "Ünïcode"'},
+        dict.fromkeys(FIELDS) | {'amount': 0.1, 'currency': 'INR', 'timestamp': 'x\ny'},
+        dict.fromkeys(FIELDS) | {'amount': 1e21, 'recipient': 'Café "Ünïcode"'},
+    ]
+    batch = TransactionBatch.from_transactions(rows)
+
+    assert batch.to_json() == json.dumps(rows)
+    assert TransactionBatch().to_json() == '[]'
+
+
+def test_batches_merge_and_pickle():
+    """Merging recodes shared strings and pickled batches round-trip"""
+    rows = FlexibleGooglePayParser().parse_html_file(str(HERE / "harshal.html"))
+    merged = TransactionBatch.from_transactions(rows[:100])
+    merged.extend(TransactionBatch.from_transactions(rows[100:]))
+
+    assert list(merged) == rows
+    assert len(merged.columns['currency'].values) == 1
+    assert list(pickle.loads(pickle.dumps(merged))) == rows
+
+
+def test_dataframe_and_arrow_conversion():
+    """Conversions keep every value and share the amount buffer"""
+    import numpy as np
+
+    rows = FlexibleGooglePayParser().parse_html_file(str(HERE / "My Activity.html"))
+    batch = TransactionBatch.from_transactions(rows)
+
+    df = batch.to_dataframe()
+    assert list(df.columns) == list(FIELDS)
+    assert df['recipient'].dtype == 'category'
+    assert np.shares_memory(df['amount'].to_numpy(), np.frombuffer(batch.columns['amount']))
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    assert records == rows
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return
+    assert batch.to_arrow().to_pylist() == rows
+
+
+def test_serve_output_unchanged():
+    """The serve response built from a batch is the json.dumps of the row response"""
+    from parse_html_to_json import _response_json
+
+    parser = FlexibleGooglePayParser()
+    html = (HERE / "harshal.html").read_text(encoding='utf-8')
+    transactions, skipped = parser.parse_new_html(html, set(), columnar=True)
+    rows, _ = parser.parse_new_html(html, set())
+
+    expected = json.dumps({"id": 7, "transactions": rows, "skipped": skipped})
+    assert _response_json({"id": 7, "transactions": transactions, "skipped": skipped}) == expected
+
+
+if __name__ == '__main__':
+    test_columnar_parse_matches_dicts()
+    test_json_handles_missing_and_escaped_values()
+    test_batches_merge_and_pickle()
+    test_dataframe_and_arrow_conversion()
+    test_serve_output_unchanged()
+    print("Transaction batch checks passed")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Checks for the incremental per-user export cache in user_dataset.py
+The MongoDB queries are replaced by an in-memory list of documents
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bson.objectid import ObjectId
+
+import user_dataset
+from export_transactions_to_csv import EXPORT_COLUMNS, export_filter
+
+USER_ID = ObjectId('6929a1f0c2b4a1d2e3f40001')
+
+
+class ListCursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __iter__(self):
+        return self._documents
+
+    def close(self):
+        pass
+
+
+class InMemoryTransactions:
+    """Stands in for the exporter's transaction queries over a list of documents"""
+
+    def __init__(self):
+        self.documents = []
+        self.fetched = 0
+
+    def add(self, count):
+        for n in range(count):
+            self.documents.append({
+                '_id': ObjectId(), 'userId': USER_ID, 'type': 'expense', 'amount': float(n + 1),
+                'category': 'Food', 'date': datetime(2025, 11, 1) - timedelta(days=len(self.documents)),
+            })
+
+    def find(self, user_id, since=None, until=None, after_id=None, batch_size=0):
+        documents = [doc for doc in self.documents if after_id is None or doc['_id'] > after_id]
+        self.fetched += len(documents)
+        return ListCursor(documents)
+
+    def count(self, user_id=None):
+        return len(self.documents)
+
+    def edit(self, index, **fields):
+        """What findByIdAndUpdate does: change fields and bump updatedAt"""
+        updates = [doc['updatedAt'] for doc in self.documents if 'updatedAt' in doc]
+        updated_at = max(updates + [datetime(2025, 12, 1)]) + timedelta(seconds=1)
+        self.documents[index].update(fields, updatedAt=updated_at)
+
+    def latest_update(self, user_id=None):
+        return max((doc['updatedAt'] for doc in self.documents if 'updatedAt' in doc), default=None)
+
+    def has_updates(self, user_id, up_to_id, updated_after):
+        return any(doc['_id'] <= up_to_id and 'updatedAt' in doc
+                   and (updated_after is None or doc['updatedAt'] > updated_after)
+                   for doc in self.documents)
+
+
+def _with_transactions(check):
+    transactions = InMemoryTransactions()
+    names = ['find_transactions', 'count_transactions', 'latest_update', 'has_updates']
+    saved = {name: getattr(user_dataset, name) for name in names}
+    user_dataset.find_transactions, user_dataset.count_transactions = transactions.find, transactions.count
+    user_dataset.latest_update, user_dataset.has_updates = transactions.latest_update, transactions.has_updates
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            check(transactions, user_dataset.UserDataset(str(USER_ID), tmp_dir))
+    finally:
+        for name, function in saved.items():
+            setattr(user_dataset, name, function)
+
+
+def test_sync_appends_only_new_transactions():
+    """Later syncs fetch and append just the documents inserted since the watermark"""
+    def check(transactions, dataset):
+        assert dataset.load_table() is None
+
+        transactions.add(3)
+        assert dataset.sync() == 3
+        transactions.add(2)
+        assert dataset.sync() == 2
+        assert dataset.sync() == 0
+        assert transactions.fetched == 5
+
+        assert dataset.load_table().num_rows == 5
+        assert dataset.load_meta() == {
+            'watermark': str(transactions.documents[-1]['_id']), 'rows': 5, 'updated': None, 'segments': [0, 1],
+        }
+        assert list(dataset.directory.glob('*.tmp')) == []
+        assert not (dataset.directory / f"{dataset.safe_user}.csv").exists()
+
+    _with_transactions(check)
+
+
+def test_sync_rebuilds_after_deletions():
+    """A row count that no longer matches the collection rebuilds the cache"""
+    def check(transactions, dataset):
+        transactions.add(4)
+        dataset.sync()
+        del transactions.documents[1]
+
+        assert dataset.sync() == 3
+        assert dataset.load_table().column('_id').to_pylist() == [str(doc['_id']) for doc in transactions.documents]
+
+    _with_transactions(check)
+
+
+def test_sync_picks_up_edits():
+    """Editing a cached row, e.g. recategorizing an import, rebuilds the cache and changes its version"""
+    def check(transactions, dataset):
+        transactions.add(3)
+        dataset.sync()
+        version = dataset.version()
+
+        transactions.edit(0, category='Groceries')
+        dataset.sync()
+        assert dataset.load_table().column('category').to_pylist() == ['Groceries', 'Food', 'Food']
+        assert dataset.version() != version
+
+        # Without further edits the next sync appends as usual
+        transactions.fetched = 0
+        transactions.add(1)
+        assert dataset.sync() == 1
+        assert transactions.fetched == 1
+
+        transactions.edit(3, amount=99.0)
+        dataset.sync()
+        assert dataset.load_table().column('amount').to_pylist()[-1] == 99.0
+
+    _with_transactions(check)
+
+
+def test_arrow_table_holds_the_exported_rows():
+    """The memory-mapped Arrow table has every synced row in export order"""
+    def check(transactions, dataset):
+        transactions.add(3)
+        dataset.sync()
+        transactions.add(2)
+        dataset.sync()
+
+        table = dataset.load_table()
+        assert table.schema == user_dataset.ARROW_SCHEMA
+        assert table.column_names == EXPORT_COLUMNS
+        assert table.column('_id').to_pylist() == [str(doc['_id']) for doc in transactions.documents]
+        assert table.column('amount').to_pylist() == [1.0, 2.0, 3.0, 1.0, 2.0]
+        assert dataset.load_dataframe()['date'].iloc[0] == transactions.documents[0]['date']
+
+        # Metadata naming a missing segment, e.g. after a failed write, is rebuilt from scratch
+        dataset.segment_path(1).unlink()
+        assert dataset.sync() == 5
+        assert dataset.load_table().num_rows == 5
+
+    _with_transactions(check)
+
+
+def test_appends_write_new_segments():
+    """Syncs never rewrite existing segments, and merge them once MAX_SEGMENTS is reached"""
+    def check(transactions, dataset):
+        transactions.add(2)
+        dataset.sync()
+        first = dataset.segment_path(0).stat()
+
+        for _ in range(user_dataset.MAX_SEGMENTS - 1):
+            transactions.add(1)
+            dataset.sync()
+        assert dataset.load_meta()['segments'] == list(range(user_dataset.MAX_SEGMENTS))
+        assert (dataset.segment_path(0).stat().st_ino, dataset.segment_path(0).stat().st_mtime_ns) == \
+            (first.st_ino, first.st_mtime_ns)
+
+        transactions.add(1)
+        dataset.sync()
+        assert dataset.load_meta()['segments'] == [user_dataset.MAX_SEGMENTS]
+        assert [path.name for path in dataset.directory.glob('*.arrow')] == \
+            [dataset.segment_path(user_dataset.MAX_SEGMENTS).name]
+        assert dataset.load_table().column('_id').to_pylist() == [str(doc['_id']) for doc in transactions.documents]
+
+    _with_transactions(check)
+
+
+def test_insights_sync_the_dataset_once():
+    """An insights run takes its cache key, context frame and statistics from one sync"""
+    import insights_agent
+
+    def check(transactions, dataset):
+        transactions.add(4)
+        syncs = []
+        user_dataset.latest_update = lambda user_id=None: syncs.append(user_id) or transactions.latest_update(user_id)
+
+        saved_dir = os.environ.get('EXPORT_CACHE_DIR')
+        os.environ['EXPORT_CACHE_DIR'] = str(dataset.directory)
+        try:
+            snapshot = insights_agent.get_user_snapshot(str(USER_ID))
+            cache_key = insights_agent.insights_cache_key(snapshot)
+            frame = insights_agent.get_transactions_frame(str(USER_ID), snapshot)
+            summary = insights_agent.get_spending_summary(str(USER_ID), frame)
+        finally:
+            if saved_dir is None:
+                del os.environ['EXPORT_CACHE_DIR']
+            else:
+                os.environ['EXPORT_CACHE_DIR'] = saved_dir
+
+        assert len(syncs) == 1
+        assert snapshot[0] == dataset.version() and cache_key
+        assert len(frame) == 4
+        assert set(summary['windows']) >= {'30d'}
+
+    _with_transactions(check)
+
+
+def test_sync_lock_excludes_other_processes():
+    """While one process syncs a user, another cannot take that user's lock"""
+    probe = (
+        "import fcntl, sys\n"
+        "with open(sys.argv[1], 'a') as f:\n"
+        "    try:\n"
+        "        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+        "    except BlockingIOError:\n"
+        "        sys.exit(1)\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dataset = user_dataset.UserDataset(str(USER_ID), tmp_dir)
+
+        def other_process_can_lock():
+            return subprocess.run([sys.executable, '-c', probe, str(dataset.lock_path)]).returncode == 0
+
+        with user_dataset._dataset_lock(dataset.lock_path):
+            assert not other_process_can_lock()
+        assert other_process_can_lock()
+
+
+def test_export_filter_windows():
+    """Date windows and the _id watermark narrow the user's query"""
+    since, until = datetime(2025, 10, 1), datetime(2025, 11, 1)
+    watermark = ObjectId('6929a1f0c2b4a1d2e3f40011')
+
+    assert export_filter(str(USER_ID), since, until) == {
+        'userId': USER_ID, 'date': {'$gte': since, '$lt': until},
+    }
+    assert export_filter(str(USER_ID), since=since) == {'userId': USER_ID, 'date': {'$gte': since}}
+    assert export_filter(str(USER_ID), after_id=watermark) == {'userId': USER_ID, '_id': {'$gt': watermark}}
+
+
+if __name__ == '__main__':
+    test_sync_appends_only_new_transactions()
+    test_sync_rebuilds_after_deletions()
+    test_sync_picks_up_edits()
+    test_arrow_table_holds_the_exported_rows()
+    test_appends_write_new_segments()
+    test_insights_sync_the_dataset_once()
+    test_sync_lock_excludes_other_processes()
+    test_export_filter_windows()
+    print("User dataset checks passed")
@@ -0,0 +1,129 @@
+"""
+Timestamp decoding for Google Pay exports
+An export writes every timestamp in the same layout, so the layout is
+detected once and later timestamps are read just in front of their "GMT"
+"""
+import re
+from datetime import datetime
+from typing import Optional
+
+_MONTH_NAMES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'june': 6, 'july': 7,
+    'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+}
+# Month digits keyed by every spelling exports use, so lookups need no lower()
+MONTHS = {spelling: f"{num:02d}" for name, num in _MONTH_NAMES.items()
+          for spelling in (name, name.title(), name.upper())}
+
+# 24-hour "HH" keyed by (hour, meridiem), with or without a leading zero;
+# 24-hour clocks have an empty meridiem
+HOURS_24 = {}
+for _hour in range(24):
+    for _text in {str(_hour), f"{_hour:02d}"}:
+        HOURS_24[_text, ''] = f"{_hour:02d}"
+        if 1 <= _hour <= 12:
+            HOURS_24[_text, 'AM'] = f"{_hour % 12:02d}"
+            HOURS_24[_text, 'PM'] = f"{_hour % 12 + 12:02d}"
+
+_OFFSET = r'GMT(?P<offset_hours>[+-]\d{2}):?(?P<offset_minutes>\d{2})'
+
+# Layouts seen in exports. Each captures the same named fields:
+#   12h  "Jul 28, 2024, 4:24:58 PM GMT+05:30"  (US English)
+#   24h  "9 Oct 2025, 17:18:46 GMT+05:30"      (most other English locales)
+LAYOUTS = {
+    '12h': r'\b(?P<month>[A-Za-z]{3,9})\s+(?P<day>\d{1,2}),\s+(?P<year>\d{4}),\s+'
+           r'(?P<hour>\d{1,2}):(?P<minute>\d{2}):(?P<second>\d{2})\s+(?P<meridiem>AM|PM)',
+    '24h': r'\b(?P<day>\d{1,2})\s+(?P<month>[A-Za-z]{3,9})\s+(?P<year>\d{4}),\s+'
+           r'(?P<hour>\d{1,2}):(?P<minute>\d{2}):(?P<second>\d{2})(?P<meridiem>)',
+}
+_FIELDS = ('month', 'day', 'year', 'hour', 'meridiem', 'minute', 'second', 'offset_hours', 'offset_minutes')
+
+# A date with no time of day, read as midnight UTC
+_DATE_RE = re.compile(r'\b([A-Za-z]{3,9})\s+(\d{1,2}),\s+(\d{4})')
+
+
+class TimestampDecoder:
+    """
+    Reads export timestamps as ISO 8601 strings or timezone-aware datetimes,
+    keeping the GMT offset the export was written in.
+    The first timestamp is found by trying every layout over the whole text.
+    That fixes the layout and roughly how far before "GMT" a timestamp
+    starts, so later calls match only that layout a few positions before
+    the text's "GMT". Texts that do not fit fall back to full detection,
+    so one decoder can be reused across exports.
+    """
+
+    # Day, hour and month name widths can each move the start by a character
+    SLACK = 4
+
+    # Full search: the offset is optional
+    _DETECT = {name: re.compile(pattern + r'(?:\s+' + _OFFSET + ')?') for name, pattern in LAYOUTS.items()}
+    # Fast path: must end right at the offset
+    _ANCHORED = {name: re.compile(pattern + r'\s+' + _OFFSET) for name, pattern in LAYOUTS.items()}
+
+    def __init__(self):
+        self.layout: Optional[str] = None
+        self._lead = 0  # characters from the start of the detected timestamp to its "GMT"
+
+    @staticmethod
+    def _format(match) -> Optional[str]:
+        month, day, year, hour, meridiem, minute, second, offset_hours, offset_minutes = match.group(*_FIELDS)
+        month = MONTHS.get(month)
+        hour = HOURS_24.get((hour, meridiem))
+        if month is None or hour is None:
+            return None
+
+        offset = f"{offset_hours}:{offset_minutes}" if offset_hours is not None else 'Z'
+        return f"{year}-{month}-{day.zfill(2)}T{hour}:{minute}:{second}{offset}"
+
+    def _format_anchored(self, text: str) -> Optional[str]:
+        pattern = self._ANCHORED[self.layout]
+        lead = self._lead + self.SLACK
+        gmt = text.find('GMT')
+        while gmt >= 0:
+            match = pattern.search(text, max(0, gmt - lead), gmt + 9)
+            if match:
+                return self._format(match)
+            gmt = text.find('GMT', gmt + 3)
+        return None
+
+    def detect(self, text: str) -> Optional[str]:
+        """Read the first timestamp in text in any layout and remember its layout"""
+        for name, pattern in self._DETECT.items():
+            for match in pattern.finditer(text):
+                value = self._format(match)
+                if value is None:
+                    continue
+                offset = match.start('offset_hours')
+                if offset >= 0:
+                    # Only timestamps with an offset can be found from "GMT"
+                    self.layout = name
+                    self._lead = offset - len('GMT') - match.start()
+                return value
+
+        for match in _DATE_RE.finditer(text):
+            month_name, day, year = match.groups()
+            month = MONTHS.get(month_name)
+            if month is not None:
+                return f"{year}-{month}-{day.zfill(2)}T00:00:00Z"
+        return None
+
+    def isoformat(self, text: str) -> Optional[str]:
+        """The timestamp in text as ISO 8601 with its offset, e.g. 2024-07-28T16:24:58+05:30; Z when it has none"""
+        if self.layout is not None:
+            value = self._format_anchored(text)
+            if value is not None:
+                return value
+        return self.detect(text)
+
+    def decode(self, text: str) -> Optional[datetime]:
+        """The timestamp in text as a timezone-aware datetime, or None if it is missing or invalid"""
+        value = self.isoformat(text)
+        if value is None:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
@@ -0,0 +1,199 @@
+"""
+Column-oriented container for parsed Google Pay transactions
+Keeps one array per field instead of one dict per transaction
+"""
+from array import array
+from json import dumps
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Field order of the parser's transaction dicts
+FIELDS = (
+    'timestamp', 'amount', 'currency', 'recipient', 'payment_method',
+    'account_number', 'transaction_id', 'status', 'product', 'wallet',
+)
+
+# Fields with few distinct values; each one is stored once and referenced by code
+DICTIONARY_FIELDS = frozenset({
+    'currency', 'recipient', 'payment_method', 'account_number',
+    'status', 'product', 'wallet',
+})
+
+
+class StringColumn:
+    """Dictionary-encoded strings: int32 codes into a list of distinct values, -1 for None"""
+
+    def __init__(self):
+        self.codes = array('i')
+        self.values: List[str] = []
+        self._lookup: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: Optional[str]):
+        self.codes.append(self.code(value))
+
+    def extend(self, other: 'StringColumn'):
+        recode = [self.code(value) for value in other.values]
+        self.codes.extend(recode[code] if code >= 0 else -1 for code in other.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return self.values[code] if code >= 0 else None
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        values = self.values
+        return (values[code] if code >= 0 else None for code in self.codes)
+
+    def __getstate__(self):
+        # The lookup is rebuilt on load, which keeps process pool results small
+        return self.codes, self.values
+
+    def __setstate__(self, state):
+        self.codes, self.values = state
+        self._lookup = {value: code for code, value in enumerate(self.values)}
+
+
+class TransactionBatch:
+    """
+    Parsed transactions stored column by column.
+    Amounts live in a float64 array, repeated strings (recipients, methods,
+    currencies, ...) are dictionary-encoded and the rest are plain lists.
+    Iterating yields the same dicts the parser produces.
+    """
+
+    def __init__(self, fields: Sequence[str] = FIELDS):
+        self.fields = tuple(fields)
+        self.columns = {}
+        for field in self.fields:
+            if field == 'amount':
+                self.columns[field] = array('d')
+            elif field in DICTIONARY_FIELDS:
+                self.columns[field] = StringColumn()
+            else:
+                self.columns[field] = []
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict], fields: Sequence[str] = FIELDS) -> 'TransactionBatch':
+        batch = cls(fields)
+        batch.extend(transactions)
+        return batch
+
+    def append(self, transaction: Dict):
+        for field, column in self.columns.items():
+            column.append(transaction.get(field))
+
+    def extend(self, transactions: Iterable[Dict]):
+        if not isinstance(transactions, TransactionBatch):
+            for transaction in transactions:
+                self.append(transaction)
+            return
+
+        if transactions.fields != self.fields:
+            raise ValueError("Cannot merge batches with different fields")
+        for field, column in self.columns.items():
+            column.extend(transactions.columns[field])
+
+    def __len__(self) -> int:
+        return len(self.columns[self.fields[0]])
+
+    def __getitem__(self, index: int) -> Dict:
+        return {field: column[index] for field, column in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict]:
+        fields = self.fields
+        for values in zip(*self.columns.values()):
+            yield dict(zip(fields, values))
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self)
+
+    @staticmethod
+    def _encode_column(field: str, column) -> Iterator[str]:
+        prefix = encode_basestring_ascii(field) + ': '
+        if isinstance(column, StringColumn):
+            values = [prefix + encode_basestring_ascii(value) for value in column.values]
+            values.append(prefix + 'null')  # code -1
+            return (values[code] for code in column.codes)
+        if field == 'amount':
+            return (prefix + value for value in map(dumps, column))
+        return (
+            prefix + (encode_basestring_ascii(value) if isinstance(value, str) else dumps(value))
+            for value in column
+        )
+
+    def iter_json(self) -> Iterator[str]:
+        """
+        Yield each transaction as a JSON object, byte-identical to json.dumps(dict).
+        Dictionary values are encoded once per distinct value rather than per row.
+        """
+        encoded = [self._encode_column(field, column) for field, column in self.columns.items()]
+        for parts in zip(*encoded):
+            yield '{' + ', '.join(parts) + '}'
+
+    def to_json(self) -> str:
+        """The whole batch as a JSON array, identical to json.dumps(list(batch))"""
+        return '[' + ', '.join(self.iter_json()) + ']'
+
+    def _numpy_columns(self):
+        import numpy as np
+
+        columns = {}
+        for field, column in self.columns.items():
+            if field == 'amount':
+                # Shares memory with the batch, so appending raises BufferError while it is alive
+                columns[field] = np.frombuffer(column, dtype=np.float64)
+            elif isinstance(column, StringColumn):
+                columns[field] = (np.frombuffer(column.codes, dtype=np.intc), column.values)
+            else:
+                columns[field] = column
+        return columns
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """
+        Build a DataFrame without copying the amounts; dictionary-encoded
+        fields become categoricals over the batch's codes.
+        """
+        import pandas as pd
+
+        data = {}
+        for field, column in self._numpy_columns().items():
+            if isinstance(column, tuple):
+                codes, values = column
+                data[field] = pd.Categorical.from_codes(codes, categories=pd.Index(values, dtype=object))
+            else:
+                data[field] = column
+        return pd.DataFrame(data, columns=list(self.fields), copy=False)
+
+    def to_arrow(self) -> 'pa.Table':
+        """
+        Build a pyarrow Table; amounts and dictionary codes are wrapped
+        rather than copied. Needs pyarrow installed.
+        """
+        import pyarrow as pa
+
+        arrays = []
+        for field, column in self._numpy_columns().items():
+            if isinstance(column, tuple):
+                codes, values = column
+                indices = pa.array(codes, type=pa.int32(), mask=codes < 0)
+                arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string())))
+            elif field == 'amount':
+                arrays.append(pa.array(column, type=pa.float64()))
+            else:
+                arrays.append(pa.array(column, type=pa.string()))
+        return pa.Table.from_arrays(arrays, names=list(self.fields))
@@ -0,0 +1,248 @@
+"""
+Per-user cached copy of the transaction export
+Each sync appends only the transactions inserted since the previous one, so
+repeated insight runs fetch just what changed instead of the whole history.
+The rows are kept as Arrow IPC files that analysis code memory-maps
+instead of querying MongoDB again: each sync that adds rows writes them as a
+new segment file, and segments are merged once there are MAX_SEGMENTS.
+"""
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from bson.objectid import ObjectId
+
+try:
+    import fcntl
+except ImportError:  # Windows: syncs are only serialized within one process
+    fcntl = None
+
+from export_transactions_to_csv import (
+    EXPORT_BATCH_SIZE, EXPORT_COLUMNS, atomic_write, count_transactions, find_transactions, has_updates,
+    iter_frames, latest_update,
+)
+
+# Each user's Arrow segments and watermark file live here unless EXPORT_CACHE_DIR says otherwise
+DEFAULT_DATASET_DIR = os.path.join(os.path.dirname(__file__), 'export_cache')
+
+# Export columns that are not plain strings in the Arrow file
+ARROW_TYPES = {
+    'amount': pa.float64(),
+    'date': pa.timestamp('ms'),
+    'UPI': pa.int64(),
+    'UserInput': pa.int64(),
+    '__v': pa.int64(),
+}
+ARROW_SCHEMA = pa.schema([(column, ARROW_TYPES.get(column, pa.string())) for column in EXPORT_COLUMNS])
+
+# Segment files a user's cache may grow to before a sync merges them into one
+MAX_SEGMENTS = int(os.getenv('EXPORT_CACHE_MAX_SEGMENTS', 16))
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _dataset_lock(lock_path: Path):
+    """
+    Serialize access to one dataset between request threads and, through an
+    flock on lock_path, between processes: the server, CLI runs of the agents
+    and every gunicorn worker
+    """
+    with _locks_guard:
+        thread_lock = _locks.setdefault(str(lock_path), threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def frame_to_table(frame: pd.DataFrame) -> pa.Table:
+    """One export frame as an Arrow table with the fixed ARROW_SCHEMA"""
+    frame = frame.assign(date=pd.to_datetime(frame['date'], errors='coerce'))
+    return pa.Table.from_pandas(frame, schema=ARROW_SCHEMA, preserve_index=False, safe=False)
+
+
+def read_arrow(path: Path) -> pa.Table:
+    """Memory-map an Arrow IPC file; the table's buffers point into the mapping"""
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+
+class UserDataset:
+    """
+    One user's exported transactions and the highest _id among them.
+    ObjectIds grow with insertion time, so the _id watermark also catches
+    imported transactions whose dates lie far in the past, which a date
+    watermark would miss. Deletions are detected by comparing row counts, and
+    edits by a cached row's updatedAt passing the newest one recorded at the
+    previous sync; both trigger a rebuild.
+    The metadata lists the Arrow segment files, so a segment only becomes
+    visible once the metadata naming it has been replaced atomically, and
+    syncs of one user are serialized across threads and processes.
+    """
+
+    def __init__(self, user_id: str, directory: Optional[str] = None):
+        directory = directory or os.getenv('EXPORT_CACHE_DIR', DEFAULT_DATASET_DIR)
+        self.user_id = str(user_id)
+        safe_user = re.sub(r'[^A-Za-z0-9_-]', '_', self.user_id)
+        self.directory = Path(directory)
+        self.safe_user = safe_user
+        self.meta_path = Path(directory) / f"{safe_user}.json"
+        # Never removed: a process blocked on it must lock the same file the holder has
+        self.lock_path = Path(directory) / f"{safe_user}.lock"
+
+    def segment_path(self, number: int) -> Path:
+        return self.directory / f"{self.safe_user}.{number}.arrow"
+
+    def load_meta(self) -> Dict:
+        """
+        The watermark, row count, newest updatedAt and segment numbers, or an
+        empty state when nothing usable is cached
+        """
+        empty = {'watermark': None, 'rows': 0, 'updated': None, 'segments': []}
+        if not self.meta_path.exists():
+            return empty
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # Caches from before segments, or with a segment missing, are rebuilt
+        if 'segments' not in meta or not all(self.segment_path(n).exists() for n in meta['segments']):
+            return empty
+        return meta
+
+    def _save_meta(self, meta: Dict):
+        with atomic_write(str(self.meta_path), encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def clear(self):
+        self.meta_path.unlink(missing_ok=True)
+        # Single-file caches from before segments were <user>.arrow
+        for path in [self.directory / f"{self.safe_user}.arrow", *self.directory.glob(f"{self.safe_user}.*.arrow")]:
+            path.unlink(missing_ok=True)
+
+    def sync(self, batch_size: int = EXPORT_BATCH_SIZE) -> int:
+        """Append transactions inserted since the last sync; returns how many were added"""
+        with _dataset_lock(self.lock_path):
+            return self._sync_locked(batch_size)
+
+    def _sync_locked(self, batch_size: int) -> int:
+        meta = self.load_meta()
+        watermark = ObjectId(meta['watermark']) if meta['watermark'] else None
+        recorded = datetime.fromisoformat(meta['updated']) if meta.get('updated') else None
+        # Read before fetching: anything edited after this point is newer than what gets recorded
+        updated = latest_update(self.user_id)
+        last_id = watermark
+
+        def track(documents):
+            nonlocal last_id
+            for document in documents:
+                if last_id is None or document['_id'] > last_id:
+                    last_id = document['_id']
+                yield document
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        cursor = find_transactions(self.user_id, after_id=watermark, batch_size=batch_size)
+        try:
+            tables = [frame_to_table(frame) for frame in iter_frames(track(cursor), batch_size)]
+        finally:
+            cursor.close()
+
+        added = sum(table.num_rows for table in tables)
+        rows = meta['rows'] + added
+        if watermark is not None and (
+                count_transactions(self.user_id) != rows
+                or (updated != recorded and has_updates(self.user_id, watermark, recorded))):
+            # Appending cannot see deletions, edits or late inserts below the watermark
+            print(f"[INFO] Cached export for {self.user_id} is out of step, rebuilding")
+            self.clear()
+            return self._sync_locked(batch_size)
+
+        segments = list(meta['segments'])
+        merged = []
+        if added:
+            number = max(segments, default=-1) + 1
+            if len(segments) >= MAX_SEGMENTS:
+                # Merge everything into the new segment; the old ones go once the metadata stops naming them
+                merged, segments = segments, []
+                tables = [read_arrow(self.segment_path(n)) for n in merged] + tables
+            self._write_segment(number, tables)
+            segments.append(number)
+        self._save_meta({
+            'watermark': str(last_id) if last_id else None,
+            'rows': rows,
+            'updated': updated.isoformat() if updated else None,
+            'segments': segments,
+        })
+        for n in merged:
+            self.segment_path(n).unlink(missing_ok=True)
+        return added
+
+    def _write_segment(self, number: int, tables: List[pa.Table]):
+        """Write tables as one new Arrow file; earlier segments are never rewritten"""
+        with atomic_write(str(self.segment_path(number)), 'wb') as sink:
+            with pa.ipc.new_file(sink, ARROW_SCHEMA) as writer:
+                for table in tables:
+                    writer.write_table(table)
+
+    @staticmethod
+    def _version(meta: Dict) -> str:
+        return f"{meta['watermark']}:{meta['rows']}:{meta.get('updated')}"
+
+    def version(self) -> str:
+        """Changes whenever a sync adds, edits or drops transactions"""
+        return self._version(self.load_meta())
+
+    def _read_table(self, meta: Dict) -> Optional[pa.Table]:
+        if meta['rows'] == 0:
+            return None
+        # Concatenation keeps each segment's buffers in its own mapping
+        return pa.concat_tables([read_arrow(self.segment_path(n)) for n in meta['segments']])
+
+    def load_table(self) -> Optional[pa.Table]:
+        """The cached rows as a memory-mapped Arrow table, or None when there are none"""
+        with _dataset_lock(self.lock_path):
+            return self._read_table(self.load_meta())
+
+    def sync_and_load(self, batch_size: int = EXPORT_BATCH_SIZE) -> Tuple[str, Optional[pa.Table]]:
+        """sync, then the version and table of exactly the state it left, under one hold of the lock"""
+        with _dataset_lock(self.lock_path):
+            self._sync_locked(batch_size)
+            meta = self.load_meta()
+            return self._version(meta), self._read_table(meta)
+
+    def load_dataframe(self) -> Optional[pd.DataFrame]:
+        """load_table as a DataFrame; numeric columns without nulls are not copied"""
+        table = self.load_table()
+        return table.to_pandas() if table is not None else None
+
+
+def user_data_version(user_id: str) -> str:
+    """A valid user's transaction-set version, after syncing their cached dataset"""
+    dataset = UserDataset(user_id)
+    dataset.sync()
+    return dataset.version()
+
+
+def user_data_snapshot(user_id: str) -> Tuple[str, Optional[pa.Table]]:
+    """A valid user's transaction-set version and Arrow table, from a single sync"""
+    return UserDataset(user_id).sync_and_load()
+
+
+def user_transactions_table(user_id: str) -> Optional[pa.Table]:
+    """A valid user's transactions as an Arrow table, synced from MongoDB first"""
+    dataset = UserDataset(user_id)
+    dataset.sync()
+    return dataset.load_table()
@@ -28,6 +28,7 @@ const transactionSchema = new mongoose.Schema({
   paymentMethod: String,                // From HTML parser
   accountNumber: String,                // From HTML parser (masked)
   transactionId: String,                // From HTML parser
+  fingerprint: String,                  // From HTML parser: identity of the export block, so re-uploads skip it
   status: {
     type: String,
     enum: ['Completed', 'Pending', 'Failed', 'Cancelled', 'Processing'],
@@ -60,8 +61,18 @@ const transactionSchema = new mongoose.Schema({
       default: Date.now
     }
   },
+}, {
+  // updatedAt tells the AI backend's per-user export cache which rows were edited
+  timestamps: true,
 });
 
 transactionSchema.index({ userId: 1, date: -1 });
+// The AI backend's export cache fetches only transactions past its _id watermark
+transactionSchema.index({ userId: 1, _id: 1 });
+transactionSchema.index(
+  { userId: 1, fingerprint: 1 },
+  { partialFilterExpression: { fingerprint: { $exists: true } } }
+);
+transactionSchema.index({ userId: 1, updatedAt: 1 });
 
 export default mongoose.model('Transaction', transactionSchema);
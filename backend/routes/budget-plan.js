@@ -1,69 +1,59 @@
 import express from 'express';
-import { spawn } from 'child_process';
+import { enqueueAnalysis, getAnalysisJob, runAnalysis, sendAiResponse } from '../utils/aiJobs.js';
 
 const router = express.Router();
 
 /**
- * GET /api/budget-plan/:userId
- * Generates AI budget plan for user's savings goals
+ * GET /api/budget-plan/jobs/:jobId
+ * Status of a queued budget plan, with the plan once it is done
  */
-router.get('/:userId', async (req, res) => {
+router.get('/jobs/:jobId', async (req, res) => {
   try {
-    const { userId } = req.params;
-
-    // Call Python multi-goal planner
-    const pythonProcess = spawn('python', [
-      './ai_backend/budgetPlanner.py',
-      userId
-    ]);
-
-    let output = '';
-    let errorOutput = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
+    sendAiResponse(res, await getAnalysisJob(req.params.jobId));
+  } catch (error) {
+    console.error('[ERROR] Budget plan job route:', error);
+    res.status(502).json({
+      success: false,
+      error: 'AI backend unavailable',
+      details: error.message
     });
+  }
+});
 
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
+/**
+ * POST /api/budget-plan/:userId
+ * Queues an AI budget plan and returns its job id right away (202)
+ */
+router.post('/:userId', async (req, res) => {
+  try {
+    sendAiResponse(res, await enqueueAnalysis('budget', req.params.userId));
+  } catch (error) {
+    console.error('[ERROR] Budget plan route:', error);
+    res.status(502).json({
+      success: false,
+      error: 'AI backend unavailable',
+      details: error.message
     });
+  }
+});
 
-    pythonProcess.on('close', (code) => {
-      try {
-        if (code !== 0) {
-          console.error('[PYTHON ERROR]', errorOutput);
-          return res.status(500).json({
-            success: false,
-            error: 'Budget planning failed',
-            details: errorOutput
-          });
-        }
-
-        // Parse JSON output from Python
-        const jsonMatch = output.match(/\{[\s\S]*\}/);
-        if (!jsonMatch) {
-          return res.status(500).json({
-            success: false,
-            error: 'Invalid response from planning agent'
-          });
-        }
-
-        const result = JSON.parse(jsonMatch[0]);
-        res.json(result);
-      } catch (err) {
-        console.error('Failed to parse Python output:', err);
-        res.status(500).json({
-          success: false,
-          error: 'Failed to parse budget plan',
-          details: err.message
-        });
-      }
-    });
+/**
+ * GET /api/budget-plan/:userId
+ * Generates AI budget plan for user's savings goals, waiting for it to finish
+ */
+router.get('/:userId', async (req, res) => {
+  try {
+    const result = await runAnalysis('budget', req.params.userId);
+    if (result.status !== 200) {
+      console.error('[ERROR] Budget planning failed:', result.body.error);
+    }
+    sendAiResponse(res, result);
   } catch (error) {
     console.error('[ERROR] Budget plan route:', error);
-    res.status(500).json({
+    res.status(502).json({
       success: false,
-      error: error.message
+      error: 'AI backend unavailable',
+      details: error.message
     });
   }
 });
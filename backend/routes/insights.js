@@ -1,80 +1,54 @@
 import express from 'express';
-import { spawn } from 'child_process';
-import path from 'path';
-import { fileURLToPath } from 'url';
+import { enqueueAnalysis, getAnalysisJob, runAnalysis, sendAiResponse } from '../utils/aiJobs.js';
 
 const router = express.Router();
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
 
-// Get financial insights from transaction data
+// Get financial insights from transaction data, waiting for the analysis to finish
 router.get('/', async (req, res) => {
   try {
-    const aiBackendPath = path.join(__dirname, '..', '..', 'ai_backend');
-    
-    console.log('🚀 Running insights agent...');
-    console.log('AI Backend path:', aiBackendPath);
-    
-    // Spawn Python process to run insights agent
-    const pythonProcess = spawn('python', [path.join(aiBackendPath, 'insights_agent.py')], {
-      cwd: aiBackendPath,
-      timeout: 120000 // 2 minute timeout for AI processing
-    });
-    
-    let stdout = '';
-    let stderr = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      stdout += data.toString();
-    });
-    
-    pythonProcess.stderr.on('data', (data) => {
-      stderr += data.toString();
-      console.error('[Insights] Python stderr:', data.toString());
-    });
-    
-    pythonProcess.on('close', (code) => {
-      console.log('[Insights] Python process exited with code:', code);
-      
-      if (code !== 0) {
-        console.error('[Insights] Error output:', stderr);
-        return res.status(500).json({
-          success: false,
-          error: 'Failed to generate insights',
-          details: stderr
-        });
-      }
-      
-      try {
-        // Parse the JSON output from Python script
-        const result = JSON.parse(stdout);
-        console.log('[Insights] Generated insights successfully');
-        res.json(result);
-      } catch (parseError) {
-        console.error('[Insights] JSON parse error:', parseError.message);
-        console.error('[Insights] Raw stdout:', stdout);
-        res.status(500).json({
-          success: false,
-          error: 'Failed to parse insights response',
-          details: parseError.message
-        });
-      }
+    const { userId } = req.query;
+    console.log('🚀 Running insights analysis for user:', userId);
+
+    const result = await runAnalysis('insights', userId);
+    if (result.status !== 200) {
+      console.error('[Insights] Analysis failed:', result.body.error);
+    }
+    sendAiResponse(res, result);
+  } catch (error) {
+    console.error('❌ Error in insights endpoint:', error);
+    res.status(502).json({
+      success: false,
+      error: 'AI backend unavailable',
+      details: error.message
     });
-    
-    pythonProcess.on('error', (error) => {
-      console.error('[Insights] Process error:', error);
-      res.status(500).json({
-        success: false,
-        error: 'Failed to start insights agent',
-        details: error.message
-      });
+  }
+});
+
+// Queue an insights analysis and return its job id right away (202)
+router.post('/', async (req, res) => {
+  try {
+    const userId = req.body.userId || req.query.userId;
+    sendAiResponse(res, await enqueueAnalysis('insights', userId));
+  } catch (error) {
+    console.error('❌ Error queueing insights:', error);
+    res.status(502).json({
+      success: false,
+      error: 'AI backend unavailable',
+      details: error.message
     });
-    
+  }
+});
+
+// Status of a queued insights analysis, with the insights once it is done
+router.get('/jobs/:jobId', async (req, res) => {
+  try {
+    sendAiResponse(res, await getAnalysisJob(req.params.jobId));
   } catch (error) {
-    console.error('❌ Error in insights endpoint:', error);
-    res.status(500).json({
+    console.error('❌ Error fetching insights job:', error);
+    res.status(502).json({
       success: false,
-      error: error.message
+      error: 'AI backend unavailable',
+      details: error.message
     });
   }
 });
@@ -82,14 +82,30 @@ router.post('/', async (req, res) => {
           req.body.userId = user._id; // Update userId to the newly created user
         }
         
-        // Use Python flexible parser
-        const parsedTransactions = await parseGPayHtmlWithPython(htmlContent, fileName, req.body.walletAddress);
+        // Use Python flexible parser, skipping blocks this user already has.
+        // Fingerprints live on the transactions, so deleting one lets it be imported again.
+        const known = await Transaction.distinct('fingerprint', {
+          userId: user._id,
+          fingerprint: { $exists: true }
+        });
+        const { transactions: parsedTransactions, skipped } = await parseGPayHtmlWithPython(
+          htmlContent, fileName, req.body.walletAddress, known
+        );
         
-        console.log('Parsed transactions count:', parsedTransactions.length);
+        console.log('Parsed transactions count:', parsedTransactions.length, 'already imported:', skipped);
         if (parsedTransactions.length > 0) {
           console.log('Sample transaction:', JSON.stringify(parsedTransactions[0], null, 2));
         }
         
+        if (parsedTransactions.length === 0 && skipped > 0) {
+          return res.status(200).json({
+            message: `No new transactions: all ${skipped} were already imported`,
+            count: 0,
+            skipped,
+            transactions: []
+          });
+        }
+        
         if (parsedTransactions.length === 0) {
           return res.status(400).json({ 
             error: 'No transactions found in HTML file. Please ensure you uploaded a valid Google Pay/Google Wallet activity file. The file should contain transaction history with amounts, dates, and descriptions.' 
@@ -111,6 +127,7 @@ router.post('/', async (req, res) => {
             paymentMethod: txData.paymentMethod,
             accountNumber: txData.accountNumber,
             transactionId: txData.transactionId,
+            fingerprint: txData.fingerprint,
             status: txData.status,
             date: txData.date,
             walletAddress: req.body.walletAddress,
@@ -130,6 +147,7 @@ router.post('/', async (req, res) => {
         return res.status(201).json({ 
           message: `Successfully imported ${savedTransactions.length} transactions`,
           count: savedTransactions.length,
+          skipped,
           transactions: savedTransactions
         });
       } catch (parseError) {
@@ -41,6 +41,7 @@ import userRoutes from './routes/users.js';
 import budgetRoutes from './routes/budgets.js';
 import savingsRoutes from './routes/savings.js';
 import insightsRoutes from './routes/insights.js';
+import budgetPlanRoutes from './routes/budget-plan.js';
 
 // Use Routes
 app.use('/api/transactions', transactionRoutes);
@@ -48,6 +49,7 @@ app.use('/api/users', userRoutes);
 app.use('/api/budgets', budgetRoutes);
 app.use('/api/savings', savingsRoutes);
 app.use('/api/insights', insightsRoutes);
+app.use('/api/budget-plan', budgetPlanRoutes);
 
 // Error Handler
 app.use((err, req, res, next) => {
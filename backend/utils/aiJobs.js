@@ -0,0 +1,78 @@
+const AI_BACKEND_URL = (process.env.AI_BACKEND_URL || 'http://localhost:5002').replace(/\/$/, '');
+const POLL_INTERVAL_MS = 1000;
+
+/**
+ * Client for the AI backend's background jobs (ai_backend/app.py).
+ * Analyses run in the Flask service's worker pool instead of a Python
+ * process spawned per request; concurrent requests for the same user and
+ * kind share one job there.
+ */
+async function callAiBackend(pathname, options = {}) {
+  const response = await fetch(`${AI_BACKEND_URL}${pathname}`, {
+    headers: { 'Content-Type': 'application/json' },
+    ...options,
+  });
+  const body = await response.json().catch(() => ({
+    success: false,
+    error: `AI backend returned ${response.status}`,
+  }));
+  return { status: response.status, body, retryAfter: response.headers.get('retry-after') };
+}
+
+/** Queue an analysis; resolves to the AI backend's status and job body (202 on success). */
+export function enqueueAnalysis(kind, userId) {
+  return callAiBackend('/jobs', {
+    method: 'POST',
+    body: JSON.stringify({ kind, userId }),
+  });
+}
+
+export function getAnalysisJob(jobId) {
+  return callAiBackend(`/jobs/${encodeURIComponent(jobId)}`);
+}
+
+/**
+ * Queue an analysis and poll until it finishes or timeoutMs passes.
+ * Polling only holds this request open, not a Python process.
+ */
+export async function runAnalysis(kind, userId, timeoutMs = 120000) {
+  const queued = await enqueueAnalysis(kind, userId);
+  if (queued.status !== 202) {
+    return queued;
+  }
+
+  const deadline = Date.now() + timeoutMs;
+  let job = queued.body;
+  while (job.status === 'queued' || job.status === 'running') {
+    if (Date.now() >= deadline) {
+      return {
+        status: 504,
+        body: { success: false, error: 'Analysis is still running', jobId: job.jobId, statusUrl: job.statusUrl },
+      };
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    const polled = await getAnalysisJob(job.jobId);
+    if (polled.status !== 200) {
+      return polled;
+    }
+    job = polled.body;
+  }
+
+  if (job.status === 'failed') {
+    // Refused by the AI backend's LLM limit: keep its 429/503 and Retry-After
+    return {
+      status: job.errorStatus || 500,
+      body: { success: false, error: job.error, jobId: job.jobId },
+      retryAfter: job.retryAfter ? String(job.retryAfter) : null,
+    };
+  }
+  return { status: 200, body: job.result };
+}
+
+/** Send an AI backend response through, keeping Retry-After on 429/503. */
+export function sendAiResponse(res, { status, body, retryAfter }) {
+  if (retryAfter) {
+    res.set('Retry-After', retryAfter);
+  }
+  return res.status(status).json(body);
+}
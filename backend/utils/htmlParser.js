@@ -1,106 +1,170 @@
-import fs from 'fs';
 import path from 'path';
 import { spawn } from 'child_process';
 import { fileURLToPath } from 'url';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
+const PYTHON_BIN = process.env.PYTHON_BIN || 'python';
+const PARSER_SCRIPT = path.join(__dirname, '..', '..', 'ai_backend', 'parse_html_to_json.py');
+const PARSER_WORKERS = Math.max(1, parseInt(process.env.HTML_PARSER_WORKERS || '1', 10) || 1);
+
 /**
- * Call the Python flexible parser to parse Google Pay HTML
- * Returns transactions with all extracted fields mapped to MongoDB schema
+ * One long-lived `parse_html_to_json.py --serve` process.
+ * Requests and responses are single JSON lines matched up by id, so the
+ * interpreter start-up is paid once instead of on every upload.
  */
-export const parseGPayHtmlWithPython = (htmlContent, fileName = 'unknown.html', walletAddress = null) => {
-  return new Promise((resolve, reject) => {
-    try {
-      // Create temporary HTML file
-      const tempDir = path.join(__dirname, '..', '..', 'ai_backend', 'temp');
-      if (!fs.existsSync(tempDir)) {
-        fs.mkdirSync(tempDir, { recursive: true });
+class ParserWorker {
+  constructor(name) {
+    this.name = name;
+    this.process = null;
+    this.pending = new Map();
+    this.nextId = 1;
+    this.stdoutBuffer = '';
+  }
+
+  start() {
+    console.log(`[htmlParser] Starting parser worker ${this.name}`);
+    const python = spawn(PYTHON_BIN, [PARSER_SCRIPT, '--serve'], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+
+    python.stdout.setEncoding('utf-8');
+    python.stdout.on('data', (data) => {
+      this.stdoutBuffer += data;
+      let newline = this.stdoutBuffer.indexOf('\n');
+      while (newline >= 0) {
+        const line = this.stdoutBuffer.slice(0, newline);
+        this.stdoutBuffer = this.stdoutBuffer.slice(newline + 1);
+        this.handleResponse(line);
+        newline = this.stdoutBuffer.indexOf('\n');
       }
+    });
+
+    python.stderr.on('data', (data) => {
+      console.error(`[htmlParser] Worker ${this.name} stderr:`, data.toString());
+    });
+
+    python.stdin.on('error', (err) => {
+      this.stop(new Error(`Python parser input closed: ${err.message}`));
+    });
+
+    python.on('error', (err) => {
+      this.stop(new Error(`Failed to spawn Python process: ${err.message}`));
+    });
+
+    python.on('close', (code) => {
+      console.log(`[htmlParser] Parser worker ${this.name} exited with code:`, code);
+      this.stop(new Error(`Python parser exited with code ${code}`));
+    });
 
-      const tempFileName = `temp_${Date.now()}.html`;
-      const tempFilePath = path.join(tempDir, tempFileName);
-      fs.writeFileSync(tempFilePath, htmlContent, 'utf-8');
-      
-      console.log('[htmlParser] Temp file created:', tempFilePath);
-      console.log('[htmlParser] Temp file size:', fs.statSync(tempFilePath).size);
-      console.log('[htmlParser] Wallet address:', walletAddress);
-      console.log('[htmlParser] Calling Python parser...');
-
-      // Run Python parser
-      const pythonScript = path.join(__dirname, '..', '..', 'ai_backend', 'parse_html_to_json.py');
-      
-      const python = spawn('python', [pythonScript, tempFilePath]);
-
-      let stdout = '';
-      let stderr = '';
-
-      python.stdout.on('data', (data) => {
-        stdout += data.toString();
-      });
-
-      python.stderr.on('data', (data) => {
-        stderr += data.toString();
-      });
-
-      python.on('close', (code) => {
-        // Clean up temp file
-        try {
-          fs.unlinkSync(tempFilePath);
-        } catch (e) {
-          console.error('Failed to cleanup temp file:', e);
-        }
-
-        console.log('[htmlParser] Python process exited with code:', code);
-        console.log('[htmlParser] Stdout length:', stdout.length);
-        console.log('[htmlParser] Stderr:', stderr);
-        console.log('[htmlParser] Stdout preview (first 500):', stdout.substring(0, 500));
-
-        if (code !== 0) {
-          console.error('Python script error:', stderr);
-          reject(new Error(`Python parser failed: ${stderr}`));
-          return;
-        }
-
-        try {
-          const parsed = JSON.parse(stdout);
-          console.log('[htmlParser] Parsed transactions count:', parsed.length);
-          
-          // Map Python parser output to MongoDB schema
-          const transactions = parsed.map(tx => ({
-            type: tx.amount > 0 ? 'expense' : 'income',
-            amount: Math.abs(tx.amount),
-            currency: tx.currency || 'USD',
-            category: 'Uncategorized', // Will be categorized later
-            description: tx.recipient || 'Transaction',
-            recipient: tx.recipient,
-            paymentMethod: tx.payment_method,
-            accountNumber: tx.account_number,
-            transactionId: tx.transaction_id,
-            status: tx.status || 'Completed',
-            date: new Date(tx.timestamp),
-            walletAddress: walletAddress || null,
-            inputSource: 'UPI', // HTML parsing = UPI input
-            tags: ['imported', 'html-parse'],
-            htmlFile: {
-              fileName: fileName,
-              uploadDate: new Date(),
-              // Note: don't store content in each transaction to save space
-            }
-          }));
-
-          resolve(transactions);
-        } catch (err) {
-          console.error('Failed to parse Python output:', err);
-          reject(new Error(`Failed to parse Python output: ${err.message}`));
-        }
-      });
-
-      python.on('error', (err) => {
-        reject(new Error(`Failed to spawn Python process: ${err.message}`));
-      });
-    } catch (error) {
+    this.process = python;
+  }
+
+  stop(error) {
+    if (this.process) {
+      this.process.removeAllListeners();
+      this.process.stdout.removeAllListeners();
+      this.process.stderr.removeAllListeners();
+      this.process.stdin.removeAllListeners();
+      this.process.stdin.on('error', () => {});
+      this.process.kill();
+    }
+    this.process = null;
+    this.stdoutBuffer = '';
+
+    for (const { reject } of this.pending.values()) {
       reject(error);
     }
-  });
+    this.pending.clear();
+  }
+
+  handleResponse(line) {
+    if (!line.trim()) return;
+
+    let response;
+    try {
+      response = JSON.parse(line);
+    } catch (err) {
+      console.error('[htmlParser] Unreadable worker output:', line.substring(0, 500));
+      return;
+    }
+
+    const request = this.pending.get(response.id);
+    if (!request) return;
+    this.pending.delete(response.id);
+
+    if (response.error) {
+      request.reject(new Error(`Python parser failed: ${response.error}`));
+    } else {
+      request.resolve(response);
+    }
+  }
+
+  send(payload) {
+    if (!this.process) this.start();
+
+    return new Promise((resolve, reject) => {
+      const id = this.nextId++;
+      this.pending.set(id, { resolve, reject });
+      this.process.stdin.write(JSON.stringify({ ...payload, id }) + '\n');
+    });
+  }
+}
+
+const workers = Array.from({ length: PARSER_WORKERS }, (_, i) => new ParserWorker(i + 1));
+
+// Send each upload to the worker with the fewest requests in flight
+const pickWorker = () =>
+  workers.reduce((best, worker) => (worker.pending.size < best.pending.size ? worker : best));
+
+/**
+ * Map Python parser output to MongoDB schema
+ */
+const toTransactionDocs = (parsed, fileName, walletAddress) =>
+  parsed.map(tx => ({
+    type: tx.amount > 0 ? 'expense' : 'income',
+    amount: Math.abs(tx.amount),
+    currency: tx.currency || 'USD',
+    category: 'Uncategorized', // Will be categorized later
+    description: tx.recipient || 'Transaction',
+    recipient: tx.recipient,
+    paymentMethod: tx.payment_method,
+    accountNumber: tx.account_number,
+    transactionId: tx.transaction_id,
+    status: tx.status || 'Completed',
+    date: new Date(tx.timestamp),
+    walletAddress: walletAddress || null,
+    inputSource: 'UPI', // HTML parsing = UPI input
+    tags: ['imported', 'html-parse'],
+    fingerprint: tx.fingerprint, // Lets later uploads skip this export block
+    htmlFile: {
+      fileName: fileName,
+      uploadDate: new Date(),
+      // Note: don't store content in each transaction to save space
+    }
+  }));
+
+/**
+ * Call the Python flexible parser to parse Google Pay HTML
+ * Returns transactions with all extracted fields mapped to MongoDB schema.
+ * With `known` (fingerprints of the user's already imported transactions),
+ * those blocks and repeats within the file are skipped and counted in
+ * `skipped`; each returned transaction carries its `fingerprint`.
+ */
+export const parseGPayHtmlWithPython = async (htmlContent, fileName = 'unknown.html', walletAddress = null, known = null) => {
+  console.log('[htmlParser] HTML size:', htmlContent.length);
+  console.log('[htmlParser] Wallet address:', walletAddress);
+  console.log('[htmlParser] Calling Python parser...');
+
+  const payload = { html: htmlContent };
+  if (known) payload.known = known;
+
+  const response = await pickWorker().send(payload);
+  const skipped = response.skipped || 0;
+  console.log('[htmlParser] Parsed transactions count:', response.transactions.length, 'skipped:', skipped);
+
+  return {
+    transactions: toTransactionDocs(response.transactions, fileName, walletAddress),
+    skipped,
+  };
 };
@@ -1001,6 +1001,8 @@ export const Transactions: React.FC = () => {
                         
                         setImportedCount(response.count);
                         setImportSuccess(true);
+                      } else if (response.skipped && response.skipped > 0) {
+                        alert(`All ${response.skipped} transactions in this file were already imported.`);
                       } else {
                         alert('No transactions found in the HTML file. Please check the file format.');
                       }